@@ -0,0 +1,102 @@
+"""
+Benchmark of the streaming Jest JSON reader against reading with json.load
+
+usage (from the repository root):
+    python -m benchmarks.bench_jest_reader [--suites 2000] [--tests 50]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+from src.models.test_suite import TestReport, TestSuite
+from src.test_readers.jest_reader import JestJSONReader
+
+STACK_TRACE = "\n".join(
+    f"    at Object.<anonymous> (/repo/packages/app/src/module_{i}.test.js:{i}:17)"
+    for i in range(40)
+)
+
+
+def write_synthetic_report(path: str, suites: int, tests: int):
+    """Writes a Jest --json output where every third test fails with a stack trace"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"numTotalTests": %d, "success": false, "testResults": [' % (suites * tests))
+        for suite in range(suites):
+            assertions = []
+            for test in range(tests):
+                failed = test % 3 == 0
+                assertions.append(
+                    {
+                        "ancestorTitles": [f"Suite {suite}"],
+                        "duration": test % 17,
+                        "failureDetails": [{}] if failed else [],
+                        "failureMessages": [f"Error: expected {test} // {STACK_TRACE}"] if failed else [],
+                        "fullName": f"Suite {suite} test {test}",
+                        "status": "failed" if failed else "passed",
+                        "title": f"test {test}",
+                    }
+                )
+            suite_result = {
+                "assertionResults": assertions,
+                "endTime": 1725810421000 + suite,
+                "message": STACK_TRACE,
+                "name": f"/repo/packages/app/src/module_{suite}.test.js",
+                "startTime": 1725810420000,
+                "status": "failed",
+            }
+            f.write(("," if suite else "") + json.dumps(suite_result))
+        f.write("]}")
+
+
+def read_with_json_load(file_path: str) -> TestReport:
+    """The previous reader: decodes the whole file before building the report"""
+    reader = JestJSONReader()
+    with open(file_path, encoding="utf-8") as f:
+        test_results = json.load(f)
+
+    testsuites: List[TestSuite] = []
+    for test_suite in test_results["testResults"]:
+        tests = [reader.create_test_case(test_case=case) for case in test_suite["assertionResults"]]
+        duration = float(test_suite.get("endTime")) - float(test_suite.get("startTime"))
+        testsuites.append(
+            TestSuite(name=test_suite.get("name", ""), tests=tests, time=round(duration / 1000, 2))
+        )
+    return TestReport(suites=testsuites)
+
+
+def measure(name: str, read: Callable[[str], TestReport], file_path: str):
+    """Prints wall time and peak traced memory of one read"""
+    start = time.perf_counter()
+    report = read(file_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    read(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<12} {elapsed:8.2f}s  peak {peak / 2**20:8.1f} MiB  tests {report.total_tests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--suites", type=int, default=2000)
+    parser.add_argument("--tests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "jest.json")
+        write_synthetic_report(file_path, suites=args.suites, tests=args.tests)
+        print(f"synthetic report: {os.path.getsize(file_path) / 2**20:.1f} MiB")
+
+        measure("json.load", read_with_json_load, file_path)
+        measure("streaming", JestJSONReader().read, file_path)
+
+
+if __name__ == "__main__":
+    main()
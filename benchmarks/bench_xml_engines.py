@@ -0,0 +1,107 @@
+"""
+Benchmark of the stdlib and lxml XML engines on large Cobertura and JUnit reports
+
+usage (from the repository root, with lxml installed):
+    python -m benchmarks.bench_xml_engines [--classes 20000] [--lines 100] [--tests 200000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.helpers.xml_engines import LxmlEngine, StdlibEngine, lxml_etree
+from src.helpers.xml_stream import XmlStream
+from src.parsers.coberature_schema_parser import CoberatureSchemaParser
+from src.test_readers.junit_reader import JUnitReader
+
+
+def write_cobertura_report(path: str, classes: int, lines: int):
+    """Writes a Cobertura report where every class has `lines` lines, a third of them missed"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" ?>\n')
+        f.write('<coverage version="7.6.1" timestamp="1725112165369" line-rate="0.66" branch-rate="0.5">\n')
+        f.write("<packages><package name=\"app\" line-rate=\"0.66\" branch-rate=\"0.5\"><classes>\n")
+        for cls in range(classes):
+            f.write(
+                f'<class name="module_{cls}.py" filename="app/module_{cls}.py" '
+                f'line-rate="0.66" branch-rate="0.5" complexity="{cls % 9}"><methods/><lines>'
+            )
+            f.write(
+                "".join(
+                    f'<line number="{line}" hits="{0 if line % 3 == 0 else line}"/>'
+                    for line in range(1, lines + 1)
+                )
+            )
+            f.write("</lines></class>\n")
+        f.write("</classes></package></packages></coverage>\n")
+
+
+def write_junit_report(path: str, tests: int):
+    """Writes a JUnit report of 100 test cases per suite, every tenth one failing"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+        for suite in range(0, tests, 100):
+            f.write(f'<testsuite name="suite_{suite}" tests="100" time="1.5">\n')
+            for test in range(suite, min(suite + 100, tests)):
+                f.write(f'<testcase classname="tests.suite_{suite}" name="test_{test}" time="0.01">')
+                if test % 10 == 0:
+                    f.write(f'<failure message="assert {test} == 0">Traceback (most recent call last): ...</failure>')
+                f.write("</testcase>\n")
+            f.write("</testsuite>\n")
+        f.write("</testsuites>\n")
+
+
+def measure(name: str, read, file_path: str, engine):
+    """Prints wall time and peak traced memory of one read, returns its result"""
+    start = time.perf_counter()
+    result = read(XmlStream(file_path, engine=engine), file_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    read(XmlStream(file_path, engine=engine), file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<20} {elapsed:8.2f}s  peak {peak / 2**20:8.1f} MiB")
+    return result
+
+
+def read_coverage(xml_stream: XmlStream, file_path: str):
+    return CoberatureSchemaParser(xml_stream=xml_stream).parse_and_normalise(file_path)
+
+
+def read_tests(xml_stream: XmlStream, file_path: str):
+    report = JUnitReader(xml_stream=xml_stream).read(file_path)
+    return [(suite.name, list(suite.tests)) for suite in report.suites]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--classes", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=100)
+    parser.add_argument("--tests", type=int, default=200000)
+    args = parser.parse_args()
+
+    if lxml_etree is None:
+        raise SystemExit("lxml is not installed, there is nothing to compare against")
+
+    with tempfile.TemporaryDirectory() as directory:
+        coverage_path = os.path.join(directory, "coverage.xml")
+        write_cobertura_report(coverage_path, classes=args.classes, lines=args.lines)
+        print(f"synthetic cobertura report: {os.path.getsize(coverage_path) / 2**20:.1f} MiB")
+        stdlib = measure("cobertura stdlib", read_coverage, coverage_path, StdlibEngine())
+        lxml = measure("cobertura lxml", read_coverage, coverage_path, LxmlEngine())
+        assert stdlib == lxml, "the engines normalised the report differently"
+
+        junit_path = os.path.join(directory, "junit.xml")
+        write_junit_report(junit_path, tests=args.tests)
+        print(f"synthetic junit report: {os.path.getsize(junit_path) / 2**20:.1f} MiB")
+        stdlib = measure("junit stdlib", read_tests, junit_path, StdlibEngine())
+        lxml = measure("junit lxml", read_tests, junit_path, LxmlEngine())
+        assert stdlib == lxml, "the engines read the report differently"
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,6 @@
 """Store Constants"""
-BOT_IMAGE='https://i.imgur.com/k0Ytdkc.png'
\ No newline at end of file
+BOT_IMAGE='https://i.imgur.com/k0Ytdkc.png'
+
+# Bump whenever the parsed NormalisedCoverageData/TestReport change shape, so
+# cached parses from an older version are not reused
+PARSER_VERSION='11'
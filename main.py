@@ -14,9 +14,14 @@ from src.exceptions.configurations import (
 import asyncio
 from src.formatters.base_formatter import BaseFormatter
 from src.logger import setup_logging
-from src.parsers.parser_factory import ParserFactory
 from src.providers.base_provider import Baseprovider
-from src.test_readers.reader_factory import ReaderFactory
+from src.report_loader import (
+    load_baseline_comparison,
+    load_diff_coverage,
+    load_reports,
+    save_history,
+    save_snapshots,
+)
 from src.utils import set_formatter, set_provider
 
 setup_logging()
@@ -46,27 +51,25 @@ def setup_provider() -> Tuple[Baseprovider, BaseFormatter]:
             f"Error reading the threshold value '{coverage_threshold}' with type '{type(coverage_threshold)}'"
         )
 
+    # The coverage and test reports are independent, both are loaded at once
     try:
-        parser = ParserFactory.get_parser(coverage_file)
-    except UnsupportedCoverageType as e:
+        coverage_report, test_report = load_reports(coverage_file=coverage_file, test_file=test_file)
+    except (UnsupportedCoverageType, UnsupportedTestReportType) as e:
         print(e)
         sys.exit(1)
-    coverage_report = parser.parse_and_normalise(coverage_file=coverage_file)
-    logger.debug("Coverage report parsed")
+    save_snapshots(coverage_report=coverage_report, test_report=test_report)
+    save_history(coverage_report=coverage_report, test_report=test_report)
+    diff_coverage = load_diff_coverage(coverage_report=coverage_report)
+    baseline_comparison = load_baseline_comparison(coverage_report=coverage_report)
 
     try:
-        reader = ReaderFactory.get_reader(test_file=test_file)
-    except UnsupportedTestReportType as e:
-        print(e)
-        sys.exit(1)
-
-    test_report = None
-    if reader:
-        test_report = reader.read(test_file)
-        logger.debug("Test Suites report parsed")
-
-    try:
-        formatter = set_formatter(provider_name=provider_name, coverage_report=coverage_report, test_report=test_report)
+        formatter = set_formatter(
+            provider_name=provider_name,
+            coverage_report=coverage_report,
+            test_report=test_report,
+            diff_coverage=diff_coverage,
+            baseline_comparison=baseline_comparison,
+        )
         provider = set_provider(provider_name=provider_name)
     except InvalidProviderError:
         sys.exit(1)
@@ -22,6 +22,10 @@ class UnsupportedCoverageType(Exception):
         )
         super().__init__(message)
 
+    def __reduce__(self):
+        # Rebuilt without arguments when sent back from a worker process
+        return (self.__class__, ())
+
     def generate_issue_url(self) -> str:
         """Generates the Issue with already configured Ticket data."""
         issue_title = "Unsupported Coverage Format"
@@ -57,7 +61,11 @@ class UnsupportedTestReportType(Exception):
             f"Test Suite format not supported! Raise a Ticket here: {self.issue_url}"
         )
         super().__init__(message)
-    
+
+    def __reduce__(self):
+        # Rebuilt without arguments when sent back from a worker process
+        return (self.__class__, ())
+
     def generate_issue_url(self) -> str:
         """Generates the Issue with already configured Ticket data."""
         issue_title = "Unsupported Coverage Format"
@@ -4,9 +4,14 @@
 
 class MalformedFile(Exception):
     def __init__(self, file: str):
+        self.file = file
         self.message = f"The file '{file}' is contains errors. Cannot parse it."
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # Rebuilt from the file name when sent back from a worker process
+        return (self.__class__, (self.file,))
+
 class FileMissingAttributes(Exception):
     def __init__(self, file: str):
         self.message = f"The file '{file}' is missing crucial attributes."
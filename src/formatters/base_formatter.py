@@ -1,12 +1,22 @@
 """The Base Formatter used by all Providers to format their messages"""
 
 from abc import ABC, abstractmethod
+import heapq
 import logging
 import os
+from typing import List
 from config import BOT_IMAGE
+from src.helpers.coverage_baseline import BaselineComparison
+from src.helpers.coverage_merge import combine_classes
+from src.helpers.diff_coverage import DiffCoverage
 from src.helpers.github_action import GitHubActionInfo
-from src.models.data_reports import NormalisedCoverageData
-from src.models.test_suite import TestReport
+from src.models.coverage_tree import DirectoryCoverage
+from src.models.data_reports import FileCoverage, NormalisedCoverageData
+from src.models.test_suite import TestReport, TestSuite
+
+DEFAULT_LOWEST_COVERAGE_FILES = 5
+# Files with fewer executable lines are left out of the lowest coverage files
+DEFAULT_MIN_STATEMENTS = 10
 
 
 class BaseFormatter(ABC):
@@ -16,11 +26,16 @@ class BaseFormatter(ABC):
         self,
         coverage_report: NormalisedCoverageData,
         test_report: TestReport = None,
+        diff_coverage: DiffCoverage = None,
+        baseline_comparison: BaselineComparison = None,
     ):
         self.coverage_report = coverage_report
         self.test_report = test_report
+        self.diff_coverage = diff_coverage
+        self.baseline_comparison = baseline_comparison
         self.github_action = GitHubActionInfo()
         self.MAX_TEST_SHOWN = 4
+        self.MAX_MODULES_SHOWN = 5
         self.logger = logging.getLogger("webhook-reporter-logger")
     
     @abstractmethod
@@ -65,3 +80,57 @@ class BaseFormatter(ABC):
         elif rate < threshold * 0.8:
             return "critical"
         return "needs_improvement"
+
+    def diff_coverage_value(self) -> str:
+        """The diff coverage as shown next to the line coverage"""
+        rate = self.diff_coverage.line_rate
+        if rate is None:
+            return "No executable lines changed"
+        return f"{rate}% ({self.diff_coverage.lines_covered}/{self.diff_coverage.lines_valid} lines)"
+
+    def baseline_value(self) -> str:
+        """The change of the total rates since the baseline"""
+        return (
+            f"Line {self.baseline_comparison.line_rate_delta:+d}%,"
+            f" Branch {self.baseline_comparison.branch_rate_delta:+d}%"
+        )
+
+    def least_covered_modules(self) -> List[DirectoryCoverage]:
+        """Top-level modules with the lowest line coverage, none when the report has a single one"""
+        modules = self.coverage_report.least_covered_modules(self.MAX_MODULES_SHOWN)
+        return modules if len(modules) > 1 else []
+
+    def slowest_suites(self) -> List[TestSuite]:
+        """The suites the test report ranked slowest, none when it has a single one"""
+        suites = self.test_report.slowest_suites if self.test_report else []
+        return suites if len(suites) > 1 else []
+
+    def lowest_coverage_files(self) -> List[FileCoverage]:
+        """Files with the lowest line coverage, the `lowest_coverage_files` input sets how many.
+
+        Files with fewer executable lines than the `min_statements` input are
+        left out, so a three line module at 0% does not hide the ones that
+        matter. The files are picked with a bounded heap on the table's columns,
+        only the selected ones are built. Reports with a row per class (JaCoCo,
+        Clover) have the rows of each file added up by path first.
+        """
+        count = self._int_input("INPUT_LOWEST_COVERAGE_FILES", DEFAULT_LOWEST_COVERAGE_FILES)
+        min_statements = self._int_input("INPUT_MIN_STATEMENTS", DEFAULT_MIN_STATEMENTS)
+        files = self.coverage_report.files
+        # Files without executable lines, or without counts in the report, have no rate to show
+        min_statements = max(min_statements, 1)
+        if len(set(files.path_column)) < len(files):
+            combined = (file for file in combine_classes(files).values() if file.lines_valid >= min_statements)
+            return heapq.nsmallest(count, combined, key=lambda file: file.line_rate)
+        line_rate, lines_valid = files.columns["line_rate"], files.columns["lines_valid"]
+        candidates = (index for index in range(len(files)) if lines_valid[index] >= min_statements)
+        return [files[index] for index in heapq.nsmallest(count, candidates, key=line_rate.__getitem__)]
+
+    def _int_input(self, name: str, default: int) -> int:
+        """A whole number input, the default when it is not set or invalid"""
+        value = os.getenv(name)
+        try:
+            return max(int(value or default), 0)
+        except ValueError:
+            self.logger.warning(f"Invalid value '{value}' for {name}, using {default}")
+            return default
@@ -2,16 +2,53 @@
 
 from datetime import datetime
 import textwrap
-from typing import Dict, List
+from typing import Dict, List, Optional
 from discord import Any, Color, Embed, EmbedAuthor, EmbedField, EmbedFooter, EmbedMedia
 from src.formatters.base_formatter import BaseFormatter
 from src.formatters.utils.format_markdown import (
+    generate_baseline_summary,
+    generate_least_covered_summary,
+    generate_lowest_coverage_summary,
+    generate_slowest_suites_summary,
     generate_test_summary_by_status,
+    generate_uncovered_hunks_summary,
+    truncate_code_block,
 )
 from src.models.data_reports import CoverageMetricType
 
-MAX_DISCORD_EMBED_SIZE = 4096
-IGNORED_FIELDS = ["failure_summary", "slowest_tests"]
+# Characters of all the text of an embed: title, description, fields, footer and author
+MAX_DISCORD_EMBED_SIZE = 6000
+MAX_DISCORD_FIELD_SIZE = 1024
+MAX_DISCORD_FIELDS = 25
+IGNORED_FIELDS = ["failure_summary", "slowest_tests", "slowest_suites"]
+
+
+class EmbedBudget:
+    """Characters and fields an embed has left, Discord rejects an embed over either limit"""
+
+    def __init__(self, characters: int = MAX_DISCORD_EMBED_SIZE, fields: int = MAX_DISCORD_FIELDS):
+        self.characters = characters
+        self.fields = fields
+
+    def spend(self, *texts: Optional[str]):
+        self.characters -= sum(len(text or "") for text in texts)
+
+    def take(self, field: Optional[EmbedField]) -> Optional[EmbedField]:
+        """The field when it fits, None otherwise"""
+        if field is None or self.fields <= 0 or len(field.name) + len(field.value) > self.characters:
+            return None
+        self.fields -= 1
+        self.spend(field.name, field.value)
+        return field
+
+    def listing(self, name: str, block: str) -> Optional[EmbedField]:
+        """A field of the code block, cut with a "… N more" line to what is left"""
+        if not block or self.fields <= 0:
+            return None
+        value = truncate_code_block(block, min(MAX_DISCORD_FIELD_SIZE, self.characters - len(name)))
+        if not value:
+            return None
+        return self.take(EmbedField(name=name, value=value, inline=False))
 
 
 class DiscordFormatter(BaseFormatter):
@@ -38,19 +75,25 @@ class DiscordFormatter(BaseFormatter):
         """Create coverage report as an Embed"""
         thumbnail = EmbedMedia(url=self.github_action.actor_profile_img)
         message = self.get_test_summary_message() if self.test_report else ''
+        title = self.github_action.event_name  # LIMIT title Size
+        author = EmbedAuthor(
+            name="webhook-reporter",
+            url="https://github.com/Moeh-Jama/webhook-reporter",
+        )
+        footer = self.format_footer()
+        # The fields get what the rest of the embed leaves
+        budget = EmbedBudget()
+        budget.spend(title, message, author.name, footer.text)
         return Embed(
             timestamp=datetime.now(),
-            title=self.github_action.event_name,  # LIMIT title Size
+            title=title,
             url=self.github_action.reference_link,
             description=message,
             color=self._threshold_color(),
             thumbnail=thumbnail,
-            fields=self._fields(),
-            author=EmbedAuthor(
-                name="webhook-reporter",
-                url="https://github.com/Moeh-Jama/webhook-reporter",
-            ),
-            footer=self.format_footer(),
+            fields=self._fields(budget),
+            author=author,
+            footer=footer,
         )
 
     def format_test_report(self):
@@ -74,40 +117,61 @@ class DiscordFormatter(BaseFormatter):
             return Color.yellow()
         return Color.brand_red()
 
-    def _fields(self) -> List[EmbedField]:
-        """Returns all Embed fields based on given coverage_report"""
+    def _fields(self, budget: EmbedBudget = None) -> List[EmbedField]:
+        """Returns all Embed fields based on given coverage_report.
+
+        The short fields are counted against the embed's budget first, the
+        listings then share what is left in the order they are shown.
+        """
+        budget = budget or EmbedBudget()
 
-        field_metrics: List[EmbedField] = []
-        # Line Rate
-        field_metrics.append(
+        # Line Rate, Complexity, Total
+        metrics = [
             EmbedField(
                 name=self._format_field_name(CoverageMetricType.LINE_COVERAGE),
                 value=str(self.coverage_report.total_line_rate) + "%",
                 inline=True,
-            )
-        )
-        # Complexity
-        field_metrics.append(
+            ),
             EmbedField(
                 name=self._format_field_name(CoverageMetricType.COMPLEXITY_AVG),
                 value=str(self.coverage_report.complexity_avg),
                 inline=True,
-            )
-        )
-        # Total
-        field_metrics.append(
+            ),
             EmbedField(
                 name=self._format_field_name(CoverageMetricType.TOTAL),
                 value=str(self.coverage_report.total),
                 inline=True,
-            )
+            ),
+        ]
+        diff_coverage = None
+        if self.diff_coverage:
+            diff_coverage = EmbedField(name="Diff coverage", value=self.diff_coverage_value(), inline=True)
+        baseline = None
+        if self.baseline_comparison:
+            baseline = EmbedField(name="Coverage vs baseline", value=self.baseline_value(), inline=True)
+        test_fields = self._test_fields(self.test_report.get_summary()) if self.test_report else []
+        metrics = [budget.take(field) for field in metrics]
+        diff_coverage, baseline = budget.take(diff_coverage), budget.take(baseline)
+        test_fields = [budget.take(field) for field in test_fields]
+
+        listings = []
+        if self.diff_coverage:
+            hunks = generate_uncovered_hunks_summary(self.diff_coverage.worst_hunks)
+            listings.append(budget.listing("Uncovered changes", hunks))
+        modules = generate_least_covered_summary(self.least_covered_modules())
+        listings.append(budget.listing("Least covered modules", modules))
+        lowest_files = generate_lowest_coverage_summary(self.lowest_coverage_files())
+        listings.append(budget.listing("Lowest coverage files", lowest_files))
+        baseline_changes = None
+        if self.baseline_comparison:
+            summary = generate_baseline_summary(self.baseline_comparison)
+            baseline_changes = budget.listing("Changes since the baseline", summary)
+        slowest_suites = budget.listing("Slowest suites", generate_slowest_suites_summary(self.slowest_suites()))
+
+        fields = (
+            metrics + [diff_coverage] + listings + [baseline, baseline_changes] + test_fields + [slowest_suites]
         )
-
-        if self.test_report:
-            test_fields = self._test_fields(self.test_report.get_summary())
-            field_metrics.extend(test_fields)
-
-        return field_metrics
+        return [field for field in fields if field is not None]
 
     def _format_field_name(self, field: CoverageMetricType) -> str:
         """Gets prettified name"""
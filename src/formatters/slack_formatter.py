@@ -1,10 +1,18 @@
+from itertools import islice
 import textwrap
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Iterable, List, Union
 
 from src.formatters.base_formatter import BaseFormatter
+from src.formatters.utils.format_markdown import (
+    generate_baseline_summary,
+    generate_least_covered_summary,
+    generate_lowest_coverage_summary,
+    generate_slowest_suites_summary,
+    generate_uncovered_hunks_summary,
+)
 from src.models.test_suite import TestCase, TestResult
 
-IGNORED_FIELDS = ["failure_summary", "slowest_tests"]
+IGNORED_FIELDS = ["failure_summary", "slowest_tests", "slowest_suites"]
 
 
 class SlackFormatter(BaseFormatter):
@@ -88,8 +96,38 @@ class SlackFormatter(BaseFormatter):
 
         section.extend(coverage_status)
 
+        if self.diff_coverage:
+            section.append(self._diff_coverage_section())
+
+        modules = generate_least_covered_summary(self.least_covered_modules())
+        if modules:
+            section.append(
+                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Least Covered Modules:*\n{modules}"}}
+            )
+
+        lowest_files = generate_lowest_coverage_summary(self.lowest_coverage_files())
+        if lowest_files:
+            section.append(
+                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Lowest Coverage Files:*\n{lowest_files}"}}
+            )
+
+        if self.baseline_comparison:
+            text = f"*Coverage vs Baseline:* {self.baseline_value()}"
+            changes = generate_baseline_summary(self.baseline_comparison)
+            if changes:
+                text += f"\n{changes}"
+            section.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
+
         return section
 
+    def _diff_coverage_section(self) -> Dict[str, Any]:
+        """Diff coverage, and the added lines that were not run"""
+        text = f"*Diff Coverage:* {self.diff_coverage_value()}"
+        hunks = generate_uncovered_hunks_summary(self.diff_coverage.worst_hunks)
+        if hunks:
+            text += f"\n{hunks}"
+        return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
     def _action_image(self) -> Dict[str, Union[str, Dict[str, str]]]:
         """Returns the associated image of the given triggered action"""
         return {
@@ -110,13 +148,16 @@ class SlackFormatter(BaseFormatter):
 
         highlight = self._highlight_tests_message()
         if highlight:
-            sections.extend(
-                [
-                    self._header_block(":clipboard: Test Details"),
-                    {"type": "section", "text": {"type": "mrkdwn", "text": highlight}},
-                ]
+            sections.append({"type": "section", "text": {"type": "mrkdwn", "text": highlight}})
+
+        slowest_suites = generate_slowest_suites_summary(self.slowest_suites())
+        if slowest_suites:
+            sections.append(
+                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Slowest Suites:*\n{slowest_suites}"}}
             )
 
+        if sections:
+            sections.insert(0, self._header_block(":clipboard: Test Details"))
         return sections
 
     def _highlight_tests_message(self) -> str:
@@ -128,19 +169,24 @@ class SlackFormatter(BaseFormatter):
             (TestResult.FAILED, ":x:"),
             (TestResult.ERROR, ":warning:"),
         ]:
-            tests = self.test_report.get_tests_by_status(test_status=status)
-            if tests:
-                title = f"{icon} *{status.name.capitalize()}* ({len(tests)})"
+            count = self.test_report.count_tests_by_status(test_status=status)
+            if count:
+                title = f"{icon} *{status.name.capitalize()}* ({count})"
+                if status == TestResult.SKIPPED:
+                    tests = self.test_report.iter_tests_by_status(test_status=status)
+                else:
+                    # Tests that failed the same way are shown once
+                    tests = self.test_report.get_failure_clusters(test_status=status)
                 output += self._format_lists(title=title, tests=tests)
 
         return output.strip()
 
-    def _format_lists(self, title: str, tests: List[TestCase]) -> str:
+    def _format_lists(self, title: str, tests: Iterable[TestCase]) -> str:
         """Returns formatted markdown sections with formatted title section"""
         if not tests:
             return ""
         message = "```"
-        for test in tests[:self.MAX_TEST_SHOWN]:
+        for test in islice(tests, self.MAX_TEST_SHOWN):
             test_msg = test.message or ""
             test_case_message = ""
             if test_msg:
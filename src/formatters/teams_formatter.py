@@ -1,10 +1,18 @@
+from itertools import islice
 import textwrap
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 from src.formatters.base_formatter import BaseFormatter
+from src.formatters.utils.format_markdown import (
+    generate_baseline_summary,
+    generate_least_covered_summary,
+    generate_lowest_coverage_summary,
+    generate_slowest_suites_summary,
+    generate_uncovered_hunks_summary,
+)
 from src.models.teams_model import Column, ColumnSet, Container, Image, Item, TextBlock
 from src.models.test_suite import TestCase, TestIcons, TestResult
 
-IGNORED_FIELDS = ["failure_summary", "slowest_tests"]
+IGNORED_FIELDS = ["failure_summary", "slowest_tests", "slowest_suites"]
 
 
 class TeamsFormatter(BaseFormatter):
@@ -27,6 +35,26 @@ class TeamsFormatter(BaseFormatter):
         # Add Coverage Section
         body_section.extend([col_set.to_dict() for col_set in coverage_section])
 
+        if self.diff_coverage:
+            body_section.append(self.format_diff_coverage().to_dict())
+
+        modules = generate_least_covered_summary(self.least_covered_modules())
+        if modules:
+            header = TextBlock(text="**Least Covered Modules**", wrap=True)
+            body_section.append(Container(items=[header, TextBlock(text=modules, wrap=True)]).to_dict())
+
+        lowest_files = generate_lowest_coverage_summary(self.lowest_coverage_files())
+        if lowest_files:
+            header = TextBlock(text="**Lowest Coverage Files**", wrap=True)
+            body_section.append(Container(items=[header, TextBlock(text=lowest_files, wrap=True)]).to_dict())
+
+        if self.baseline_comparison:
+            items = [TextBlock(text=f"**Coverage vs Baseline** {self.baseline_value()}", wrap=True)]
+            changes = generate_baseline_summary(self.baseline_comparison)
+            if changes:
+                items.append(TextBlock(text=changes, wrap=True))
+            body_section.append(Container(items=items).to_dict())
+
         if test_report_section:
             body_section.extend([item.to_dict() for item in test_report_section])
 
@@ -71,6 +99,14 @@ class TeamsFormatter(BaseFormatter):
 
         return overview_set
 
+    def format_diff_coverage(self) -> Container:
+        """Diff coverage, and the added lines that were not run"""
+        items = [TextBlock(text=f"**Diff Coverage** {self.diff_coverage_value()}", wrap=True)]
+        hunks = generate_uncovered_hunks_summary(self.diff_coverage.worst_hunks)
+        if hunks:
+            items.append(TextBlock(text=hunks, wrap=True))
+        return Container(items=items)
+
     def get_base_coverage_fields(self) -> List[Column]:
         """Base Column Fields"""
         line_rate = self._name_value_column(
@@ -125,6 +161,11 @@ class TeamsFormatter(BaseFormatter):
         test_results = self._highlight_messages()
         section += test_results
 
+        slowest_suites = generate_slowest_suites_summary(self.slowest_suites())
+        if slowest_suites:
+            header = TextBlock(text="**Slowest Suites**", wrap=True)
+            section.append(Container(items=[header, TextBlock(text=slowest_suites, wrap=True)]))
+
         return section
     
     def _highlight_messages(self) -> List[Container]:
@@ -134,21 +175,26 @@ class TeamsFormatter(BaseFormatter):
             (TestResult.FAILED, TestIcons.FAILED.value),
             (TestResult.ERROR, TestIcons.ERROR.value),
         ]:
-            tests = self.test_report.get_tests_by_status(test_status=status)
-            if tests:
-                title = f"{icon} *{status.name.capitalize()}* ({len(tests)})"
+            count = self.test_report.count_tests_by_status(test_status=status)
+            if count:
+                title = f"{icon} *{status.name.capitalize()}* ({count})"
+                if status == TestResult.SKIPPED:
+                    tests = self.test_report.iter_tests_by_status(test_status=status)
+                else:
+                    # Tests that failed the same way are shown once
+                    tests = self.test_report.get_failure_clusters(test_status=status)
                 container = self.test_message_summary(title=title, tests=tests)
                 if container:
                     output.append(container)
 
         return output
     
-    def test_message_summary(self, title: str, tests: List[TestCase]) -> Container:
+    def test_message_summary(self, title: str, tests: Iterable[TestCase]) -> Container:
 
         header = TextBlock(text=title, wrap=True)
 
         message = "```javascript"
-        for test in tests[:self.MAX_TEST_SHOWN]:
+        for test in islice(tests, self.MAX_TEST_SHOWN):
             test_msg = test.message or ""
             test_case_message = f"{textwrap.dedent(test_msg).strip()[:250]}\n" if test_msg else ""
             message += f"\n{test.name}:\n{test_case_message}"
@@ -1,11 +1,20 @@
 """Module to hold markdown formatting code units"""
 
+from itertools import islice
+from math import floor
 import textwrap
-from typing import List
-from src.models.test_suite import TestCase, TestIcons, TestReport, TestResult
+from typing import Iterable, List, Tuple
+from src.helpers.coverage_baseline import BaselineComparison
+from src.helpers.diff_coverage import UncoveredHunk
+from src.models.coverage_tree import DirectoryCoverage
+from src.models.data_reports import FileCoverage
+from src.models.test_suite import TestCase, TestIcons, TestReport, TestResult, TestSuite
 
 def generate_test_summary_by_status(test_report: TestReport, markdown_style: str = '') -> str:
     """Generates a formatted message highlighting test results by status.
+
+    Failures and errors are listed by cluster, tests that failed the same way
+    are shown once as "N tests failed with".
     
     Args:
         test_report (TestReport): The given test report we get the test_cases from.
@@ -15,7 +24,8 @@ def generate_test_summary_by_status(test_report: TestReport, markdown_style: str
 
     skipped = generate_test_status_summary(
         title="Skipped Tests",
-        tests=test_report.get_tests_by_status(test_status=TestResult.SKIPPED),
+        tests=test_report.iter_tests_by_status(test_status=TestResult.SKIPPED),
+        count=test_report.count_tests_by_status(test_status=TestResult.SKIPPED),
         markdown_style=markdown_style,
     )
     if skipped:
@@ -23,7 +33,8 @@ def generate_test_summary_by_status(test_report: TestReport, markdown_style: str
 
     failures = generate_test_status_summary(
         title="Failed Tests",
-        tests=test_report.get_tests_by_status(test_status=TestResult.FAILED),
+        tests=test_report.get_failure_clusters(test_status=TestResult.FAILED),
+        count=test_report.count_tests_by_status(test_status=TestResult.FAILED),
         markdown_style=markdown_style,
     )
     if failures:
@@ -31,7 +42,8 @@ def generate_test_summary_by_status(test_report: TestReport, markdown_style: str
 
     errors = generate_test_status_summary(
         title="Errors",
-        tests=test_report.get_tests_by_status(test_status=TestResult.ERROR),
+        tests=test_report.get_failure_clusters(test_status=TestResult.ERROR),
+        count=test_report.count_tests_by_status(test_status=TestResult.ERROR),
         markdown_style=markdown_style,
     )
     if errors:
@@ -41,13 +53,16 @@ def generate_test_summary_by_status(test_report: TestReport, markdown_style: str
 
 
 
-def generate_test_status_summary(title: str, tests: List[TestCase], markdown_style: str = '') -> str:
+def generate_test_status_summary(
+    title: str, tests: Iterable[TestCase], markdown_style: str = '', count: int = None
+) -> str:
     """Returns a formatted markdown string with a title and a list of test cases.
     
     Args:
         title (str): The title to be included in the markdown, which will be capitalized.
-        tests (List[TestCase]): A list of test cases to be formatted. Only the first few are included in the output.
+        tests (Iterable[TestCase]): The test cases to be formatted. Only the first few are read and included in the output.
         markdown_style (str): The style of the markdown code block. Defaults to an empty string, which means no specific language is specified.
+        count (int): The number of test cases, required when `tests` is an iterator. Defaults to len(tests).
     
     Returns:
         str: A markdown-formatted string including the title and the formatted test cases.
@@ -56,15 +71,136 @@ def generate_test_status_summary(title: str, tests: List[TestCase], markdown_sty
     The function iterates over the first few test cases (up to 4) and creates a formatted list of messages.
     """
     
-    if not tests:
+    if count is None:
+        count = len(tests)
+    if not count:
         return ""
 
-    title = f"__**{title.capitalize()}**__ ({len(tests)})"
+    title = f"__**{title.capitalize()}**__ ({count})"
     message = f"```{markdown_style}"
-    for test in tests[:4]: # TODO: get MAX
+    for test in islice(tests, 4): # TODO: get MAX
         test_msg = test.message or ""
         test_case_message = f"{textwrap.dedent(test_msg).strip()[:250]}\n" if test_msg else ""
         message += f"\n{test.name}:\n{test_case_message}"
     message += "```"
     return f"{title}\n{message}"
 
+
+def generate_uncovered_hunks_summary(hunks: Iterable[UncoveredHunk], markdown_style: str = '') -> str:
+    """Returns a markdown code block listing the added lines that were not run, a hunk per line.
+
+    Args:
+        hunks (Iterable[UncoveredHunk]): The hunks to list, worst first.
+        markdown_style (str): The style of the markdown code block. Defaults to an empty string.
+    """
+    lines = [f"{hunk.name} ({hunk.lines_uncovered}/{hunk.lines_valid} lines not run)" for hunk in hunks]
+    if not lines:
+        return ""
+    return f"```{markdown_style}\n" + "\n".join(lines) + "```"
+
+
+def generate_least_covered_summary(modules: List[DirectoryCoverage], markdown_style: str = '') -> str:
+    """Returns a markdown code block with the line coverage of each module, a module per line.
+
+    Args:
+        modules (List[DirectoryCoverage]): The modules to list, least covered first.
+        markdown_style (str): The style of the markdown code block. Defaults to an empty string.
+    """
+    rows = [(module.path, module.line_rate, module.lines_covered, module.lines_valid) for module in modules]
+    return _coverage_table(rows, markdown_style)
+
+
+def generate_lowest_coverage_summary(files: List[FileCoverage], markdown_style: str = '') -> str:
+    """Returns a markdown code block with the line coverage of each file by its path, a file per line.
+
+    Args:
+        files (List[FileCoverage]): The files to list, least covered first.
+        markdown_style (str): The style of the markdown code block. Defaults to an empty string.
+    """
+    rows = [(file.path, file.line_rate, file.lines_covered, file.lines_valid) for file in files]
+    return _coverage_table(rows, markdown_style)
+
+
+def generate_slowest_suites_summary(suites: List[TestSuite], markdown_style: str = '') -> str:
+    """Returns a markdown code block with the time of each test suite, a suite per line.
+
+    Args:
+        suites (List[TestSuite]): The suites to list, slowest first.
+        markdown_style (str): The style of the markdown code block. Defaults to an empty string.
+    """
+    if not suites:
+        return ""
+    names = [suite.name or "" for suite in suites]
+    width = max(len(name) for name in names)
+    lines = [f"{name.ljust(width)} {suite.time:.2f}s" for name, suite in zip(names, suites)]
+    return f"```{markdown_style}\n" + "\n".join(lines) + "```"
+
+
+def generate_baseline_summary(comparison: BaselineComparison, markdown_style: str = '', count: int = None) -> str:
+    """Returns a markdown code block with the files that lost coverage since the baseline, and the new and deleted files.
+
+    Args:
+        comparison (BaselineComparison): The comparison with the baseline report.
+        markdown_style (str): The style of the markdown code block. Defaults to an empty string.
+        count (int): The number of files listed per kind of change. Defaults to all the comparison kept.
+    """
+    if count is not None:
+        count = max(count, 0)
+    lines = []
+    if comparison.regressions:
+        lines.append("Regressions:")
+        for delta in comparison.regressions[:count]:
+            changes = []
+            if delta.line_delta < 0:
+                changes.append(_rate_change(delta.base_line_rate, delta.line_rate))
+            if delta.branch_delta < 0:
+                changes.append("branches " + _rate_change(delta.base_branch_rate, delta.branch_rate))
+            lines.append(f"{delta.filename} " + ", ".join(changes))
+    for title, files, total in [
+        ("New files", comparison.new_files, comparison.new_file_count),
+        ("Deleted files", comparison.deleted_files, comparison.deleted_file_count),
+    ]:
+        if total:
+            lines.append(f"{title} ({total}):")
+            lines.extend(files[:count])
+    if not lines:
+        return ""
+    return f"```{markdown_style}\n" + "\n".join(lines) + "```"
+
+
+def truncate_code_block(block: str, limit: int) -> str:
+    """Returns the code block cut to at most `limit` characters at a line, ending with a "… N more" line.
+
+    Args:
+        block (str): A markdown code block, as the summaries above return.
+        limit (int): The number of characters the block can take.
+
+    Returns:
+        str: The block when it fits, else as many of its first lines as fit, or an empty string when none do.
+    """
+    if len(block) <= limit:
+        return block
+    opening, _, body = block.partition("\n")
+    lines = body[: -len("```")].split("\n")
+    for kept in range(len(lines) - 1, 0, -1):
+        cut = f"{opening}\n" + "\n".join(lines[:kept] + [f"… {len(lines) - kept} more"]) + "```"
+        if len(cut) <= limit:
+            return cut
+    return ""
+
+
+def _coverage_table(rows: List[Tuple[str, float, int, int]], markdown_style: str) -> str:
+    """Code block of (name, line rate, lines covered, lines valid) rows, names aligned"""
+    if not rows:
+        return ""
+    width = max(len(name) for name, *_ in rows)
+    lines = [
+        f"{name.ljust(width)} {floor(line_rate * 100)}% ({lines_covered}/{lines_valid} lines)"
+        for name, line_rate, lines_covered, lines_valid in rows
+    ]
+    return f"```{markdown_style}\n" + "\n".join(lines) + "```"
+
+
+def _rate_change(base_rate: float, rate: float) -> str:
+    """base% → rate% (delta%)"""
+    return f"{floor(base_rate * 100)}% → {floor(rate * 100)}% ({round((rate - base_rate) * 100):+d}%)"
@@ -0,0 +1,110 @@
+"""Per-file coverage compared with a baseline report.
+
+The `baseline_coverage` input (INPUT_BASELINE_COVERAGE) names an earlier
+coverage report, e.g. the main branch's coverage XML or a snapshot written
+with `snapshot_dir`. The two reports are joined on the files' paths through a dict of
+the baseline's files, one pass over each, so the comparison grows linearly
+with the number of files.
+"""
+
+from dataclasses import dataclass, field
+import heapq
+from itertools import islice
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.helpers.coverage_merge import combine_classes
+from src.models.data_reports import FileCoverageTable, NormalisedCoverageData
+
+# Files listed per change kind
+FILES_SHOWN = 5
+
+
+def baseline_coverage_file() -> Optional[str]:
+    """The `baseline_coverage` input, None when it is not set"""
+    return os.getenv("INPUT_BASELINE_COVERAGE", "").strip() or None
+
+
+@dataclass
+class FileCoverageDelta:
+    """A file's rates in the report and in the baseline"""
+
+    # The file's path, see FileCoverage.path
+    filename: str
+    line_rate: float
+    base_line_rate: float
+    branch_rate: float
+    base_branch_rate: float
+
+    @property
+    def line_delta(self) -> float:
+        return self.line_rate - self.base_line_rate
+
+    @property
+    def branch_delta(self) -> float:
+        return self.branch_rate - self.base_branch_rate
+
+    @property
+    def largest_drop(self) -> float:
+        """The more negative of the two deltas"""
+        return min(self.line_delta, self.branch_delta)
+
+
+@dataclass
+class BaselineComparison:
+    """How the report's coverage moved from the baseline's"""
+
+    # Whole percentages, like the reports' total rates
+    line_rate_delta: int
+    branch_rate_delta: int
+    # Files whose line or branch rate dropped, largest drop of either first
+    regressions: List[FileCoverageDelta] = field(default_factory=list)
+    new_files: List[str] = field(default_factory=list)
+    deleted_files: List[str] = field(default_factory=list)
+    new_file_count: int = 0
+    deleted_file_count: int = 0
+
+
+def compare_to_baseline(
+    report: NormalisedCoverageData, baseline: NormalisedCoverageData, count: int = FILES_SHOWN
+) -> BaselineComparison:
+    """Joins the files of both reports on their paths.
+
+    A file regressed when its line rate or its branch rate dropped. Only the
+    `count` largest regressions and the first `count` new and deleted files
+    are kept, along with how many there are.
+    """
+    base_rates = _file_rates(baseline.files)
+    comparison = BaselineComparison(
+        line_rate_delta=report.total_line_rate - baseline.total_line_rate,
+        branch_rate_delta=report.total_branch_rate - baseline.total_branch_rate,
+    )
+    regressions = []
+    for filename, (line_rate, branch_rate) in _file_rates(report.files).items():
+        base = base_rates.pop(filename, None)
+        if base is None:
+            comparison.new_file_count += 1
+            if len(comparison.new_files) < count:
+                comparison.new_files.append(filename)
+        elif line_rate < base[0] or branch_rate < base[1]:
+            regressions.append(FileCoverageDelta(filename, line_rate, base[0], branch_rate, base[1]))
+    # What is left of the baseline's files is not in the report anymore
+    comparison.deleted_file_count = len(base_rates)
+    comparison.deleted_files = list(islice(base_rates, count))
+    comparison.regressions = heapq.nsmallest(count, regressions, key=lambda delta: delta.largest_drop)
+    return comparison
+
+
+def _file_rates(files: FileCoverageTable) -> Dict[str, Tuple[float, float]]:
+    """(line rate, branch rate) by path, read off the table's columns"""
+    filenames = files.filenames
+    rates = dict(
+        zip(
+            (filenames[path_id] for path_id in files.path_column),
+            zip(files.columns["line_rate"], files.columns["branch_rate"]),
+        )
+    )
+    if len(rates) == len(files):
+        return rates
+    # A file is a row per class in some reports, the rows of a file are added up
+    return {path: (file.line_rate, file.branch_rate) for path, file in combine_classes(files).items()}
@@ -0,0 +1,145 @@
+"""Combines the coverage reports of a sharded run into one"""
+
+from dataclasses import replace
+from typing import Dict, List, Optional, Set
+
+from src.models.data_reports import FileCoverage, FileLineHits, NormalisedCoverageData
+
+
+def merge_coverage_reports(reports: List[NormalisedCoverageData]) -> NormalisedCoverageData:
+    """Merges per-file coverage by path using the raw counts.
+
+    Within one report the entries of a file (one per class) cover different
+    lines and are added up. Across reports the shards ran the same file and a
+    line is covered when any of them hit it, so the shards' line hits are
+    merged and the file's counts are taken from them: two shards covering
+    different halves of a file make it fully covered. `load_reports` collects
+    line hits whenever it merges. A file that a report gave no line hits for
+    keeps the count of its most covered shard, a lower bound of the combined
+    coverage. Rates are only used for files whose report did not give counts.
+    """
+    if len(reports) == 1:
+        return reports[0]
+
+    line_hits = _merge_line_hits(reports)
+    merged: Dict[str, FileCoverage] = {}
+    # Files some report has no line hits for
+    without_line_hits: Set[str] = set()
+    for report in reports:
+        report_line_hits = report.line_hits or {}
+        for path, file in combine_classes(report.files).items():
+            if path not in report_line_hits:
+                without_line_hits.add(path)
+            current = merged.get(path)
+            merged[path] = file if current is None else _best_of(current, file)
+
+    files = [
+        file if path in without_line_hits else _from_line_hits(file, line_hits[path])
+        for path, file in merged.items()
+    ]
+    lines_covered = sum(file.lines_covered for file in files)
+    lines_valid = sum(file.lines_valid for file in files)
+    branches_covered = sum(file.branches_covered for file in files)
+    branches_valid = sum(file.branches_valid for file in files)
+    if not lines_valid:
+        # None of the files have counts, fall back to the reports' own ones
+        lines_covered = sum(report.lines_covered for report in reports)
+        lines_valid = sum(report.lines_valid for report in reports)
+        branches_covered = sum(report.branches_covered for report in reports)
+        branches_valid = sum(report.branches_valid for report in reports)
+
+    # The reports' totals are already percentages
+    total_line_rate = _rate(lines_covered, lines_valid, max(r.total_line_rate for r in reports) / 100)
+    total_branch_rate = _rate(
+        branches_covered, branches_valid, max(r.total_branch_rate for r in reports) / 100
+    )
+    return NormalisedCoverageData(
+        total_line_rate=total_line_rate,
+        total_branch_rate=total_branch_rate,
+        files=files,
+        timestamp=reports[0].timestamp,
+        lines_covered=lines_covered,
+        lines_valid=lines_valid,
+        branches_covered=branches_covered,
+        branches_valid=branches_valid,
+        line_hits=line_hits,
+    )
+
+
+def _merge_line_hits(reports: List[NormalisedCoverageData]) -> Optional[Dict[str, FileLineHits]]:
+    """Union of the reports' line hits, None when none of them have any"""
+    if all(report.line_hits is None for report in reports):
+        return None
+    merged: Dict[str, FileLineHits] = {}
+    for report in reports:
+        for path, line_hits in (report.line_hits or {}).items():
+            current = merged.get(path)
+            merged[path] = line_hits if current is None else current.merge(line_hits)
+    return merged
+
+
+def combine_classes(files: List[FileCoverage]) -> Dict[str, FileCoverage]:
+    """Adds up the entries of a report that belong to the same file, by path"""
+    combined: Dict[str, FileCoverage] = {}
+    for file in files:
+        current = combined.get(file.path)
+        if current is None:
+            combined[file.path] = file
+            continue
+        lines_covered = current.lines_covered + file.lines_covered
+        lines_valid = current.lines_valid + file.lines_valid
+        branches_covered = current.branches_covered + file.branches_covered
+        branches_valid = current.branches_valid + file.branches_valid
+        combined[file.path] = FileCoverage(
+            filename=file.filename,
+            line_rate=_rate(lines_covered, lines_valid, max(current.line_rate, file.line_rate)),
+            branch_rate=_rate(branches_covered, branches_valid, max(current.branch_rate, file.branch_rate)),
+            complexity=current.complexity + file.complexity,
+            lines_covered=lines_covered,
+            lines_valid=lines_valid,
+            branches_covered=branches_covered,
+            branches_valid=branches_valid,
+            path=file.path,
+        )
+    return combined
+
+
+def _best_of(current: FileCoverage, other: FileCoverage) -> FileCoverage:
+    """The same file reported by two shards, without line hits to combine"""
+    lines_covered = max(current.lines_covered, other.lines_covered)
+    lines_valid = max(current.lines_valid, other.lines_valid)
+    branches_covered = max(current.branches_covered, other.branches_covered)
+    branches_valid = max(current.branches_valid, other.branches_valid)
+    return replace(
+        current,
+        line_rate=_rate(lines_covered, lines_valid, max(current.line_rate, other.line_rate)),
+        branch_rate=_rate(branches_covered, branches_valid, max(current.branch_rate, other.branch_rate)),
+        complexity=max(current.complexity, other.complexity),
+        lines_covered=lines_covered,
+        lines_valid=lines_valid,
+        branches_covered=branches_covered,
+        branches_valid=branches_valid,
+    )
+
+
+def _from_line_hits(file: FileCoverage, line_hits: FileLineHits) -> FileCoverage:
+    """The file's counts taken from its merged line hits"""
+    lines_covered = line_hits.lines_covered
+    lines_valid = len(line_hits)
+    # A line's branches are the same in every shard, the most covered count was kept
+    branches_covered = sum(line_hits.branches_covered)
+    branches_valid = sum(line_hits.branches_valid)
+    return replace(
+        file,
+        line_rate=_rate(lines_covered, lines_valid, file.line_rate),
+        branch_rate=_rate(branches_covered, branches_valid, file.branch_rate),
+        lines_covered=lines_covered,
+        lines_valid=lines_valid,
+        branches_covered=branches_covered,
+        branches_valid=branches_valid,
+    )
+
+
+def _rate(covered: int, valid: int, fallback: float) -> float:
+    """covered / valid, or `fallback` when there is nothing counted"""
+    return covered / valid if valid else fallback
@@ -0,0 +1,235 @@
+"""Coverage of the lines a change adds, from a unified diff.
+
+The `diff_file` input (INPUT_DIFF_FILE) names a unified diff, e.g. written by
+`git diff origin/main...HEAD > changes.diff` in an earlier step. The lines
+each hunk adds are looked up in the per-line hits of the coverage report:
+both are sorted by line number, so each run of added lines is two bisections
+into the file's lines, however many lines the report has.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+import heapq
+from math import floor
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models.data_reports import FileLineHits
+
+# Hunks kept for the summaries
+WORST_HUNKS = 5
+# Uncovered runs named per hunk
+RANGES_SHOWN = 3
+
+HUNK_HEADER = re.compile(rb"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def diff_file() -> Optional[str]:
+    """The `diff_file` input, None when it is not set"""
+    return os.getenv("INPUT_DIFF_FILE", "").strip() or None
+
+
+@dataclass
+class DiffHunk:
+    """A hunk of the diff, with the runs of lines it adds as (first, last)"""
+
+    start: int
+    added: List[Tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass
+class UncoveredHunk:
+    """A hunk whose added lines were not all run"""
+
+    path: str
+    start: int
+    lines_valid: int
+    # Runs of executable added lines that were not hit, as (first, last)
+    uncovered: List[Tuple[int, int]]
+    lines_uncovered: int
+
+    @property
+    def name(self) -> str:
+        """path:first-last, ... of the first few uncovered runs"""
+        shown = self.uncovered[:RANGES_SHOWN]
+        ranges = ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in shown)
+        more = ", …" if len(self.uncovered) > RANGES_SHOWN else ""
+        return f"{self.path}:{ranges}{more}"
+
+
+@dataclass
+class DiffCoverage:
+    """Executable lines the diff adds, and how many of them were covered"""
+
+    lines_covered: int = 0
+    lines_valid: int = 0
+    files: int = 0
+    # Most uncovered lines first
+    worst_hunks: List[UncoveredHunk] = field(default_factory=list)
+
+    @property
+    def line_rate(self) -> Optional[int]:
+        """Percentage of the added lines covered, None when none are executable"""
+        if not self.lines_valid:
+            return None
+        return floor(self.lines_covered / self.lines_valid * 100)
+
+
+def parse_unified_diff(diff_path: str) -> Dict[str, List[DiffHunk]]:
+    """Hunks of each file the diff adds lines to, by the file's new path.
+
+    The diff is read a line at a time. Hunk bodies are delimited by the line
+    counts of their header, so added lines that look like headers ("+++...")
+    are counted as lines. Deleted files and hunks that only remove are left out.
+    """
+    changes: Dict[str, List[DiffHunk]] = {}
+    path = None
+    old_remaining = new_remaining = 0
+    hunk = None
+    with open(diff_path, "rb") as diff:
+        for line in diff:
+            if old_remaining > 0 or new_remaining > 0:
+                marker = line[:1]
+                if marker == b"+":
+                    _add_line(hunk, hunk_line)
+                    hunk_line += 1
+                    new_remaining -= 1
+                elif marker == b"-":
+                    old_remaining -= 1
+                elif marker != b"\\":
+                    # Context, a blank context line can lose its leading space
+                    hunk_line += 1
+                    old_remaining -= 1
+                    new_remaining -= 1
+                continue
+
+            if line.startswith(b"+++ "):
+                path = _diff_path(line[4:])
+                continue
+            match = HUNK_HEADER.match(line)
+            if match is None or path is None:
+                continue
+            old_remaining = int(match.group(1) or 1)
+            hunk_line = int(match.group(2))
+            new_remaining = int(match.group(3) or 1)
+            hunk = DiffHunk(start=hunk_line)
+            changes.setdefault(path, []).append(hunk)
+
+    # Hunks that only remove lines have nothing to cover
+    for path in list(changes):
+        changes[path] = [hunk for hunk in changes[path] if hunk.added]
+        if not changes[path]:
+            del changes[path]
+    return changes
+
+
+def compute_diff_coverage(
+    changes: Dict[str, List[DiffHunk]], line_hits: Dict[str, FileLineHits], worst: int = WORST_HUNKS
+) -> DiffCoverage:
+    """Intersects the added lines with the line hits of the report.
+
+    Files of the diff that are not in the report (docs, tests, files the
+    coverage run does not measure) are left out.
+    """
+    paths = SourcePaths(line_hits)
+    coverage = DiffCoverage()
+
+    def uncovered_hunks():
+        for path, hunks in changes.items():
+            source = paths.match(path)
+            if source is None:
+                continue
+            coverage.files += 1
+            file_hits = line_hits[source]
+            for hunk in hunks:
+                uncovered_hunk = _hunk_coverage(path, hunk, file_hits, coverage)
+                if uncovered_hunk is not None:
+                    yield uncovered_hunk
+
+    # nlargest is stable, hunks missing as many lines keep the diff's order
+    coverage.worst_hunks = heapq.nlargest(worst, uncovered_hunks(), key=lambda hunk: hunk.lines_uncovered)
+    return coverage
+
+
+class SourcePaths:
+    """Finds the report's name for a path of the diff.
+
+    Reports name files relative to their source root ("org/example/Main.java",
+    "app/api.py") or by absolute path, the diff relative to the repository. The
+    two match when one's path components end with all of the other's, the
+    longest such match wins.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self._paths: Dict[str, str] = {}
+        self._by_name: Dict[str, List[Tuple[str, ...]]] = defaultdict(list)
+        for path in paths:
+            parts = _split(path)
+            self._paths["/".join(parts)] = path
+            if parts:
+                self._by_name[parts[-1]].append(parts)
+
+    def match(self, path: str) -> Optional[str]:
+        parts = _split(path)
+        exact = self._paths.get("/".join(parts))
+        if exact is not None or not parts:
+            return exact
+        best, best_length = None, 0
+        for candidate in self._by_name.get(parts[-1], ()):
+            length = min(len(candidate), len(parts))
+            if candidate[-length:] == parts[-length:] and length > best_length:
+                best, best_length = candidate, length
+        return self._paths["/".join(best)] if best is not None else None
+
+
+def _hunk_coverage(
+    path: str, hunk: DiffHunk, file_hits: FileLineHits, coverage: DiffCoverage
+) -> Optional[UncoveredHunk]:
+    """Adds the hunk's executable lines to `coverage`, the hunk when some were missed"""
+    lines, hits = file_hits.lines, file_hits.hits
+    valid = missed = 0
+    uncovered: List[Tuple[int, int]] = []
+    for first, last in hunk.added:
+        low, high = bisect_left(lines, first), bisect_right(lines, last)
+        valid += high - low
+        previous_missed = False
+        for index in range(low, high):
+            if hits[index]:
+                previous_missed = False
+                continue
+            missed += 1
+            # Consecutive executable lines that were missed make one range
+            if previous_missed:
+                uncovered[-1] = (uncovered[-1][0], lines[index])
+            else:
+                uncovered.append((lines[index], lines[index]))
+            previous_missed = True
+    coverage.lines_valid += valid
+    coverage.lines_covered += valid - missed
+    if not missed:
+        return None
+    return UncoveredHunk(path=path, start=hunk.start, lines_valid=valid, uncovered=uncovered, lines_uncovered=missed)
+
+
+def _add_line(hunk: DiffHunk, line: int):
+    if hunk.added and hunk.added[-1][1] == line - 1:
+        hunk.added[-1] = (hunk.added[-1][0], line)
+    else:
+        hunk.added.append((line, line))
+
+
+def _diff_path(raw: bytes) -> Optional[str]:
+    """The path of a "+++" line, without git's "b/" prefix, None for /dev/null"""
+    # `diff -u` follows the path with a tab and a timestamp
+    path = raw.rstrip(b"\r\n").split(b"\t", 1)[0].decode("utf-8", "surrogateescape")
+    if path == "/dev/null":
+        return None
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1]
+    return path[2:] if path.startswith("b/") else path
+
+
+def _split(path: str) -> Tuple[str, ...]:
+    return tuple(part for part in path.replace("\\", "/").split("/") if part and part != ".")
@@ -0,0 +1,207 @@
+"""Failure bodies (stack traces) read back from the report file when they are shown.
+
+Readers only record where each body is, (offset, length) in the file, rather
+than holding every stack trace in memory. The few that end up in a message
+are sliced out of a memory mapped view of the file and decoded then. Each
+file is mapped once by the report's BodyFiles, and when only the start of a
+body is needed (to cluster failures) only that much of it is decoded.
+"""
+
+from dataclasses import dataclass
+import json
+import logging
+import mmap
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger("webhook-reporter-logger")
+
+XML_BODY = "xml"
+JSON_BODY = "json"
+
+ANSI_ESCAPE = re.compile(r"\x1b\[([0-9]+;)*[0-9]*m")
+
+XML_ENCODING = re.compile(rb"""<\?xml[^>]*encoding=["']([A-Za-z][\w.-]*)["']""")
+# Raw "<" can only appear in markup, comments, CDATA and processing instructions
+ATTRIBUTES = rb"""((?:[^>"']|"[^"]*"|'[^']*')*)"""
+TESTCASE = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<testcase(?=[\s/>])" + ATTRIBUTES + rb">",
+    re.DOTALL,
+)
+ELEMENT = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<(/?)([A-Za-z_][\w.:-]*)" + ATTRIBUTES + rb">",
+    re.DOTALL,
+)
+
+START_TAG = re.compile(rb"<([A-Za-z_][\w.:-]*)" + ATTRIBUTES + rb">")
+# Bytes a character can take in the encodings reports use, a prefix of limit
+# characters is decoded from at most limit times as many bytes
+MAX_CHAR_BYTES = 4
+
+
+@dataclass(frozen=True)
+class BodySource:
+    """A report file holding failure bodies, and how they are encoded in it"""
+
+    path: str
+    format: str
+    encoding: Optional[str] = None
+
+
+def xml_body_source(file_path: str) -> BodySource:
+    """The source for a JUnit file, with the encoding its declaration names"""
+    with open(file_path, "rb") as file:
+        match = XML_ENCODING.match(file.read(256))
+    return BodySource(path=file_path, format=XML_BODY, encoding=match and match.group(1).decode("ascii"))
+
+
+def locate_xml_bodies(file_path: str, ordinals: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """Spans of the first child element of the <testcase> elements at `ordinals`.
+
+    `ordinals` count the <testcase> elements in document order, like a reader
+    sees them. The file is scanned as bytes: comments and CDATA are skipped
+    whole, so a "<testcase" inside them is not counted.
+    """
+    wanted = sorted(set(ordinals))
+    spans: Dict[int, Tuple[int, int]] = {}
+    if not wanted:
+        return spans
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        next_wanted = iter(wanted)
+        target = next(next_wanted)
+        ordinal = -1
+        for match in TESTCASE.finditer(data):
+            if match.group(1) is None:
+                continue
+            ordinal += 1
+            if ordinal < target:
+                continue
+            if not match.group(1).endswith(b"/"):
+                span = _first_child(data, match.end())
+                if span is not None:
+                    spans[ordinal] = span
+            target = next(next_wanted, None)
+            if target is None:
+                break
+    return spans
+
+
+class BodyFiles:
+    """Memory maps of the files bodies are read from, each opened once and kept open"""
+
+    def __init__(self):
+        # None for a file that could not be opened
+        self._maps: Dict[str, Optional[mmap.mmap]] = {}
+
+    def read(self, source: BodySource, offset: int, length: int, limit: int = None) -> Optional[str]:
+        """Decodes the body at (offset, length), None when it cannot be read anymore.
+
+        With `limit` at most that many characters are returned, decoded from
+        the start of the body only.
+        """
+        data = self._map(source.path)
+        if data is None:
+            return None
+        if limit is not None and length > limit * MAX_CHAR_BYTES:
+            text = _decode_prefix(source, data[offset : offset + limit * MAX_CHAR_BYTES])
+            if text:
+                return text[:limit]
+        try:
+            return _decode(source, data[offset : offset + length])
+        except (ValueError, ET.ParseError) as e:
+            logger.debug(f"Could not read the failure body at {offset} in '{source.path}': {e}")
+            return None
+
+    def close(self):
+        for data in self._maps.values():
+            if data is not None:
+                data.close()
+        self._maps.clear()
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        if path not in self._maps:
+            try:
+                with open(path, "rb") as file:
+                    # The map keeps its own handle to the file
+                    self._maps[path] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not open '{path}' to read failure bodies: {e}")
+                self._maps[path] = None
+        return self._maps[path]
+
+
+def read_body(source: BodySource, offset: int, length: int) -> Optional[str]:
+    """Decodes the body at (offset, length), None when it cannot be read anymore"""
+    bodies = BodyFiles()
+    try:
+        return bodies.read(source, offset, length)
+    finally:
+        bodies.close()
+
+
+def _decode(source: BodySource, raw: bytes) -> Optional[str]:
+    if source.format == JSON_BODY:
+        return ANSI_ESCAPE.sub("", json.loads(raw))
+    parser = ET.XMLParser(encoding=source.encoding)
+    parser.feed(raw)
+    return parser.close().text
+
+
+def _decode_prefix(source: BodySource, raw: bytes) -> Optional[str]:
+    """The text of a body cut at the end of `raw`, None when it cannot be closed there"""
+    if source.format == JSON_BODY or (source.encoding or "utf-8").lower() in ("utf-8", "utf8"):
+        # A character the cut went through is dropped
+        raw = raw.decode("utf-8", "ignore").encode("utf-8")
+    for candidate in _closed_prefixes(source, raw):
+        try:
+            return _decode(source, candidate)
+        except (ValueError, ET.ParseError):
+            continue
+    return None
+
+
+def _closed_prefixes(source: BodySource, raw: bytes) -> Iterator[bytes]:
+    """`raw` closed as a complete body, then without the escape or markup the cut went through"""
+    if source.format == JSON_BODY:
+        yield raw + b'"'
+        escape = raw.rfind(b"\\")
+        if escape != -1:
+            yield raw[:escape] + b'"'
+        return
+    tag = START_TAG.match(raw)
+    if tag is None:
+        return
+    end_tag = b"</" + tag.group(1) + b">"
+    open_cdata = raw.rfind(b"<![CDATA[") > raw.rfind(b"]]>")
+    yield raw + (b"]]>" if open_cdata else b"") + end_tag
+    cut = raw[: max(raw.rfind(b"<"), raw.rfind(b"&"), tag.end())]
+    open_cdata = cut.rfind(b"<![CDATA[") > cut.rfind(b"]]>")
+    yield cut + (b"]]>" if open_cdata else b"") + end_tag
+
+
+def _first_child(data: mmap.mmap, position: int) -> Optional[Tuple[int, int]]:
+    """Span of the first element from `position`, None when its parent closes first"""
+    start = None
+    depth = 0
+    for match in ELEMENT.finditer(data, position):
+        tag = match.group(2)
+        if tag is None:
+            continue
+        closing = match.group(1) == b"/"
+        if start is None:
+            if closing:
+                return None
+            start = match.start()
+            if match.group(3).endswith(b"/"):
+                return start, match.end() - start
+            child = tag
+            depth = 1
+        elif tag == child:
+            if closing:
+                depth -= 1
+                if depth == 0:
+                    return start, match.end() - start
+            elif not match.group(3).endswith(b"/"):
+                depth += 1
+    return None
@@ -0,0 +1,97 @@
+"""Groups failures that share an error once the run-specific details are removed.
+
+When an infrastructure problem fails thousands of tests the same way, the
+messages only differ by line numbers, addresses, temporary paths and the
+like. Those are replaced by placeholders and the rest is hashed into a
+signature, so the summaries can say "N tests failed with ..." once.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+
+from src.helpers.failure_bodies import ANSI_ESCAPE
+
+# Test names kept per cluster
+SAMPLE_SIZE = 5
+# Only the start of a message is normalised, it is where errors differ
+SIGNATURE_LENGTH = 2000
+
+ADDRESS = re.compile(r"0x[0-9a-fA-F]+")
+PATH = re.compile(r"(?:[A-Za-z]:)?[\\/]?(?:[\w.@+~-]+[\\/])+[\w.@+~-]+")
+# Hashes and uuid parts: 8 or more hex digits mixing letters and numbers
+HEX_ID = re.compile(r"\b(?=[0-9a-fA-F]*[a-fA-F])(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b")
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_message(message: Optional[str]) -> str:
+    """The message without colours, addresses, paths, ids and numbers"""
+    text = ANSI_ESCAPE.sub("", (message or "")[:SIGNATURE_LENGTH])
+    text = ADDRESS.sub("<addr>", text)
+    text = PATH.sub("<path>", text)
+    text = HEX_ID.sub("<id>", text)
+    text = NUMBER.sub("<n>", text)
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def failure_signature(message: Optional[str]) -> str:
+    """Short hash of the normalised message"""
+    return hashlib.sha1(normalise_message(message).encode("utf-8", "surrogatepass")).hexdigest()[:12]
+
+
+@dataclass
+class FailureCluster:
+    """Failures sharing a signature. Reads like a test case in the summaries:
+    `name` says how many tests it stands for and `message` is the text the
+    first one's signature was made from, its message or else the start of its
+    full message."""
+
+    signature: str
+    verb: str
+    message: Optional[str]
+    test_names: List[str] = field(default_factory=list)
+    count: int = 0
+
+    def add(self, test_name: str, variants: int = 1):
+        self.count += variants
+        if len(self.test_names) < SAMPLE_SIZE:
+            self.test_names.append(test_name)
+
+    @property
+    def name(self) -> str:
+        if self.count == 1:
+            return self.test_names[0]
+        return f"{self.count} tests {self.verb} with"
+
+
+def cluster_failures(tests: Iterable, verb: str = "failed") -> List[FailureCluster]:
+    """Groups the tests by the signature of their message, largest group first.
+
+    The start of the full message is used when a test has no short one.
+    Messages are interned by the readers, so each distinct one is only
+    normalised once.
+    """
+    signatures: Dict[str, str] = {}
+    clusters: Dict[str, FailureCluster] = {}
+    for test in tests:
+        text = test.message or _full_message_prefix(test) or ""
+        signature = signatures.get(text)
+        if signature is None:
+            signature = signatures[text] = failure_signature(text)
+        cluster = clusters.get(signature)
+        if cluster is None:
+            cluster = clusters[signature] = FailureCluster(signature=signature, verb=verb, message=text or None)
+        cluster.add(test.name, variants=getattr(test, "variants", 1))
+    # sorted() is stable, clusters of the same size keep the order they were first seen in
+    return sorted(clusters.values(), key=lambda cluster: cluster.count, reverse=True)
+
+
+def _full_message_prefix(test) -> Optional[str]:
+    """The part of the full message the signature is made from"""
+    prefix = getattr(test, "full_message_prefix", None)
+    if prefix is not None:
+        # Table rows read only that much of a body left in the report file
+        return prefix(SIGNATURE_LENGTH)
+    return (test.full_message or "")[:SIGNATURE_LENGTH]
@@ -14,6 +14,16 @@ class GitHubActionInfo:
         self.action = os.getenv('GITHUB_ACTION')
         self.event_name = os.getenv('GITHUB_EVENT_NAME')
 
+    @property
+    def branch(self):
+        """The branch the run is for, the head branch of a pull request"""
+        return os.getenv('GITHUB_HEAD_REF') or os.getenv('GITHUB_REF_NAME')
+
+    @property
+    def base_branch(self):
+        """The branch a pull request merges into, the run's own branch otherwise"""
+        return os.getenv('GITHUB_BASE_REF') or self.branch
+
     @property
     def commit_url(self):
         return f"https://github.com/{self.repo}/commit/{self.sha}"
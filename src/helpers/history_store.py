@@ -0,0 +1,300 @@
+"""History of the reports in a SQLite file, for trends and deltas between runs.
+
+Enabled with the `history_db` input (INPUT_HISTORY_DB), a path that can be
+restored and saved by actions/cache. Each run adds its totals, the coverage
+of each file and the result of each test. Filenames and test names are stored
+once and referred to by id, so a run costs a few small rows per file and test.
+"""
+
+from dataclasses import dataclass
+import logging
+import os
+import sqlite3
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from src.helpers.coverage_merge import combine_classes
+from src.models.data_reports import NormalisedCoverageData
+from src.models.test_suite import TestReport
+
+logger = logging.getLogger("webhook-reporter-logger")
+
+# Kept in PRAGMA user_version. A file of a later version is not written to,
+# it may have tables or columns this version does not know how to fill.
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    commit_sha TEXT,
+    branch TEXT,
+    recorded_at REAL NOT NULL,
+    line_rate INTEGER NOT NULL,
+    branch_rate INTEGER NOT NULL,
+    lines_covered INTEGER NOT NULL,
+    lines_valid INTEGER NOT NULL,
+    branches_covered INTEGER NOT NULL,
+    branches_valid INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    tests INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    test_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_commit ON runs (commit_sha);
+CREATE INDEX IF NOT EXISTS runs_by_branch ON runs (branch, id);
+
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS file_coverage (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    line_rate REAL NOT NULL,
+    branch_rate REAL NOT NULL,
+    lines_covered INTEGER NOT NULL,
+    lines_valid INTEGER NOT NULL,
+    branches_covered INTEGER NOT NULL,
+    branches_valid INTEGER NOT NULL,
+    PRIMARY KEY (run_id, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_coverage_by_file ON file_coverage (file_id, run_id);
+
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (suite, name)
+);
+CREATE TABLE IF NOT EXISTS test_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test_id INTEGER NOT NULL REFERENCES tests (id),
+    status TEXT NOT NULL,
+    time REAL,
+    PRIMARY KEY (run_id, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS test_results_by_test ON test_results (test_id, run_id);
+"""
+
+# Rows are staged in temporary tables, their names are then resolved to ids in one statement each
+STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS staged_files (
+    path TEXT, line_rate REAL, branch_rate REAL,
+    lines_covered INTEGER, lines_valid INTEGER, branches_covered INTEGER, branches_valid INTEGER
+);
+CREATE TEMP TABLE IF NOT EXISTS staged_tests (suite TEXT, name TEXT, status TEXT, time REAL);
+"""
+
+RUN_COLUMNS = (
+    "id, commit_sha, branch, recorded_at, line_rate, branch_rate, lines_covered, lines_valid,"
+    " branches_covered, branches_valid, files, tests, passed, failed, errors, skipped, test_time"
+)
+
+
+def history_db() -> Optional[str]:
+    """The `history_db` input, None when it is not set"""
+    return os.getenv("INPUT_HISTORY_DB", "").strip() or None
+
+
+@dataclass
+class RunSummary:
+    """Totals of a recorded run"""
+
+    id: int
+    commit_sha: Optional[str]
+    branch: Optional[str]
+    recorded_at: float
+    line_rate: int
+    branch_rate: int
+    lines_covered: int
+    lines_valid: int
+    branches_covered: int
+    branches_valid: int
+    files: int
+    tests: int
+    passed: int
+    failed: int
+    errors: int
+    skipped: int
+    test_time: float
+
+
+@dataclass
+class FileDelta:
+    """Change of a file's line rate between two runs"""
+
+    path: str
+    line_rate: float
+    base_line_rate: float
+
+    @property
+    def delta(self) -> float:
+        return self.line_rate - self.base_line_rate
+
+
+class HistoryStore:
+    """Runs recorded in a SQLite file.
+
+    Each run is written in one transaction with bulk inserts, the lookups used
+    to compare runs (last run of a branch, run of a commit, a file's history)
+    go through an index, so they stay fast however many runs are kept.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        try:
+            self._open_schema()
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+
+    def _open_schema(self):
+        """Creates the tables in a new file, refuses one written by a later schema"""
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version > SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                f"history schema version {version} is newer than the supported version {SCHEMA_VERSION}"
+            )
+        if version < SCHEMA_VERSION:
+            # A new file, files of earlier versions would be migrated here
+            with self.connection:
+                self.connection.executescript(SCHEMA)
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(STAGING)
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def record_run(
+        self,
+        coverage_report: NormalisedCoverageData,
+        test_report: Optional[TestReport] = None,
+        commit_sha: Optional[str] = None,
+        branch: Optional[str] = None,
+    ) -> int:
+        """Adds a run and returns its id"""
+        with self.connection:
+            cursor = self.connection.execute(
+                f"INSERT INTO runs ({RUN_COLUMNS}) VALUES ({', '.join('?' * 17)})",
+                (None, commit_sha, branch, time.time(), *_run_totals(coverage_report, test_report)),
+            )
+            run_id = cursor.lastrowid
+            self._insert_files(run_id, coverage_report)
+            if test_report:
+                self._insert_tests(run_id, test_report)
+        return run_id
+
+    def run(self, run_id: int) -> Optional[RunSummary]:
+        return self._one_run("WHERE id = ?", (run_id,))
+
+    def run_for_commit(self, commit_sha: str) -> Optional[RunSummary]:
+        """The latest run of a commit"""
+        return self._one_run("WHERE commit_sha = ? ORDER BY id DESC", (commit_sha,))
+
+    def last_run(self, branch: str, before: Optional[int] = None) -> Optional[RunSummary]:
+        """The latest run of a branch, or the latest one before the run `before`"""
+        if before is None:
+            return self._one_run("WHERE branch = ? ORDER BY id DESC", (branch,))
+        return self._one_run("WHERE branch = ? AND id < ? ORDER BY id DESC", (branch, before))
+
+    def file_history(self, path: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """(run id, line rate) of a file's latest runs, newest first"""
+        rows = self.connection.execute(
+            "SELECT run_id, line_rate FROM file_coverage"
+            " WHERE file_id = (SELECT id FROM files WHERE path = ?) ORDER BY run_id DESC LIMIT ?",
+            (path, limit),
+        )
+        return rows.fetchall()
+
+    def file_regressions(self, run_id: int, base_run_id: int, limit: int = 5) -> List[FileDelta]:
+        """Files whose line rate dropped the most from the base run"""
+        rows = self.connection.execute(
+            "SELECT files.path, current.line_rate, base.line_rate"
+            " FROM file_coverage AS current"
+            " JOIN file_coverage AS base ON base.run_id = ? AND base.file_id = current.file_id"
+            " JOIN files ON files.id = current.file_id"
+            " WHERE current.run_id = ? AND current.line_rate < base.line_rate"
+            " ORDER BY current.line_rate - base.line_rate LIMIT ?",
+            (base_run_id, run_id, limit),
+        )
+        return [FileDelta(*row) for row in rows]
+
+    def _one_run(self, clause: str, parameters: tuple) -> Optional[RunSummary]:
+        row = self.connection.execute(f"SELECT {RUN_COLUMNS} FROM runs {clause} LIMIT 1", parameters).fetchone()
+        return RunSummary(*row) if row else None
+
+    def _insert_files(self, run_id: int, coverage_report: NormalisedCoverageData):
+        # A file is a row per class in some reports, the history keeps one per file
+        files = combine_classes(coverage_report.files).values()
+        self.connection.executemany(
+            "INSERT INTO staged_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    file.path,
+                    file.line_rate,
+                    file.branch_rate,
+                    file.lines_covered,
+                    file.lines_valid,
+                    file.branches_covered,
+                    file.branches_valid,
+                )
+                for file in files
+            ),
+        )
+        self.connection.execute("INSERT OR IGNORE INTO files (path) SELECT path FROM staged_files")
+        self.connection.execute(
+            "INSERT INTO file_coverage SELECT ?, files.id, staged.line_rate, staged.branch_rate,"
+            " staged.lines_covered, staged.lines_valid, staged.branches_covered, staged.branches_valid"
+            " FROM staged_files AS staged JOIN files ON files.path = staged.path",
+            (run_id,),
+        )
+        self.connection.execute("DELETE FROM staged_files")
+
+    def _insert_tests(self, run_id: int, test_report: TestReport):
+        self.connection.executemany("INSERT INTO staged_tests VALUES (?, ?, ?, ?)", _test_rows(test_report))
+        self.connection.execute("INSERT OR IGNORE INTO tests (suite, name) SELECT suite, name FROM staged_tests")
+        # A test reported twice in a suite keeps its last result
+        self.connection.execute(
+            "INSERT OR REPLACE INTO test_results SELECT ?, tests.id, staged.status, staged.time"
+            " FROM staged_tests AS staged JOIN tests ON tests.suite = staged.suite AND tests.name = staged.name",
+            (run_id,),
+        )
+        self.connection.execute("DELETE FROM staged_tests")
+
+
+def _run_totals(coverage_report: NormalisedCoverageData, test_report: Optional[TestReport]) -> tuple:
+    coverage = (
+        coverage_report.total_line_rate,
+        coverage_report.total_branch_rate,
+        coverage_report.lines_covered,
+        coverage_report.lines_valid,
+        coverage_report.branches_covered,
+        coverage_report.branches_valid,
+        coverage_report.total,
+    )
+    if not test_report:
+        return coverage + (0, 0, 0, 0, 0, 0.0)
+    return coverage + (
+        test_report.total_tests,
+        test_report.total_passed,
+        test_report.total_failed,
+        test_report.total_error,
+        test_report.total_skipped,
+        test_report.total_time,
+    )
+
+
+def _test_rows(test_report: TestReport) -> Iterator[Tuple[str, str, str, Optional[float]]]:
+    for suite in test_report.suites:
+        for test in suite.tests:
+            yield suite.name or "", test.name or "", test.status.name, getattr(test, "time", None)
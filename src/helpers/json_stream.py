@@ -0,0 +1,193 @@
+"""Incremental JSON reading for large test result files"""
+
+import json
+import re
+from typing import Any, Iterator
+
+from src.exceptions.file_errors import MalformedFile
+
+CHUNK_SIZE = 64 * 1024
+# Values that fit in this many bytes are decoded directly, without scanning them first
+DECODE_WINDOW = 4 * 1024
+
+WHITESPACE = re.compile(rb"[ \t\n\r]*")
+STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+SCALAR = re.compile(rb"[-+0-9.eE]+|true|false|null")
+STRUCTURAL = re.compile(rb'["{}\[\]]')
+
+
+class JsonStream:
+    """Pull reader over a JSON file.
+
+    Objects and arrays are walked with `iter_object`/`iter_array`, which leave the
+    stream on each value for the caller to `read_value` or `skip_value`. Only the
+    value being read is ever decoded, everything that is skipped is scanned
+    without being built, so memory stays flat however large the file is.
+    """
+
+    def __init__(self, json_file: str, chunk_size: int = CHUNK_SIZE):
+        self.json_file = json_file
+        self.chunk_size = chunk_size
+        self._file = open(json_file, "rb")
+        self._buffer = b""
+        self._position = 0
+        # File offset of the first byte in the buffer
+        self._offset = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def __enter__(self) -> "JsonStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the underlying file"""
+        self._file.close()
+
+    @property
+    def offset(self) -> int:
+        """Byte offset of the stream in the file"""
+        return self._offset + self._position
+
+    def iter_object(self) -> Iterator[str]:
+        """Yields the keys of the object at the stream, each value must be consumed"""
+        self._expect(b"{")
+        if self._peek() == b"}":
+            self._position += 1
+            return
+        while True:
+            key = json.loads(self._value_span())
+            self._expect(b":")
+            yield key
+            if self._expect(b",}") == b"}":
+                return
+
+    def iter_array(self) -> Iterator[int]:
+        """Yields the index of each item of the array at the stream, each item must be consumed"""
+        self._expect(b"[")
+        if self._peek() == b"]":
+            self._position += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._expect(b",]") == b"]":
+                return
+
+    def read_value(self) -> Any:
+        """Decodes the value at the stream"""
+        self._peek()
+        if len(self._buffer) - self._position < DECODE_WINDOW and not self._eof:
+            self._fill()
+
+        # Fast path: the C decoder stops at the end of the value on its own
+        start = self._position
+        window = self._buffer[start : start + DECODE_WINDOW]
+        text = window.decode("utf-8", "surrogateescape")
+        reaches_file_end = self._eof and start + len(window) == len(self._buffer)
+        try:
+            value, end = self._decoder.raw_decode(text)
+            # A number running into the window's end may carry on past it
+            if end < len(text) or reaches_file_end:
+                self._position = start + len(text[:end].encode("utf-8", "surrogateescape"))
+                return value
+        except ValueError:
+            pass
+
+        try:
+            return json.loads(self._value_span())
+        except ValueError as e:
+            raise MalformedFile(file=self.json_file) from e
+
+    def skip_value(self):
+        """Moves past the value at the stream without decoding it"""
+        self._value_span()
+
+    def peek(self) -> bytes:
+        """First byte of the value at the stream, e.g. b"[" for an array"""
+        return self._peek()
+
+    def _value_span(self) -> bytes:
+        """Returns the raw bytes of the value at the stream and moves past it"""
+        self._peek()
+        start = self._position
+        while True:
+            end = self._scan_value(start)
+            if end is not None:
+                self._position = end
+                return self._buffer[start:end]
+            if self._eof:
+                raise MalformedFile(file=self.json_file)
+            # The value runs past the buffer, read more and scan it again
+            self._fill()
+            start = self._position
+
+    def _scan_value(self, start: int):
+        """End of the value starting at `start`, None when the buffer cuts it off"""
+        buffer = self._buffer
+        first = buffer[start : start + 1]
+        if first == b'"':
+            match = STRING.match(buffer, start)
+            return match.end() if match else None
+        if first not in (b"{", b"["):
+            match = SCALAR.match(buffer, start)
+            if not match:
+                raise MalformedFile(file=self.json_file)
+            if match.end() == len(buffer) and not self._eof:
+                return None
+            return match.end()
+
+        depth = 0
+        position = start
+        while True:
+            match = STRUCTURAL.search(buffer, position)
+            if not match:
+                return None
+            token = match.group()
+            if token == b'"':
+                # Strings are skipped whole so brackets inside them are ignored
+                match = STRING.match(buffer, match.start())
+                if not match:
+                    return None
+            elif token in (b"{", b"["):
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+            position = match.end()
+
+    def _peek(self) -> bytes:
+        """Skips whitespace and returns the next byte without consuming it"""
+        while True:
+            self._position = WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position : self._position + 1]
+            if self._eof:
+                raise MalformedFile(file=self.json_file)
+            self._fill()
+
+    def _expect(self, allowed: bytes) -> bytes:
+        """Consumes the next byte, which has to be one of `allowed`"""
+        char = self._peek()
+        if char not in allowed:
+            raise MalformedFile(file=self.json_file)
+        self._position += 1
+        return char
+
+    def _fill(self):
+        """Drops what has been consumed and reads the next chunk.
+
+        The chunk grows with whatever is left unconsumed, so a value larger than
+        the chunk size is rescanned a logarithmic number of times, not linear.
+        """
+        remaining = len(self._buffer) - self._position
+        chunk = self._file.read(max(self.chunk_size, remaining))
+        if not chunk:
+            self._eof = True
+        self._offset += self._position
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
@@ -0,0 +1,93 @@
+"""Groups the variants of parameterised tests while they are read.
+
+pytest and JUnit 5 name each variant after its parameters, `test_x[case-1]` or
+`testAdd(int, int)[3]`. With the `group_parameterised` input
+(INPUT_GROUP_PARAMETERISED) the variants of a test that end with the same
+status are kept as one row, counting the variants and a few of their
+parameter sets, so a report grows with the number of distinct tests.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Parameter sets kept per group
+SAMPLE_SIZE = 3
+PARAMETERISED_NAME = re.compile(r"^(?P<base>.*?\S)\s*\[(?P<parameters>[^\[\]]*)\]$", re.DOTALL)
+TRUE_VALUES = ("true", "yes", "1")
+
+
+def group_parameterised_enabled() -> bool:
+    """Whether the `group_parameterised` input is set"""
+    return os.getenv("INPUT_GROUP_PARAMETERISED", "").strip().lower() in TRUE_VALUES
+
+
+def split_parameterised(name: str) -> Optional[Tuple[str, str]]:
+    """(base test id, parameters) of a variant's name, None for other tests"""
+    match = PARAMETERISED_NAME.match(name or "")
+    if match is None:
+        return None
+    return match.group("base"), match.group("parameters")
+
+
+class ParameterisedGroup:
+    """Variants of a test that ended with the same status, read like one TestCase.
+
+    The message and full message are the first variant's, the time is the
+    total of the variants.
+    """
+
+    __test__ = False
+
+    def __init__(self, base: str, parameters: str, first):
+        self.base = base
+        self.first_name = first.name
+        self.status = first.status
+        self.message = first.message
+        self.full_message = first.full_message
+        if hasattr(first, "time"):
+            self.time = first.time
+        self.variants = 1
+        self.parameters: List[str] = [parameters]
+
+    def add(self, test, parameters: str):
+        self.variants += 1
+        if hasattr(test, "time"):
+            self.time = getattr(self, "time", 0.0) + test.time
+        if len(self.parameters) < SAMPLE_SIZE:
+            self.parameters.append(parameters)
+
+    @property
+    def name(self) -> str:
+        if self.variants == 1:
+            return self.first_name
+        more = ", …" if self.variants > len(self.parameters) else ""
+        return f"{self.base}[{', '.join(self.parameters)}{more}] ({self.variants} variants)"
+
+
+class ParameterisedGrouper:
+    """Buffers the tests of a suite, merging variants when grouping is enabled"""
+
+    __test__ = False
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = group_parameterised_enabled() if enabled is None else enabled
+        self.tests: List = []
+        self._groups: Dict[Tuple[str, object], ParameterisedGroup] = {}
+
+    def add(self, test) -> Optional[int]:
+        """Index the test takes in `tests`, None when it joined an existing group"""
+        split = split_parameterised(test.name) if self.enabled else None
+        if split is None:
+            self.tests.append(test)
+            return len(self.tests) - 1
+
+        base, parameters = split
+        key = (base, test.status)
+        group = self._groups.get(key)
+        if group is not None:
+            group.add(test, parameters)
+            return None
+        group = self._groups[key] = ParameterisedGroup(base=base, parameters=parameters, first=test)
+        self.tests.append(group)
+        return len(self.tests) - 1
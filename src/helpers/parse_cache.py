@@ -0,0 +1,193 @@
+"""On-disk cache of parsed reports, keyed by the content of the report files.
+
+Enabled with the `cache_dir` input (INPUT_CACHE_DIR), which can point at a
+directory restored by actions/cache. `cache_max_mb` (INPUT_CACHE_MAX_MB) bounds
+its size, the least recently used entries are evicted first.
+
+Entries are pickles, read with an unpickler that only builds the report
+classes listed in CACHED_CLASSES. A cache restored from a branch the workflow
+does not trust can still hand it made-up reports, so it should only be shared
+between runs that trust each other's results.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from typing import Callable, List, Optional, TypeVar
+
+from config import PARSER_VERSION
+
+logger = logging.getLogger("webhook-reporter-logger")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_MB = 512
+ENTRY_SUFFIX = ".pickle"
+
+# (module, name) of everything a cached report is built from
+CACHED_CLASSES = frozenset(
+    {
+        ("array", "array"),
+        ("array", "_array_reconstructor"),
+        ("src.helpers.failure_bodies", "BodySource"),
+        ("src.helpers.failure_clusters", "FailureCluster"),
+        ("src.models.coverage_tree", "CoverageTree"),
+        ("src.models.data_reports", "FileCoverageTable"),
+        ("src.models.data_reports", "FileLineHits"),
+        ("src.models.data_reports", "NormalisedCoverageData"),
+        ("src.models.test_suite", "TestCaseRange"),
+        ("src.models.test_suite", "TestCaseTable"),
+        ("src.models.test_suite", "TestReport"),
+        ("src.models.test_suite", "TestResult"),
+        ("src.models.test_suite", "TestSuite"),
+    }
+)
+
+T = TypeVar("T")
+
+
+def file_digest(file_path: str) -> bytes:
+    """sha256 of the file, read in chunks so its size does not matter"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.digest()
+
+
+class ReportUnpickler(pickle.Unpickler):
+    """Unpickler that refuses any global but the report classes"""
+
+    def find_class(self, module: str, name: str):
+        if (module, name) not in CACHED_CLASSES:
+            raise pickle.UnpicklingError(f"'{module}.{name}' is not part of a cached report")
+        return super().find_class(module, name)
+
+
+class ParseCache:
+    """Pickled reports stored under a hash of their input files and the parser version"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def from_env() -> Optional["ParseCache"]:
+        """The cache configured for the action, None when caching is off"""
+        directory = os.getenv("INPUT_CACHE_DIR")
+        if not directory:
+            return None
+        max_mb = os.getenv("INPUT_CACHE_MAX_MB")
+        try:
+            max_bytes = int(float(max_mb or DEFAULT_MAX_MB) * 1024 * 1024)
+        except ValueError:
+            logger.warning(f"Invalid cache size '{max_mb}', using {DEFAULT_MAX_MB} MB")
+            max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+        return ParseCache(directory=directory, max_bytes=max_bytes)
+
+    def key(self, kind: str, file_paths: List[str]) -> str:
+        """Key of the report `kind` parsed from the content of `file_paths`, in order"""
+        key = hashlib.sha256(f"{PARSER_VERSION}:{kind}".encode())
+        for file_path in file_paths:
+            key.update(file_digest(file_path))
+        return key.hexdigest()
+
+    def fetch(
+        self, kind: str, file_paths: List[str], parse: Callable[[], T], valid: Callable[[T], bool] = None
+    ) -> T:
+        """Returns the cached report for the files, parsing and storing it on a miss.
+
+        A cached report `valid` rejects, e.g. one that refers to files that
+        have moved since, is parsed again and replaced.
+        """
+        key = self.key(kind, file_paths)
+        report = self.get(key)
+        if report is not None:
+            if valid is None or valid(report):
+                logger.debug(f"Parse cache hit for {kind} report {key[:12]}")
+                return report
+            logger.debug(f"Parse cache entry {key[:12]} for {kind} report is stale, parsing again")
+
+        report = parse()
+        self.put(key, report)
+        return report
+
+    def get(self, key: str) -> Optional[object]:
+        """The entry stored under key, None when there is none"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                report = ReportUnpickler(file).load()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable parse cache entry {key[:12]}: {e}")
+            self._remove(path)
+            return None
+        # The modification time orders entries for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return report
+
+    def put(self, key: str, report: object):
+        """Stores the report under key, then evicts entries over the size limit"""
+        temp_path = None
+        try:
+            # Written aside and renamed, so concurrent readers never see half an entry
+            descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(report, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f"Could not write to the parse cache '{self.directory}': {e}")
+            if temp_path:
+                self._remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits its size"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(ENTRY_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            self._remove(path)
+            size -= entry_size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another process evicted it first
+            pass
+
+
+def cached_parse(
+    kind: str, file_paths: List[str], parse: Callable[[], T], valid: Callable[[T], bool] = None
+) -> T:
+    """parse(), going through the parse cache when one is configured"""
+    cache = ParseCache.from_env()
+    if cache is None:
+        return parse()
+    return cache.fetch(kind, file_paths, parse, valid=valid)
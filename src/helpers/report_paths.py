@@ -0,0 +1,42 @@
+"""Resolves report inputs that name several files"""
+
+import glob
+import os
+import re
+from typing import List
+
+# Paths can be given one per line or separated by commas
+SEPARATORS = re.compile(r"[,\n]")
+GLOB_CHARACTERS = re.compile(r"[*?\[]")
+# Files picked up from a directory, e.g. the TEST-*.xml written by Surefire
+REPORT_EXTENSIONS = (".xml", ".json")
+
+
+def resolve_report_paths(value: str) -> List[str]:
+    """Returns every file named by `value`, a path, a directory, a glob or a list of them.
+
+    Globs and directories (not recursively) are expanded to the files they hold
+    in sorted order, plain paths are kept as given so a missing file is still
+    reported by whatever tries to read it.
+    """
+    paths: List[str] = []
+    for pattern in SEPARATORS.split(value or ""):
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if GLOB_CHARACTERS.search(pattern):
+            paths.extend(
+                path for path in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(path)
+            )
+        elif os.path.isdir(pattern):
+            paths.extend(
+                sorted(
+                    entry.path
+                    for entry in os.scandir(pattern)
+                    if entry.is_file() and entry.name.endswith(REPORT_EXTENSIONS)
+                )
+            )
+        else:
+            paths.append(pattern)
+    # A file matched by two patterns is only read once
+    return list(dict.fromkeys(paths))
@@ -0,0 +1,476 @@
+"""Compact binary snapshots of normalised reports.
+
+A snapshot holds one NormalisedCoverageData or TestReport as columns (one
+array per field) that share a single string table, so it can be memory mapped
+and read in place: loading only reads the header, rows are built when they are
+accessed. Snapshots are written to the `snapshot_dir` input (INPUT_SNAPSHOT_DIR)
+and can be given back as `coverage_file`/`test_results` instead of a report.
+
+Layout, little endian, every section aligned to 8 bytes:
+
+    header    magic, format version, report kind, section count
+    sections  (offset, length) of each section
+    strings   offsets of each string (n + 1 entries), then the utf-8 bytes
+    meta      the report's totals
+    columns   one per field, in the order of the *_COLUMNS tuples below
+
+A test report's status index is stored too and its failure summary is built
+on first use, so loading one does not scan its tests.
+"""
+
+from array import array
+import heapq
+import logging
+import mmap
+import struct
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from src.exceptions.configurations import UnsupportedCoverageType, UnsupportedTestReportType
+from src.exceptions.file_errors import MalformedFile
+from src.models.data_reports import (
+    FILE_COVERAGE_COLUMNS,
+    FileCoverageTable,
+    FileLineHits,
+    NormalisedCoverageData,
+)
+from src.models.test_suite import (
+    TEST_CASE_COLUMNS,
+    TestCaseRange,
+    TestCaseTable,
+    TestReport,
+    TestResult,
+    TestSuite,
+    slowest_count,
+)
+
+MAGIC = b"WHRSNAP\x00"
+FORMAT_VERSION = 8
+HEADER = struct.Struct("<8sHBxI")
+SECTION = struct.Struct("<QQ")
+ALIGNMENT = 8
+
+COVERAGE_KIND = 1
+TEST_KIND = 2
+
+# String id of None
+NO_STRING = 0xFFFFFFFF
+
+COVERAGE_META = struct.Struct("<dddqqqqI")
+COVERAGE_COLUMNS = (("filename", "I"), ("path", "I")) + FILE_COVERAGE_COLUMNS
+# After the coverage columns: the path of each file with line hits, where its
+# lines start (one more entry than paths, none when there are no line hits)
+# and the concatenated FileLineHits columns
+LINE_HITS_COLUMNS = (
+    ("path", "I"),
+    ("start", "Q"),
+    ("lines", "I"),
+    ("hits", "I"),
+    ("branches_covered", "H"),
+    ("branches_valid", "H"),
+)
+
+TEST_META = struct.Struct("<dqqqqqd")
+SUITE_COLUMNS = (("name", "I"), ("time", "d"), ("first_test", "Q"), ("nested", "B"))
+TEST_COLUMNS = TEST_CASE_COLUMNS
+# After the test columns: TestReport.status_index, the rows of every status
+# one after the other and where each status starts (one more entry than statuses)
+STATUS_INDEX_COLUMNS = (("rows", "I"), ("start", "Q"))
+
+Report = Union[NormalisedCoverageData, TestReport]
+
+logger = logging.getLogger("webhook-reporter-logger")
+
+
+def is_snapshot(file_path: str) -> bool:
+    """Whether the file starts with the snapshot magic bytes"""
+    try:
+        with open(file_path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class LazySequence(Sequence):
+    """Read-only sequence whose items are built from the snapshot when accessed"""
+
+    def __init__(self, length: int, build: Callable[[int], Any]):
+        self._length = length
+        self._build = build
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._build(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self._build(i) for i in range(self._length))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"LazySequence(length={self._length})"
+
+
+class LazyMapping(Mapping):
+    """Read-only mapping built by `build` the first time it is read"""
+
+    def __init__(self, build: Callable[[], Dict[Any, Any]]):
+        self._build = build
+        self._items: Optional[Dict[Any, Any]] = None
+
+    def _built(self) -> Dict[Any, Any]:
+        if self._items is None:
+            self._items = self._build()
+        return self._items
+
+    def __getitem__(self, key):
+        return self._built()[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._built())
+
+    def __len__(self) -> int:
+        return len(self._built())
+
+    def __repr__(self) -> str:
+        return repr(self._built()) if self._items is not None else "LazyMapping(unbuilt)"
+
+
+class StringTable:
+    """Interns strings while a snapshot is written"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def add(self, text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+        return string_id
+
+    def sections(self) -> List[bytes]:
+        offsets = array("Q", [0])
+        blob = bytearray()
+        for text in self.ids:
+            blob += text.encode("utf-8", "surrogatepass")
+            offsets.append(len(blob))
+        return [_little_endian(offsets), bytes(blob)]
+
+
+class SnapshotReader:
+    """Sections of a memory mapped snapshot"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, "rb") as file:
+            # The map keeps its own handle to the file
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        try:
+            magic, version, self.kind, section_count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"unsupported snapshot version {version}")
+            self._sections = [
+                SECTION.unpack_from(self._map, HEADER.size + index * SECTION.size)
+                for index in range(section_count)
+            ]
+        except (struct.error, ValueError) as e:
+            raise MalformedFile(file=file_path) from e
+
+        offsets = self.column(0, "Q")
+        blob = self.section(1)
+        self.string_count = len(offsets) - 1
+
+        def string(string_id: int) -> Optional[str]:
+            if string_id == NO_STRING:
+                return None
+            return str(blob[offsets[string_id] : offsets[string_id + 1]], "utf-8", "surrogatepass")
+
+        self.string = string
+
+    def section(self, index: int) -> memoryview:
+        offset, length = self._sections[index]
+        return self._view[offset : offset + length]
+
+    def column(self, index: int, typecode: str) -> Sequence:
+        """The section as an array of `typecode`, read in place on little endian machines"""
+        if sys.byteorder == "little":
+            return self.section(index).cast(typecode)
+        values = array(typecode, self.section(index))
+        values.byteswap()
+        return values
+
+
+def write_snapshot(report: Report, file_path: str):
+    """Writes the report as a snapshot at file_path"""
+    if isinstance(report, NormalisedCoverageData):
+        kind, sections = COVERAGE_KIND, _coverage_sections(report)
+    else:
+        kind, sections = TEST_KIND, _test_sections(report)
+
+    offset = _align(HEADER.size + SECTION.size * len(sections))
+    table = []
+    for section in sections:
+        table.append(SECTION.pack(offset, len(section)))
+        offset = _align(offset + len(section))
+
+    with open(file_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, kind, len(sections)))
+        file.write(b"".join(table))
+        for section in sections:
+            file.write(b"\0" * (_align(file.tell()) - file.tell()))
+            file.write(section)
+
+
+def load_snapshot(file_path: str, kind: Optional[int] = None) -> Report:
+    """Maps the snapshot at file_path, its rows are read when accessed.
+
+    With `kind` (COVERAGE_KIND or TEST_KIND) a snapshot of the other kind of
+    report is refused, as the report it was given for is not supported.
+    """
+    reader = SnapshotReader(file_path)
+    if kind is not None and reader.kind != kind:
+        expected, error = (
+            ("coverage", UnsupportedCoverageType) if kind == COVERAGE_KIND else ("test", UnsupportedTestReportType)
+        )
+        logger.error(f"The snapshot '{file_path}' is not a {expected} report snapshot")
+        raise error()
+    if reader.kind == COVERAGE_KIND:
+        return _load_coverage(reader)
+    if reader.kind == TEST_KIND:
+        return _load_test_report(reader)
+    raise MalformedFile(file=file_path)
+
+
+def _coverage_sections(report: NormalisedCoverageData) -> List[bytes]:
+    strings = StringTable()
+    table = report.files
+    string_ids = [strings.add(filename) for filename in table.filenames]
+    filenames = array("I", (string_ids[filename_id] for filename_id in table.filename_column))
+    paths = array("I", (string_ids[path_id] for path_id in table.path_column))
+
+    meta = COVERAGE_META.pack(
+        report.total_line_rate,
+        report.total_branch_rate,
+        report.complexity_avg,
+        report.lines_covered,
+        report.lines_valid,
+        report.branches_covered,
+        report.branches_valid,
+        strings.add(report.timestamp),
+    )
+    columns = [
+        _little_endian(array(typecode, table.columns[name]))
+        for name, typecode in FILE_COVERAGE_COLUMNS
+    ]
+    return (
+        strings.sections()
+        + [meta, _little_endian(filenames), _little_endian(paths)]
+        + columns
+        + _line_hits_sections(report, strings)
+    )
+
+
+def _line_hits_sections(report: NormalisedCoverageData, strings: StringTable) -> List[bytes]:
+    line_hits = {name: array(typecode) for name, typecode in LINE_HITS_COLUMNS}
+    if report.line_hits is not None:
+        line_hits["start"].append(0)
+        for path, file_line_hits in report.line_hits.items():
+            line_hits["path"].append(strings.add(path))
+            for name in ("lines", "hits", "branches_covered", "branches_valid"):
+                line_hits[name].extend(getattr(file_line_hits, name))
+            line_hits["start"].append(len(line_hits["lines"]))
+    return [_little_endian(line_hits[name]) for name, _ in LINE_HITS_COLUMNS]
+
+
+def _load_line_hits(reader: SnapshotReader, first_section: int) -> Optional[Dict[str, FileLineHits]]:
+    paths, starts, *columns = (
+        reader.column(first_section + index, typecode)
+        for index, (_, typecode) in enumerate(LINE_HITS_COLUMNS)
+    )
+    if not len(starts):
+        return None
+    # Each file's hits are views of the mapped columns
+    return {
+        reader.string(path): FileLineHits.from_columns(
+            *(column[starts[index] : starts[index + 1]] for column in columns)
+        )
+        for index, path in enumerate(paths)
+    }
+
+
+def _load_coverage(reader: SnapshotReader) -> NormalisedCoverageData:
+    meta = COVERAGE_META.unpack(reader.section(2))
+    filename_column, path_column, *columns = (
+        reader.column(3 + index, typecode) for index, (_, typecode) in enumerate(COVERAGE_COLUMNS)
+    )
+    # The table's filename ids are the snapshot's string ids
+    files = FileCoverageTable.from_columns(
+        filenames=LazySequence(reader.string_count, reader.string),
+        filename_column=filename_column,
+        columns={name: column for (name, _), column in zip(FILE_COVERAGE_COLUMNS, columns)},
+        path_column=path_column,
+    )
+
+    # The totals are stored already computed, __post_init__ would read every file
+    report = NormalisedCoverageData.__new__(NormalisedCoverageData)
+    (
+        report.total_line_rate,
+        report.total_branch_rate,
+        report.complexity_avg,
+        report.lines_covered,
+        report.lines_valid,
+        report.branches_covered,
+        report.branches_valid,
+        timestamp,
+    ) = meta
+    # __post_init__ turned the total rates into whole percentages
+    report.total_line_rate = int(report.total_line_rate)
+    report.total_branch_rate = int(report.total_branch_rate)
+    report.timestamp = reader.string(timestamp)
+    report.files = files
+    report.total = len(files)
+    report.line_hits = _load_line_hits(reader, 3 + len(COVERAGE_COLUMNS))
+    # Built from the files when it is first asked for
+    report.directories = None
+    return report
+
+
+def _test_sections(report: TestReport) -> List[bytes]:
+    strings = StringTable()
+    table = report.tests
+    string_ids = [strings.add(string) for string in table.strings]
+    suites = {name: array(typecode) for name, typecode in SUITE_COLUMNS}
+    tests = {name: array(typecode) for name, typecode in TEST_COLUMNS}
+    status_rows = {status: array("I") for status in TestResult}
+    for index, suite in enumerate(report.suites):
+        suites["name"].append(strings.add(suite.name))
+        suites["time"].append(suite.time)
+        suites["first_test"].append(len(tests["status"]))
+        suites["nested"].append(suite.nested)
+        rows = suite.tests
+        # The suite's rows are renumbered from where it starts in the snapshot
+        shift = len(tests["status"]) - rows.start
+        for status, index_rows in status_rows.items():
+            index_rows.extend(row + shift for row in table.rows(status, rows.start, rows.stop))
+        for name in ("name", "message"):
+            tests[name].extend(
+                NO_STRING if string_id == NO_STRING else string_ids[string_id]
+                for string_id in table.columns[name][rows.start : rows.stop]
+            )
+        # Failure bodies left in the report file are copied in, the snapshot
+        # may be read where that file is not
+        tests["full_message"].extend(
+            strings.add(table.full_message(row)) for row in range(rows.start, rows.stop)
+        )
+        tests["status"].extend(table.columns["status"][rows.start : rows.stop])
+        tests["time"].extend(table.columns["time"][rows.start : rows.stop])
+        tests["suite"].extend(array("I", [index]) * len(rows))
+        tests["body_source"].extend(array("I", [NO_STRING]) * len(rows))
+        tests["body_offset"].extend(array("Q", [0]) * len(rows))
+        tests["body_length"].extend(array("Q", [0]) * len(rows))
+        tests["variants"].extend(table.columns["variants"][rows.start : rows.stop])
+    suites["first_test"].append(len(tests["status"]))
+    status_index = {name: array(typecode) for name, typecode in STATUS_INDEX_COLUMNS}
+    status_index["start"].append(0)
+    for index_rows in status_rows.values():
+        status_index["rows"].extend(index_rows)
+        status_index["start"].append(len(status_index["rows"]))
+
+    meta = TEST_META.pack(
+        report.total_time,
+        report.total_tests,
+        report.total_passed,
+        report.total_failed,
+        report.total_error,
+        report.total_skipped,
+        report.success_rate,
+    )
+    return (
+        strings.sections()
+        + [meta]
+        + [_little_endian(suites[name]) for name, _ in SUITE_COLUMNS]
+        + [_little_endian(tests[name]) for name, _ in TEST_COLUMNS]
+        + [_little_endian(status_index[name]) for name, _ in STATUS_INDEX_COLUMNS]
+    )
+
+
+def _load_test_report(reader: SnapshotReader) -> TestReport:
+    meta = TEST_META.unpack(reader.section(2))
+    suite_names, suite_times, first_tests, suite_nested = (
+        reader.column(3 + index, typecode) for index, (_, typecode) in enumerate(SUITE_COLUMNS)
+    )
+    # The table's string ids are the snapshot's string ids
+    tests = TestCaseTable.from_columns(
+        strings=LazySequence(reader.string_count, reader.string),
+        columns={
+            name: reader.column(3 + len(SUITE_COLUMNS) + index, typecode)
+            for index, (name, typecode) in enumerate(TEST_COLUMNS)
+        },
+    )
+
+    def test_suite(index: int) -> TestSuite:
+        start, end = first_tests[index], first_tests[index + 1]
+        suite = TestSuite.__new__(TestSuite)
+        suite.name = reader.string(suite_names[index])
+        suite.time = suite_times[index]
+        suite.nested = bool(suite_nested[index])
+        suite.tests = TestCaseRange(tests, start, end)
+        # Counted on the raw status bytes rather than on built test cases
+        suite.passed = suite.tests.count(TestResult.PASSED)
+        suite.failed = suite.tests.count(TestResult.FAILED)
+        suite.errored = suite.tests.count(TestResult.ERROR)
+        suite.skipped = suite.tests.count(TestResult.SKIPPED)
+        return suite
+
+    report = TestReport.__new__(TestReport)
+    (
+        report.total_time,
+        report.total_tests,
+        report.total_passed,
+        report.total_failed,
+        report.total_error,
+        report.total_skipped,
+        report.success_rate,
+    ) = meta
+    report.tests = tests
+    report.suites = LazySequence(len(suite_names), test_suite)
+    index_rows, index_start = (
+        reader.column(3 + len(SUITE_COLUMNS) + len(TEST_COLUMNS) + index, typecode)
+        for index, (_, typecode) in enumerate(STATUS_INDEX_COLUMNS)
+    )
+    report.status_index = {
+        status: index_rows[index_start[index] : index_start[index + 1]]
+        for index, status in enumerate(TestResult)
+    }
+    report.slowest_suites = [
+        report.suites[index]
+        for index in heapq.nlargest(slowest_count(), range(len(suite_times)), key=suite_times.__getitem__)
+    ]
+    report.failure_clusters = {}
+    report.failure_summary = LazyMapping(report.build_failure_summary)
+    return report
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -15,7 +15,7 @@ class TestSuiteXmlIdentifier(XmlIdentifierBase):
         # Check for JUnit
         if self.root.tag == "testsuites":
             # JUnit and similar formats (e.g. Jest, Pytest using JUnit reporter)
-            if any(child.tag == "testsuite" for child in self.root):
+            if self.stream.find_child("testsuite") is not None:
                 return TestSuiteFileType.JUNIT
         elif self.root.tag == "testsuite":
             # Single <testsuite> root, which is valid for JUnit as well
@@ -0,0 +1,89 @@
+"""XML parsing engines used by XmlStream.
+
+lxml is used when it is installed, stdlib ElementTree otherwise. The choice can be
+forced with the `xml_engine` input (INPUT_XML_ENGINE): 'auto', 'lxml' or 'stdlib'.
+"""
+
+from abc import ABC, abstractmethod
+import logging
+import os
+from typing import Any, FrozenSet, Optional
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - depends on the environment
+    lxml_etree = None
+
+logger = logging.getLogger("webhook-reporter-logger")
+
+
+class XmlEngine(ABC):
+    """Creates the pull parsers that XmlStream feeds"""
+
+    name: str
+    # Whether the parser only reports the requested tags and can release elements itself
+    filters_tags = False
+
+    @abstractmethod
+    def pull_parser(self, tags: Optional[FrozenSet[str]] = None) -> Any:
+        """Returns a pull parser reporting start and end events"""
+        raise NotImplementedError
+
+
+class StdlibEngine(XmlEngine):
+    """ElementTree from the standard library, reports every element"""
+
+    name = "stdlib"
+
+    def pull_parser(self, tags: Optional[FrozenSet[str]] = None) -> Any:
+        return ET.XMLPullParser(events=("start", "end"))
+
+
+class LxmlEngine(XmlEngine):
+    """lxml, whose parser filters tags in C and whose elements know their parent"""
+
+    name = "lxml"
+    filters_tags = True
+
+    def pull_parser(self, tags: Optional[FrozenSet[str]] = None) -> Any:
+        return lxml_etree.XMLPullParser(
+            events=("start", "end"),
+            tag=tags,
+            huge_tree=True,
+            resolve_entities=False,
+            no_network=True,
+        )
+
+    def release(self, element: Any, outermost: bool):
+        """Frees a streamed element once it has been handed out"""
+        parent = element.getparent()
+        if parent is None:
+            # The root is kept so its attributes can be read once streaming ends
+            return
+        element.clear(keep_tail=True)
+        if outermost:
+            # Drop everything read up to this element, at every level of the tree
+            for node in element.iterancestors():
+                grandparent = node.getparent()
+                while grandparent is not None and node.getprevious() is not None:
+                    del grandparent[0]
+            while element.getprevious() is not None:
+                del parent[0]
+        parent.remove(element)
+
+
+def get_xml_engine(name: str = None) -> XmlEngine:
+    """Returns the engine for `name`, or the one configured for the action"""
+    name = (name or os.getenv("INPUT_XML_ENGINE") or "auto").lower().strip()
+    if name not in ("auto", "lxml", "stdlib"):
+        logger.warning(f"Unknown XML engine '{name}', using 'auto'")
+        name = "auto"
+
+    if name == "stdlib":
+        return StdlibEngine()
+    if lxml_etree is None:
+        if name == "lxml":
+            logger.warning("The lxml XML engine was requested but lxml is not installed, using 'stdlib'")
+        return StdlibEngine()
+    return LxmlEngine()
@@ -3,18 +3,25 @@ import xml.etree.ElementTree as ET
 
 
 from src.exceptions.file_errors import MalformedFile
+from src.helpers.xml_stream import XmlStream
+
+
 class XmlIdentifierBase:
     def __init__(self, xml_file: str):
         self.xml_file = xml_file
         self.root = None
+        self.stream = XmlStream(xml_file)
         self.logger = logging.getLogger("webhook-reporter-logger")
     
     def load_xml(self):
-        """Loads and sets self.root to xml root"""
+        """Loads and sets self.root to xml root.
+
+        Only the opening tag of the root is read, the rest of the file is left
+        in `self.stream` for the parser that handles the identified type.
+        """
         try:
-            tree = ET.parse(self.xml_file)
-            self.root = tree.getroot()
-        except ET.ParseError:
+            self.root = self.stream.read_root()
+        except (ET.ParseError, MalformedFile):
             raise MalformedFile(file=self.xml_file)
         except Exception as e:
-            self.logger.error(f"[{e}] occurred trying to load and parse the XML file '{self.xml_file}'")
\ No newline at end of file
+            self.logger.error(f"[{e}] occurred trying to load and parse the XML file '{self.xml_file}'")
@@ -0,0 +1,184 @@
+"""Incremental XML reading shared by the coverage parsers and test readers"""
+
+from collections import deque
+from itertools import chain
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+import xml.etree.ElementTree as ET
+
+from src.exceptions.file_errors import MalformedFile
+from src.helpers.xml_engines import StdlibEngine, XmlEngine, get_xml_engine
+
+CHUNK_SIZE = 64 * 1024
+
+
+class XmlStream:
+    """Streams the elements of an XML file as they close.
+
+    Elements whose tag is requested are handed out while the file is being read,
+    then cleared and detached from their parent so the tree never grows past the
+    element currently being processed. Other elements stay attached to the
+    enclosing requested element (so it can still read them) and are dropped
+    straight away when they are outside of one.
+
+    The file is only read once: whatever is read ahead to identify the report
+    (see `read_root`) is replayed to the parser the stream is handed to. With an
+    engine that filters tags (lxml) the bytes read ahead are replayed instead, to
+    a parser that only reports the requested tags.
+    """
+
+    def __init__(
+        self, xml_file: str, chunk_size: int = CHUNK_SIZE, engine: XmlEngine = None
+    ):
+        self.xml_file = xml_file
+        self.chunk_size = chunk_size
+        self.engine = engine or get_xml_engine()
+        self.root: Optional[ET.Element] = None
+        self._file = None
+        # Bytes read while identifying, for a filtering engine to parse again
+        self._read_chunks: List[bytes] = []
+        self._keep_chunks = self.engine.filters_tags
+        # Identification always reads with ElementTree, which reports the events
+        # parsed before a syntax error, so a broken body fails when it is read
+        self._source = self._read_events(StdlibEngine().pull_parser())
+        self._pending: Deque[Tuple[str, ET.Element]] = deque()
+        self._depth = 0
+
+    @staticmethod
+    def open(xml_file: str, handed_over: "XmlStream" = None) -> "XmlStream":
+        """Returns the stream handed over by identification, or a new one for xml_file"""
+        if handed_over is not None and handed_over.xml_file == xml_file:
+            return handed_over
+        return XmlStream(xml_file)
+
+    def read_root(self) -> ET.Element:
+        """Reads only as far as the opening tag of the root element"""
+        self._read_ahead(until=lambda event, element, depth: self.root is not None)
+        if self.root is None:
+            raise MalformedFile(file=self.xml_file)
+        return self.root
+
+    def find_child(self, tag: str) -> Optional[ET.Element]:
+        """Reads ahead until a direct child of the root with `tag` opens"""
+        return self._read_ahead(
+            until=lambda event, element, depth: event == "start"
+            and depth == 2
+            and element.tag == tag
+        )
+
+    def iter_elements(
+        self, tags: Iterable[str], start_tags: Iterable[str] = ()
+    ) -> Iterator[Tuple[str, ET.Element]]:
+        """Yields ("end", element) for every element in `tags` as it closes,
+        and ("start", element) for every element in `start_tags` as it opens.
+
+        A 'start' element only has its attributes, an 'end' element is complete
+        until the caller asks for the next one.
+        """
+        tags = frozenset(tags)
+        start_tags = frozenset(start_tags)
+        if self.engine.filters_tags:
+            yield from self._iter_filtered(tags, start_tags)
+            return
+
+        stack: List[ET.Element] = []
+        open_records = 0
+        for event, element in self._replay():
+            if event == "start":
+                stack.append(element)
+                if element.tag in tags:
+                    open_records += 1
+                if element.tag in start_tags:
+                    yield event, element
+                continue
+
+            stack.pop()
+            if element.tag in tags:
+                open_records -= 1
+                yield event, element
+            elif open_records:
+                # Still readable by the requested element that contains it
+                continue
+
+            # The root is kept so its attributes can be read once streaming ends
+            if stack:
+                element.clear()
+                stack[-1].remove(element)
+
+    def _iter_filtered(
+        self, tags: frozenset, start_tags: frozenset
+    ) -> Iterator[Tuple[str, Any]]:
+        """iter_elements for engines whose parser only reports the requested tags"""
+        # Identification events are dropped, the bytes behind them are parsed again
+        self._source.close()
+        self._pending.clear()
+        replayed, self._read_chunks = self._read_chunks, []
+        self._keep_chunks = False
+        parser = self.engine.pull_parser(tags=tags | start_tags)
+
+        open_records = 0
+        for event, element in self._read_events(parser, replayed):
+            if event == "start":
+                if element.tag in tags:
+                    open_records += 1
+                if element.tag in start_tags:
+                    yield event, element
+                continue
+            if element.tag not in tags:
+                continue
+            open_records -= 1
+            yield event, element
+            self.engine.release(element, outermost=open_records == 0)
+
+    def _read_ahead(
+        self, until: Callable[[str, ET.Element, int], bool]
+    ) -> Optional[ET.Element]:
+        """Buffers events until `until` matches one, returning its element"""
+        for event, element in self._source:
+            self._pending.append((event, element))
+            self._depth += 1 if event == "start" else -1
+            if until(event, element, self._depth):
+                return element
+        return None
+
+    def _replay(self) -> Iterator[Tuple[str, ET.Element]]:
+        """Events read ahead first, then the rest of the file"""
+        while self._pending:
+            yield self._pending.popleft()
+        yield from self._source
+
+    def _read_events(
+        self, parser: Any, replayed: Iterable[bytes] = ()
+    ) -> Iterator[Tuple[str, ET.Element]]:
+        """Feeds `replayed` and then the rest of the file to the pull parser"""
+        try:
+            for chunk in chain(replayed, self._iter_chunks()):
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if self.root is None:
+                        self.root = self._root_of(element)
+                    yield event, element
+            parser.close()
+            yield from parser.read_events()
+        # ET.ParseError and lxml's XMLSyntaxError are both SyntaxErrors
+        except SyntaxError as e:
+            raise MalformedFile(file=self.xml_file) from e
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        """Reads the rest of the file, from wherever an earlier read stopped"""
+        if self._file is None:
+            self._file = open(self.xml_file, "rb")
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                self._file.close()
+                return
+            if self._keep_chunks:
+                self._read_chunks.append(chunk)
+            yield chunk
+
+    def _root_of(self, element: Any) -> Any:
+        """The root of the tree `element` belongs to"""
+        if hasattr(element, "getroottree"):
+            # A filtering parser may report a nested element first
+            return element.getroottree().getroot()
+        return element
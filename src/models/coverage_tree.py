@@ -0,0 +1,134 @@
+"""Coverage rolled up by directory, from a trie over the paths of the report's files"""
+
+from array import array
+from dataclasses import dataclass
+import heapq
+from typing import Dict, List, Optional
+
+# FileCoverage counts added up per directory
+TREE_COLUMNS = ("lines_covered", "lines_valid", "branches_covered", "branches_valid")
+ROOT = 0
+
+
+@dataclass
+class DirectoryCoverage:
+    """Counts of the files under a directory (or package)"""
+
+    path: str
+    files: int
+    lines_covered: int
+    lines_valid: int
+    branches_covered: int
+    branches_valid: int
+
+    @property
+    def line_rate(self) -> float:
+        return self.lines_covered / self.lines_valid if self.lines_valid else 0.0
+
+
+class CoverageTree:
+    """A node per directory, holding the counts of every file under it.
+
+    Nodes are ids into parallel arrays, a child always has a larger id than its
+    parent, so after each file's counts are added to its own directory one
+    pass over the ids in reverse rolls them up to the root.
+    """
+
+    def __init__(self):
+        self.names: List[str] = [""]
+        self.parents = array("I", [ROOT])
+        self.children: List[Dict[str, int]] = [{}]
+        self.files = array("q", [0])
+        self.columns: Dict[str, array] = {name: array("q", [0]) for name in TREE_COLUMNS}
+
+    @classmethod
+    def from_files(cls, files) -> "CoverageTree":
+        """Builds the tree from a FileCoverageTable, linear in the number of files.
+
+        Files are placed by their path, which holds the package or directory
+        in reports whose filenames are bare names (JaCoCo, Clover).
+        """
+        tree = cls()
+        # Files of a directory mostly come together, only new directories walk the trie
+        directories: Dict[str, int] = {"": ROOT}
+        file_columns = [(tree.columns[name], files.columns[name]) for name in TREE_COLUMNS]
+        for index in range(len(files)):
+            directory = files.path(index).replace("\\", "/").rpartition("/")[0]
+            node = directories.get(directory)
+            if node is None:
+                node = directories[directory] = tree._insert(directory)
+            tree.files[node] += 1
+            for column, file_column in file_columns:
+                column[node] += file_column[index]
+        tree._roll_up()
+        return tree
+
+    def find(self, path: str) -> Optional[int]:
+        """Node of a directory, None when no file is under it"""
+        node = ROOT
+        for name in _split(path):
+            node = self.children[node].get(name)
+            if node is None:
+                return None
+        return node
+
+    def path(self, node: int) -> str:
+        names = []
+        while node != ROOT:
+            names.append(self.names[node])
+            node = self.parents[node]
+        return "/".join(reversed(names))
+
+    def coverage(self, node: int) -> DirectoryCoverage:
+        return DirectoryCoverage(
+            self.path(node), self.files[node], *(self.columns[name][node] for name in TREE_COLUMNS)
+        )
+
+    def top_level(self) -> List[int]:
+        """Nodes of the top-level modules: the directories below the path all files share"""
+        node = ROOT
+        while len(self.children[node]) == 1:
+            (child,) = self.children[node].values()
+            if self.files[child] != self.files[node]:
+                # Some files are directly in this directory
+                break
+            node = child
+        return list(self.children[node].values())
+
+    def least_covered(self, count: int, nodes: List[int] = None) -> List[DirectoryCoverage]:
+        """The `count` directories with the lowest line rate, the top-level modules by default"""
+        nodes = self.top_level() if nodes is None else nodes
+        lines_covered, lines_valid = self.columns["lines_covered"], self.columns["lines_valid"]
+        with_lines = (node for node in nodes if lines_valid[node])
+        worst = heapq.nsmallest(count, with_lines, key=lambda node: lines_covered[node] / lines_valid[node])
+        return [self.coverage(node) for node in worst]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _insert(self, directory: str) -> int:
+        node = ROOT
+        for name in _split(directory):
+            child = self.children[node].get(name)
+            if child is None:
+                child = self.children[node][name] = len(self.names)
+                self.names.append(name)
+                self.parents.append(node)
+                self.children.append({})
+                self.files.append(0)
+                for column in self.columns.values():
+                    column.append(0)
+            node = child
+        return node
+
+    def _roll_up(self):
+        columns = list(self.columns.values())
+        for node in range(len(self) - 1, ROOT, -1):
+            parent = self.parents[node]
+            self.files[parent] += self.files[node]
+            for column in columns:
+                column[parent] += column[node]
+
+
+def _split(path: str) -> List[str]:
+    return [name for name in path.replace("\\", "/").split("/") if name and name != "."]
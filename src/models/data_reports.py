@@ -1,10 +1,15 @@
 """All report file data objects"""
 
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from math import floor
 
+from src.models.coverage_tree import CoverageTree, DirectoryCoverage
+
 class CoverageType(Enum):
     STANDARD = auto()
     JACOCO = auto()
@@ -23,22 +28,305 @@ class FileCoverage:
     line_rate: float
     branch_rate: float
     complexity: float
+    # Raw counts behind the rates, 0 when the report does not give them
+    lines_covered: int = 0
+    lines_valid: int = 0
+    branches_covered: int = 0
+    branches_valid: int = 0
+    # Source path of the file (its package or directory with its name), the
+    # key of its line hits. The filename when the report gives nothing more.
+    path: Optional[str] = None
+
+    def __post_init__(self):
+        if self.path is None:
+            self.path = self.filename
+
+# FileCoverage fields stored as columns, with their array typecode
+FILE_COVERAGE_COLUMNS = (
+    ("line_rate", "d"),
+    ("branch_rate", "d"),
+    ("complexity", "d"),
+    ("lines_covered", "q"),
+    ("lines_valid", "q"),
+    ("branches_covered", "q"),
+    ("branches_valid", "q"),
+)
+
+
+class FileCoverageTable(Sequence):
+    """Per-file coverage stored as columns instead of one FileCoverage per file.
+
+    Each field is an `array` (or a memoryview of a snapshot) and filenames and
+    paths are ids into a table of unique names, so a file costs a few dozen bytes. Items
+    are FileCoverage objects built when they are accessed, aggregates and
+    orderings are computed on the columns without building any.
+    """
+
+    def __init__(self, files: Iterable[FileCoverage] = ()):
+        self.filenames: Sequence = []
+        self._filename_ids: Dict[str, int] = {}
+        self.filename_column: Sequence = array("I")
+        self.path_column: Sequence = array("I")
+        self.columns: Dict[str, Sequence] = {
+            name: array(typecode) for name, typecode in FILE_COVERAGE_COLUMNS
+        }
+        for file in files:
+            self.append(file)
+
+    @classmethod
+    def from_columns(
+        cls,
+        filenames: Sequence,
+        filename_column: Sequence,
+        columns: Dict[str, Sequence],
+        path_column: Sequence = None,
+    ) -> "FileCoverageTable":
+        """A table over existing columns, e.g. memoryviews of a snapshot"""
+        table = cls()
+        table.filenames = filenames
+        table._filename_ids = None
+        table.filename_column = filename_column
+        table.path_column = filename_column if path_column is None else path_column
+        table.columns = columns
+        return table
+
+    def append(self, file: FileCoverage):
+        self.filename_column.append(self._name_id(file.filename))
+        self.path_column.append(self._name_id(file.path))
+        for name, column in self.columns.items():
+            column.append(getattr(file, name))
+
+    def _name_id(self, name: str) -> int:
+        if self._filename_ids is None:
+            self._filename_ids = {filename: i for i, filename in enumerate(self.filenames)}
+        name_id = self._filename_ids.get(name)
+        if name_id is None:
+            name_id = self._filename_ids[name] = len(self.filenames)
+            self.filenames.append(name)
+        return name_id
+
+    def compact(self):
+        """Drops the lookup used to intern filenames, it is rebuilt if a file is appended"""
+        self._filename_ids = None
+
+    def filename(self, index: int) -> str:
+        return self.filenames[self.filename_column[index]]
+
+    def path(self, index: int) -> str:
+        return self.filenames[self.path_column[index]]
+
+    def total(self, name: str) -> Union[int, float]:
+        """Sum of a column"""
+        return sum(self.columns[name])
+
+    def order_by(self, name: str, reverse: bool = False) -> List[int]:
+        """Indices of the files sorted on a column"""
+        column = self.columns[name]
+        return sorted(range(len(self)), key=column.__getitem__, reverse=reverse)
+
+    def __len__(self) -> int:
+        return len(self.filename_column)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return FileCoverage(
+            self.filename(index),
+            *(self.columns[name][index] for name, _ in FILE_COVERAGE_COLUMNS),
+            path=self.path(index),
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"FileCoverageTable({list(self)!r})"
+
+    def __getstate__(self):
+        # Snapshot memoryviews cannot be pickled, they are copied into arrays
+        return {
+            "filenames": list(self.filenames),
+            "filename_column": array("I", self.filename_column),
+            "path_column": array("I", self.path_column),
+            "columns": {
+                name: array(typecode, self.columns[name])
+                for name, typecode in FILE_COVERAGE_COLUMNS
+            },
+        }
+
+    def __setstate__(self, state):
+        self.filenames = state["filenames"]
+        self._filename_ids = None
+        self.filename_column = state["filename_column"]
+        self.path_column = state["path_column"]
+        self.columns = state["columns"]
+
+
+# Largest count a FileLineHits column holds, larger ones are clamped
+MAX_HITS = 0xFFFFFFFF
+MAX_CONDITIONS = 0xFFFF
+
+
+class FileLineHits:
+    """Hits and branch conditions of one file's lines, as arrays sorted by line number.
+
+    12 bytes per line: the line number and its hits (array('I')), and the
+    covered and valid branch conditions (array('H'), 0 on other lines).
+    """
+
+    __slots__ = ("lines", "hits", "branches_covered", "branches_valid")
+
+    def __init__(self):
+        self.lines = array("I")
+        self.hits = array("I")
+        self.branches_covered = array("H")
+        self.branches_valid = array("H")
+
+    @classmethod
+    def from_columns(cls, lines, hits, branches_covered, branches_valid) -> "FileLineHits":
+        """Line hits over existing columns, e.g. memoryviews of a snapshot"""
+        line_hits = cls.__new__(cls)
+        line_hits.lines = lines
+        line_hits.hits = hits
+        line_hits.branches_covered = branches_covered
+        line_hits.branches_valid = branches_valid
+        return line_hits
+
+    def append(self, line: int, hits: int, branches_covered: int = 0, branches_valid: int = 0):
+        """Adds a line, call `normalise` if lines may not come in order"""
+        self.lines.append(line)
+        self.hits.append(min(hits, MAX_HITS))
+        self.branches_covered.append(min(branches_covered, MAX_CONDITIONS))
+        self.branches_valid.append(min(branches_valid, MAX_CONDITIONS))
+
+    def normalise(self):
+        """Sorts the lines, adding up the hits of a line given more than once.
+
+        The branches of a line are the same ones each time, the larger count is kept.
+        """
+        if all(a < b for a, b in zip(self.lines, self.lines[1:])):
+            return
+        merged: Dict[int, List[int]] = {}
+        for line, hits, covered, valid in zip(self.lines, self.hits, self.branches_covered, self.branches_valid):
+            current = merged.setdefault(line, [0, 0, 0])
+            current[0] += hits
+            current[1] = max(current[1], covered)
+            current[2] = max(current[2], valid)
+        self.__init__()
+        for line in sorted(merged):
+            self.append(line, *merged[line])
+
+    def merge(self, other: "FileLineHits") -> "FileLineHits":
+        """The lines of both, with the hits of a line in both added up"""
+        merged = FileLineHits()
+        for line_hits in (self, other):
+            for row in range(len(line_hits)):
+                merged.append(*line_hits.row(row))
+        merged.normalise()
+        return merged
+
+    def row(self, index: int) -> Tuple[int, int, int, int]:
+        return (
+            self.lines[index],
+            self.hits[index],
+            self.branches_covered[index],
+            self.branches_valid[index],
+        )
+
+    def hits_at(self, line: int) -> Optional[int]:
+        """Hits of the line, None when it is not an executable line"""
+        index = bisect_left(self.lines, line)
+        if index < len(self.lines) and self.lines[index] == line:
+            return self.hits[index]
+        return None
+
+    def uncovered_ranges(self) -> Iterator[Tuple[int, int]]:
+        """Runs of consecutive executable lines that were not hit, as (first, last)"""
+        first = last = None
+        for line, hits in zip(self.lines, self.hits):
+            if hits:
+                if first is not None:
+                    yield first, last
+                    first = None
+                continue
+            if first is None:
+                first = line
+            last = line
+        if first is not None:
+            yield first, last
+
+    @property
+    def lines_covered(self) -> int:
+        return len(self.hits) - array("I", self.hits).count(0)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FileLineHits):
+            return NotImplemented
+        return len(self) == len(other) and all(self.row(i) == other.row(i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"FileLineHits(lines={len(self)}, covered={self.lines_covered})"
+
+    def __getstate__(self):
+        # Snapshot memoryviews cannot be pickled, they are copied into arrays
+        return (
+            array("I", self.lines),
+            array("I", self.hits),
+            array("H", self.branches_covered),
+            array("H", self.branches_valid),
+        )
+
+    def __setstate__(self, state):
+        self.lines, self.hits, self.branches_covered, self.branches_valid = state
+
 
 @dataclass
 class NormalisedCoverageData:
     total_line_rate: float
     total_branch_rate: float
-    files: List[FileCoverage]
+    files: FileCoverageTable
     timestamp: str
     complexity_avg: float = 0.0
     total: int = 0
+    # Report-wide counts behind the total rates, 0 when the report does not give them
+    lines_covered: int = 0
+    lines_valid: int = 0
+    branches_covered: int = 0
+    branches_valid: int = 0
+    # Per-line hits by source path (FileCoverage.path), only collected with the `line_hits` input
+    line_hits: Optional[Dict[str, FileLineHits]] = None
+    # Counts rolled up by directory, built with the report (see `directory_tree`)
+    directories: Optional[CoverageTree] = field(default=None, compare=False, repr=False)
 
     def __post_init__(self):
         self.total_line_rate  = floor(self.total_line_rate * 100)
         self.total_branch_rate  = floor(self.total_branch_rate * 100)
+        if not isinstance(self.files, FileCoverageTable):
+            self.files = FileCoverageTable(self.files)
+        self.files.compact()
         self.total = len(self.files)
-        complexity_avg = sum([file.complexity for file in self.files]) /  self.total
+        complexity_avg = self.files.total("complexity") /  self.total
         self.complexity_avg = round(complexity_avg, 4) # 0.0000 per DTDs of Schemas
+        self.directories = CoverageTree.from_files(self.files)
+
+    def directory_tree(self) -> CoverageTree:
+        """The directory rollup, built on first use for reports loaded from a snapshot"""
+        if self.directories is None:
+            self.directories = CoverageTree.from_files(self.files)
+        return self.directories
+
+    def least_covered_modules(self, count: int) -> List[DirectoryCoverage]:
+        """The `count` top-level modules with the lowest line rate"""
+        return self.directory_tree().least_covered(count)
 
 
 class CoverageMetricType(Enum):
@@ -1,9 +1,21 @@
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import List, Dict
+import heapq
+import logging
+import os
+from math import nan as NAN
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from src.helpers.failure_bodies import BodyFiles, BodySource
+from src.helpers.failure_clusters import FailureCluster, cluster_failures
 from src.helpers.humanise_data import humanise_seconds
 
+logger = logging.getLogger("webhook-reporter-logger")
+
+DEFAULT_SLOWEST_COUNT = 5
+
 
 class TestResult(Enum):
     """Test case status [passed, failed, skipped]"""
@@ -49,36 +61,462 @@ class TestCase:
         self.full_message = full_message
 
 
+def slowest_count() -> int:
+    """How many of the slowest tests and suites are ranked, the `slowest_tests` input"""
+    count = os.getenv("INPUT_SLOWEST_TESTS")
+    try:
+        return max(int(count or DEFAULT_SLOWEST_COUNT), 0)
+    except ValueError:
+        logger.warning(f"Invalid slowest tests count '{count}', using {DEFAULT_SLOWEST_COUNT}")
+        return DEFAULT_SLOWEST_COUNT
+
+
+# How a cluster of failures of each status reads, "N tests failed with"
+CLUSTER_VERBS = {TestResult.FAILED: "failed", TestResult.ERROR: "errored"}
+
+# String id standing for None in a TestCaseTable
+NO_STRING = 0xFFFFFFFF
+# TestCaseTable columns and their array typecode
+TEST_CASE_COLUMNS = (
+    ("name", "I"),
+    ("status", "B"),
+    ("time", "d"),
+    ("message", "I"),
+    ("full_message", "I"),
+    ("suite", "I"),
+    # Where a failure body left in the report file is, see set_body
+    ("body_source", "I"),
+    ("body_offset", "Q"),
+    ("body_length", "Q"),
+    # Variants of a parameterised test the row stands for, see src.helpers.parameterised
+    ("variants", "I"),
+)
+
+
+class TestCaseTable:
+    """The test cases of a report as parallel arrays, one row per case.
+
+    Statuses are stored as their TestResult value, times as floats (NaN when
+    a case had none) and the strings as ids into one table of unique strings.
+    Counting, filtering and summing a range of rows works on the arrays
+    without building any case. The `slowest_k` slowest rows are kept in a
+    min-heap of (time, -row) as rows are added.
+
+    A full_message can also be left in the report file, with only its
+    source, offset and length stored, and is then read when it is accessed.
+    Each source file is mapped once, for as long as the table is used.
+
+    A row can stand for several variants of a parameterised test, counts are
+    then summed from the variants column rather than counted on the statuses.
+    """
+
+    __test__ = False
+
+    def __init__(self, slowest_k: int = None):
+        self.strings: List[str] = []
+        self._string_ids: Optional[Dict[str, int]] = {}
+        self.columns: Dict[str, Any] = {
+            name: array(typecode) for name, typecode in TEST_CASE_COLUMNS
+        }
+        self.slowest_k = slowest_count() if slowest_k is None else slowest_k
+        self.slowest: Optional[List[Tuple[float, int]]] = []
+        self.sources: List[BodySource] = []
+        self.bodies = BodyFiles()
+        # Whether any row stands for more than one variant
+        self.grouped = False
+
+    @classmethod
+    def from_columns(
+        cls, strings: Sequence, columns: Dict[str, Any], sources: List[BodySource] = None
+    ) -> "TestCaseTable":
+        """A table over existing columns, e.g. memoryviews of a snapshot"""
+        table = cls()
+        table.strings = strings
+        table._string_ids = None
+        table.columns = columns
+        table.sources = sources or []
+        table.grouped = max(columns["variants"], default=1) > 1
+        # Ranked from the time column when asked
+        table.slowest = None
+        return table
+
+    def __len__(self) -> int:
+        return len(self.columns["status"])
+
+    def add(self, tests: Iterable[TestCase], suite: int = 0) -> "TestCaseRange":
+        """Appends the cases as rows, returning the range they take"""
+        start = len(self)
+        columns = self.columns
+        for test in tests:
+            columns["name"].append(self._string_id(test.name))
+            columns["status"].append(test.status.value)
+            time = getattr(test, "time", NAN)
+            self._rank(time, len(columns["time"]))
+            columns["time"].append(time)
+            columns["message"].append(self._string_id(test.message))
+            columns["full_message"].append(self._string_id(test.full_message))
+            columns["suite"].append(suite)
+            columns["body_source"].append(NO_STRING)
+            columns["body_offset"].append(0)
+            columns["body_length"].append(0)
+            variants = getattr(test, "variants", 1)
+            self.grouped = self.grouped or variants != 1
+            columns["variants"].append(variants)
+        return TestCaseRange(self, start, len(self))
+
+    def set_body(self, row: int, source: BodySource, offset: int, length: int):
+        """Points the row's full_message at (offset, length) in the source file"""
+        if source not in self.sources:
+            self.sources.append(source)
+        self.columns["full_message"][row] = NO_STRING
+        self.columns["body_source"][row] = self.sources.index(source)
+        self.columns["body_offset"][row] = offset
+        self.columns["body_length"][row] = length
+
+    def full_message(self, row: int, limit: int = None) -> Optional[str]:
+        """The row's full_message, read from its report file when it was left there.
+
+        With `limit` only its first `limit` characters are returned, and only
+        that much of a body left in the report file is read.
+        """
+        source_id = self.columns["body_source"][row]
+        if source_id == NO_STRING:
+            text = self.string(self.columns["full_message"][row])
+            return text if limit is None or text is None else text[:limit]
+        return self.bodies.read(
+            self.sources[source_id],
+            self.columns["body_offset"][row],
+            self.columns["body_length"][row],
+            limit=limit,
+        )
+
+    def extend(self, other: "TestCaseTable") -> int:
+        """Appends the rows of another table, returning where they start"""
+        start = len(self)
+        string_ids = [self._string_id(string) for string in other.strings]
+        for name in ("name", "message", "full_message"):
+            self.columns[name].extend(
+                NO_STRING if string_id == NO_STRING else string_ids[string_id]
+                for string_id in other.columns[name]
+            )
+        for name in ("status", "time", "suite", "body_offset", "body_length", "variants"):
+            self.columns[name].extend(other.columns[name])
+        self.grouped = self.grouped or other.grouped
+        source_ids = []
+        for source in other.sources:
+            if source not in self.sources:
+                self.sources.append(source)
+            source_ids.append(self.sources.index(source))
+        self.columns["body_source"].extend(
+            NO_STRING if source_id == NO_STRING else source_ids[source_id]
+            for source_id in other.columns["body_source"]
+        )
+        for row in other.slowest_rows(self.slowest_k):
+            self._rank(other.columns["time"][row], start + row)
+        return start
+
+    def slowest_rows(self, n: int) -> List[int]:
+        """The n rows with the longest times, slowest first, rows without a time are left out"""
+        if self.slowest is not None and n <= self.slowest_k:
+            return [-row for _, row in sorted(self.slowest, reverse=True)[:n]]
+        times = self.columns["time"]
+        return heapq.nlargest(n, (row for row, time in enumerate(times) if time == time), key=times.__getitem__)
+
+    def _rank(self, time: float, row: int):
+        """Keeps the row in the slowest heap if it is among the slowest_k"""
+        if time != time or not self.slowest_k:
+            return
+        if len(self.slowest) < self.slowest_k:
+            heapq.heappush(self.slowest, (time, -row))
+        elif (time, -row) > self.slowest[0]:
+            heapq.heapreplace(self.slowest, (time, -row))
+
+    def compact(self):
+        """Drops the lookup used to intern strings, it is rebuilt if rows are added"""
+        self._string_ids = None
+
+    def string(self, string_id: int) -> Optional[str]:
+        return None if string_id == NO_STRING else self.strings[string_id]
+
+    def count(self, status: TestResult, start: int = 0, stop: int = None) -> int:
+        """Number of tests with `status`"""
+        statuses = bytes(self.columns["status"][start:stop])
+        if not self.grouped:
+            return statuses.count(status.value)
+        variants = self.columns["variants"][start:stop]
+        return sum(count for code, count in zip(statuses, variants) if code == status.value)
+
+    def variant_count(self, start: int = 0, stop: int = None) -> int:
+        """Number of tests in the rows, a grouped row counts each of its variants"""
+        if not self.grouped:
+            return len(range(len(self))[start:stop])
+        return sum(self.columns["variants"][start:stop])
+
+    def count_rows(self, rows: Sequence[int]) -> int:
+        """Number of tests in the given rows"""
+        if not self.grouped:
+            return len(rows)
+        variants = self.columns["variants"]
+        return sum(variants[row] for row in rows)
+
+    def total_time(self, start: int = 0, stop: int = None) -> float:
+        return sum(time for time in self.columns["time"][start:stop] if time == time)
+
+    def rows(self, status: TestResult, start: int = 0, stop: int = None) -> Iterator[int]:
+        """Rows with `status`, found by searching the status bytes"""
+        stop = len(self) if stop is None else stop
+        statuses = bytes(self.columns["status"][start:stop])
+        code = bytes([status.value])
+        index = statuses.find(code)
+        while index != -1:
+            yield start + index
+            index = statuses.find(code, index + 1)
+
+    def _string_id(self, text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        if self._string_ids is None:
+            self._string_ids = {string: i for i, string in enumerate(self.strings)}
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def __getstate__(self):
+        # Snapshot memoryviews cannot be pickled, they are copied into arrays
+        return {
+            "strings": list(self.strings),
+            "columns": {
+                name: array(typecode, self.columns[name]) for name, typecode in TEST_CASE_COLUMNS
+            },
+            "slowest_k": self.slowest_k,
+            "slowest": self.slowest,
+            "sources": self.sources,
+            "grouped": self.grouped,
+        }
+
+    def __setstate__(self, state):
+        self.strings = state["strings"]
+        self._string_ids = None
+        self.columns = state["columns"]
+        self.slowest_k = state["slowest_k"]
+        self.slowest = state["slowest"]
+        self.sources = state["sources"]
+        self.bodies = BodyFiles()
+        self.grouped = state["grouped"]
+
+
+class TestCaseView:
+    """A row of a TestCaseTable, read like a TestCase"""
+
+    __test__ = False
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: TestCaseTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def name(self) -> str:
+        return self.table.string(self.table.columns["name"][self.row])
+
+    @property
+    def status(self) -> TestResult:
+        return TestResult(self.table.columns["status"][self.row])
+
+    @property
+    def time(self) -> float:
+        time = self.table.columns["time"][self.row]
+        if time != time:
+            # Like a TestCase, a case without a time has no time attribute
+            raise AttributeError("time")
+        return time
+
+    @property
+    def message(self) -> Optional[str]:
+        return self.table.string(self.table.columns["message"][self.row])
+
+    @property
+    def full_message(self) -> Optional[str]:
+        return self.table.full_message(self.row)
+
+    def full_message_prefix(self, limit: int) -> Optional[str]:
+        """The first `limit` characters of full_message, without reading the rest of it"""
+        return self.table.full_message(self.row, limit=limit)
+
+    @property
+    def variants(self) -> int:
+        """Variants of a parameterised test the case stands for, 1 for other tests"""
+        return self.table.columns["variants"][self.row]
+
+    @property
+    def suite(self) -> int:
+        """Index of the case's suite in its report"""
+        return self.table.columns["suite"][self.row]
+
+    def _fields(self) -> Tuple:
+        return (self.name, self.status, getattr(self, "time", None), self.message, self.full_message)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (TestCase, TestCaseView)):
+            return NotImplemented
+        other_fields = (
+            other.name,
+            other.status,
+            getattr(other, "time", None),
+            other.message,
+            other.full_message,
+        )
+        return self._fields() == other_fields
+
+    def __repr__(self) -> str:
+        return f"TestCaseView(name={self.name!r}, status={self.status})"
+
+
+class TestCaseRange(Sequence):
+    """The consecutive rows of a TestCaseTable that belong to one suite"""
+
+    __test__ = False
+
+    def __init__(self, table: TestCaseTable, start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return TestCaseView(self.table, self.start + index)
+
+    def count(self, status: TestResult) -> int:
+        return self.table.count(status, self.start, self.stop)
+
+    def variant_count(self) -> int:
+        return self.table.variant_count(self.start, self.stop)
+
+    def by_status(self, status: TestResult) -> Iterator[TestCaseView]:
+        for row in self.table.rows(status, self.start, self.stop):
+            yield TestCaseView(self.table, row)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"TestCaseRange({self.start}, {self.stop})"
+
+
+class TestCaseRows(Sequence):
+    """Rows of a TestCaseTable picked by an index, views are built when accessed"""
+
+    __test__ = False
+
+    def __init__(self, table: TestCaseTable, rows: Sequence[int]):
+        self.table = table
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TestCaseView(self.table, row) for row in self.rows[index]]
+        return TestCaseView(self.table, self.rows[index])
+
+    def __iter__(self) -> Iterator[TestCaseView]:
+        return (TestCaseView(self.table, row) for row in self.rows)
+
+    def __repr__(self) -> str:
+        return f"TestCaseRows(length={len(self.rows)})"
+
+
 @dataclass
 class TestSuite:
-    """Test Suite information. Aggregates all TestCase(s) and their information"""
+    """Test Suite information. Aggregates all TestCase(s) and their information.
+
+    `tests` can be given as a list of TestCase, which is stored in a table of
+    its own, or as the range of a table the reader filled.
+    """
 
     __test__ = False
     name: str
-    tests: List[TestCase]
+    tests: Sequence[TestCase]
     time: float
     passed: int = 0
     failed: int = 0
     errored: int = 0
     skipped: int = 0
+    # Inside a suite whose time already includes this one's
+    nested: bool = False
 
     def __post_init__(self):
         """Generate the TestResult metrics"""
-        self.passed = sum(1 for test in self.tests if test.status == TestResult.PASSED)
-        self.failed = sum(1 for test in self.tests if test.status == TestResult.FAILED)
-        self.errored = sum(1 for test in self.tests if test.status == TestResult.ERROR)
-        self.skipped = sum(
-            1 for test in self.tests if test.status == TestResult.SKIPPED
-        )
+        if not isinstance(self.tests, TestCaseRange):
+            self.tests = TestCaseTable().add(self.tests)
+        self.passed = self.tests.count(TestResult.PASSED)
+        self.failed = self.tests.count(TestResult.FAILED)
+        self.errored = self.tests.count(TestResult.ERROR)
+        self.skipped = self.tests.count(TestResult.SKIPPED)
 
-    def tests_by_status(self, test_status: TestResult) -> TestCase:
+    def tests_by_status(self, test_status: TestResult) -> List[TestCaseView]:
         """Returns the tests by status"""
-        return [test for test in self.tests if test.status == test_status]
+        return list(self.tests.by_status(test_status))
+
+
+class SlowestSuites:
+    """The `k` slowest suites, kept in a min-heap of (time, -order) as readers close them.
+
+    `order` is where the suite ends up in the report, suites as slow as each
+    other are ranked in that order.
+    """
+
+    __test__ = False
+
+    def __init__(self, k: int = None):
+        self.k = slowest_count() if k is None else k
+        self._heap: List[Tuple[float, int, TestSuite]] = []
+
+    def add(self, suite: TestSuite, order: int):
+        if not self.k:
+            return
+        entry = (suite.time, -order, suite)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def suites(self) -> List[TestSuite]:
+        """Slowest first"""
+        return [suite for _, _, suite in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+    @staticmethod
+    def merge(rankings: Iterable[List[TestSuite]], k: int = None) -> List[TestSuite]:
+        """The k slowest of the rankings of reports whose suites are put one after the other"""
+        k = slowest_count() if k is None else k
+        # nlargest is stable, as slow suites keep the order of the reports
+        return heapq.nlargest(k, (suite for ranking in rankings for suite in ranking), key=lambda s: s.time)
 
 
 @dataclass
 class TestReport:
-    """Test report on given test run with total test suites added."""
+    """Test report on given test run with total test suites added.
+
+    The cases of every suite end up in one TestCaseTable (`tests`), suites
+    that were built on their own tables are copied into it. `status_index`
+    holds the rows of each status in suite order, built once so status
+    queries do not scan the suites again. Readers rank `slowest_suites` as
+    they close the suites (see SlowestSuites), they are only ranked here
+    when a report is built from suites that were not.
+    """
 
     __test__ = False
     suites: List[TestSuite]
@@ -90,10 +528,25 @@ class TestReport:
     total_skipped: int = field(init=False)
     success_rate: float = field(init=False)
     failure_summary: Dict[str, List[str]] = field(default_factory=dict)
+    slowest_suites: Optional[List[TestSuite]] = field(default=None, repr=False, compare=False)
+    tests: TestCaseTable = field(init=False, repr=False, compare=False)
+    status_index: Dict[TestResult, array] = field(init=False, repr=False, compare=False)
+    failure_clusters: Dict[TestResult, List[FailureCluster]] = field(
+        init=False, default_factory=dict, repr=False, compare=False
+    )
 
     def __post_init__(self):
-        self.total_time = sum(suite.time for suite in self.suites)
-        self.total_tests = sum(len(suite.tests) for suite in self.suites)
+        self.tests = self._shared_table()
+        suite_column = self.tests.columns["suite"]
+        for index, suite in enumerate(self.suites):
+            rows = suite.tests
+            suite_column[rows.start : rows.stop] = array("I", [index]) * len(rows)
+        self.tests.compact()
+        self.status_index = self.build_status_index()
+
+        # A nested suite's time is part of its parent's
+        self.total_time = sum(suite.time for suite in self.suites if not suite.nested)
+        self.total_tests = sum(suite.tests.variant_count() for suite in self.suites)
         self.total_passed = sum(suite.passed for suite in self.suites)
         self.total_failed = sum(suite.failed for suite in self.suites)
         self.total_error = sum(suite.errored for suite in self.suites)
@@ -101,35 +554,84 @@ class TestReport:
         self.success_rate = (
             self.total_passed / self.total_tests if self.total_tests > 0 else 0
         )
+        if self.slowest_suites is None:
+            self.slowest_suites = heapq.nlargest(slowest_count(), self.suites, key=lambda s: s.time)
         self.generate_failure_summary()
 
+    def _shared_table(self) -> TestCaseTable:
+        """The table every suite's cases are in, building one when they differ"""
+        tables = {id(suite.tests.table): suite.tests.table for suite in self.suites}
+        if len(tables) == 1:
+            return next(iter(tables.values()))
+
+        table = TestCaseTable()
+        copied: Dict[int, int] = {}
+        for suite in self.suites:
+            rows = suite.tests
+            if id(rows.table) not in copied:
+                copied[id(rows.table)] = table.extend(rows.table)
+            start = copied[id(rows.table)] + rows.start
+            suite.tests = TestCaseRange(table, start, start + len(rows))
+        return table
+
     @property
     def readable_success_rate(self):
         """The readable success rate is a formatted success rate for the views"""
         return round(self.success_rate * 100, 2)
 
+    def build_status_index(self) -> Dict[TestResult, array]:
+        """Rows of every status, in the order of the suites"""
+        index = {status: array("I") for status in TestResult}
+        for suite in self.suites:
+            rows = suite.tests
+            for status, status_rows in index.items():
+                status_rows.extend(self.tests.rows(status, rows.start, rows.stop))
+        return index
+
     def generate_failure_summary(self):
         """Generates the 'failure_summary' for all Failed testcases"""
-        for suite in self.suites:
-            failed_tests = [
-                test for test in suite.tests if test.status == TestResult.FAILED
-            ]
-            if failed_tests:
-                self.failure_summary[suite.name] = [
-                    f"{test.name}: {test.message}" for test in failed_tests
-                ]
-
-    def get_tests_by_status(self, test_status: TestResult) -> List[TestCase]:
+        self.failure_summary.update(self.build_failure_summary())
+
+    def build_failure_summary(self) -> Dict[str, List[str]]:
+        """'name: message' of the Failed testcases by suite name"""
+        summary: Dict[str, List[str]] = {}
+        suite_column = self.tests.columns["suite"]
+        current_suite = None
+        failures: List[str] = []
+        for test in self.iter_tests_by_status(TestResult.FAILED):
+            suite = suite_column[test.row]
+            if suite != current_suite:
+                current_suite = suite
+                failures = []
+                # A later suite with the same name replaces an earlier one
+                summary[self.suites[suite].name] = failures
+            failures.append(f"{test.name}: {test.message}")
+        return summary
+
+    def get_tests_by_status(self, test_status: TestResult) -> TestCaseRows:
         """Returns all tests in all suites that match given test_case"""
-        tests: List[TestCase] = []
-        for suite in self.suites:
-            tests = tests + suite.tests_by_status(test_status=test_status)
-        return tests
+        return TestCaseRows(self.tests, self.status_index[test_status])
+
+    def iter_tests_by_status(self, test_status: TestResult) -> Iterator[TestCaseView]:
+        """Lazily yields the tests of given status, for callers that only show the first few"""
+        return iter(self.get_tests_by_status(test_status))
+
+    def count_tests_by_status(self, test_status: TestResult) -> int:
+        return self.tests.count_rows(self.status_index[test_status])
+
+    def get_failure_clusters(self, test_status: TestResult) -> List[FailureCluster]:
+        """Tests of given status grouped by their normalised message, clustered on first use"""
+        clusters = self.failure_clusters.get(test_status)
+        if clusters is None:
+            verb = CLUSTER_VERBS.get(test_status, test_status.name.lower())
+            clusters = cluster_failures(self.iter_tests_by_status(test_status), verb=verb)
+            self.failure_clusters[test_status] = clusters
+        return clusters
 
-    def get_slowest_tests(self, n=5) -> List[TestCase]:
-        """Returns slowest test cases."""
-        all_tests = [test for suite in self.suites for test in suite.tests]
-        return sorted(all_tests, key=lambda t: t.time, reverse=True)[:n]
+    def get_slowest_tests(self, n: int = None) -> List[TestCaseView]:
+        """Returns slowest test cases, the `slowest_tests` input decides how many by default."""
+        n = slowest_count() if n is None else n
+        return [TestCaseView(self.tests, row) for row in self.tests.slowest_rows(n)]
 
     def get_summary(self):
         readable_time = humanise_seconds(self.total_time)
@@ -141,6 +643,7 @@ class TestReport:
             "success_rate": self.readable_success_rate,
             "total_time": readable_time,
             "slowest_tests": self.get_slowest_tests(),
+            "slowest_suites": self.slowest_suites,
             "failure_summary": self.failure_summary,
         }
 
@@ -4,10 +4,9 @@
     Note: files are only in JSON.
 """
 
-from typing import Any
-from src.parsers.schema_parser import SchemaParser
-from src.models.data_reports import FileCoverage, NormalisedCoverageData
-import xml.etree.ElementTree as ET
+from typing import Any, Dict, Optional
+from src.parsers.schema_parser import SchemaParser, source_path
+from src.models.data_reports import FileCoverage, FileLineHits, NormalisedCoverageData
 
 
 class CloverSchemaParser(SchemaParser):
@@ -15,9 +14,7 @@ class CloverSchemaParser(SchemaParser):
 
     def parse_and_normalise(self, coverage_file: str) -> NormalisedCoverageData:
         """Parse the JSON converage_file and generate a normalised coverage"""
-        tree = ET.parse(coverage_file)
-        root = tree.getroot()
-        timestamp = root.attrib["generated"]
+        stream = self.open_stream(coverage_file)
 
         files = []
         statements = 0
@@ -25,18 +22,68 @@ class CloverSchemaParser(SchemaParser):
 
         conditionals  = 0
         covered_conditionals  = 0
-        for file in root.findall(".//file"):
-            metric = file.find('.//metrics')
-            filename = file.attrib["name"]
-            statement = float(metric.attrib['statements'])
-            covered_statement = float(metric.attrib['coveredstatements'])
-            line_rate = covered_statement / statement
-            conditional = float(metric.attrib['conditionals'])
-            covered_conditional = float(metric.attrib['coveredconditionals'])
+
+        # Keyed by the file's path, its name is not unique
+        line_hits: Optional[Dict[str, FileLineHits]] = {} if self.collect_line_hits else None
+        file_line_hits = None
+        path = None
+
+        # Single pass: <metrics> and <line> are counted as they close, so no
+        # file's lines are ever kept in memory or visited twice.
+        in_file = False
+        # <class> elements open inside the current <file>, their <metrics> are not the file's
+        open_classes = 0
+        metric = None
+        decision_points = 0
+        for event, element in stream.iter_elements(
+            tags=("file", "class", "metrics", "line"), start_tags=("file", "class")
+        ):
+            if event == "start" and element.tag == "class":
+                open_classes += 1
+                continue
+            if event == "start":
+                in_file = True
+                metric = None
+                decision_points = 0
+                path = source_path(element.get("path") or element.get("name"))
+                if line_hits is not None:
+                    file_line_hits = FileLineHits()
+                    line_hits[path] = file_line_hits
+                continue
+
+            if element.tag == "line":
+                # We only check for conditional (decision points)
+                if in_file and element.get("type") == "cond":
+                    decision_points += 1
+                if in_file and file_line_hits is not None:
+                    self.add_line_hits(element, file_line_hits)
+                continue
+
+            if element.tag == "class":
+                open_classes -= 1
+                continue
+
+            if element.tag == "metrics":
+                # Only a direct child of <file> is the file's own, PHPUnit writes the
+                # classes' <metrics> before it
+                if in_file and not open_classes:
+                    metric = dict(element.attrib)
+                continue
+
+            in_file = False
+            if file_line_hits is not None:
+                file_line_hits.normalise()
+            filename = element.attrib["name"]
+            statement = float(metric['statements'])
+            covered_statement = float(metric['coveredstatements'])
+            line_rate = covered_statement / statement if statement else 0
+            conditional = float(metric['conditionals'])
+            covered_conditional = float(metric['coveredconditionals'])
             branch_rate = 0
             if conditional != 0:
                 branch_rate = covered_conditional / conditional
-            complexity = self._calculate_cyclomatic_complexity(element=file)
+            # Cyclomatic Complexity = Number of Decision Points + 1
+            complexity = decision_points + 1
 
             statements += statement
             covered_statements += covered_statement
@@ -48,29 +95,45 @@ class CloverSchemaParser(SchemaParser):
                 line_rate=line_rate,
                 branch_rate=branch_rate,
                 complexity=complexity,
+                lines_covered=int(covered_statement),
+                lines_valid=int(statement),
+                branches_covered=int(covered_conditional),
+                branches_valid=int(conditional),
+                path=path,
             )
             files.append(file_coverage)
 
-        line_rate = covered_statements / statements
-        branch_rate = covered_conditionals / conditionals
+        timestamp = stream.root.attrib["generated"]
+        line_rate = covered_statements / statements if statements else 0
+        branch_rate = covered_conditionals / conditionals if conditionals else 0
         return NormalisedCoverageData(
             total_line_rate=round(line_rate, 4),
             total_branch_rate=round(branch_rate, 4),
             files=files,
             timestamp=timestamp,
+            lines_covered=int(covered_statements),
+            lines_valid=int(statements),
+            branches_covered=int(covered_conditionals),
+            branches_valid=int(conditionals),
+            line_hits=line_hits,
         )
 
+    @staticmethod
+    def add_line_hits(line, line_hits: FileLineHits):
+        """Adds a <line>, a condition's hits are its true and false counts"""
+        if line.get("type") == "cond":
+            true_count = int(line.get("truecount", 0))
+            false_count = int(line.get("falsecount", 0))
+            line_hits.append(
+                int(line.get("num")),
+                true_count + false_count,
+                branches_covered=(true_count > 0) + (false_count > 0),
+                branches_valid=2,
+            )
+        else:
+            line_hits.append(int(line.get("num")), int(line.get("count", 0)))
+
     def normalise(self, parsed_data: Any) -> NormalisedCoverageData:
         """Reads the parsed data from coverage file and creates Normalised coverage object"""
         return super().normalise(parsed_data)
 
-
-    def _calculate_cyclomatic_complexity(self,element: ET.Element) -> int:
-        """Calculates per Cyclomatic Complexity=Number of Decision Points+1 """
-        decision_point = 0
-        for line in element.findall('.//line'):
-            # We only check for conditional (decision points)
-            if line.get('type') == 'cond':
-                decision_point += 1
-
-        return decision_point + 1
\ No newline at end of file
@@ -4,43 +4,93 @@
     based on: https://raw.githubusercontent.com/cobertura/web/master/htdocs/xml/coverage-04.dtd
 """
 
-from typing import Any
+import re
+from typing import Any, Dict, Optional, Tuple
 import xml.etree.ElementTree as ET
 from src.parsers.schema_parser import SchemaParser
-from src.models.data_reports import FileCoverage, NormalisedCoverageData
+from src.models.data_reports import FileCoverage, FileLineHits, NormalisedCoverageData
+
+# condition-coverage="50% (1/2)"
+CONDITION_COVERAGE = re.compile(r"\((\d+)/(\d+)\)")
 
 
 class CoberatureSchemaParser(SchemaParser):
     def parse_and_normalise(self, coverage_file: str) -> NormalisedCoverageData:
         """parses coverage file and return its normalised object"""
-        tree = ET.parse(coverage_file)
-        root = tree.getroot()
+        stream = self.open_stream(coverage_file)
+
+        files = []
+        line_hits: Optional[Dict[str, FileLineHits]] = {} if self.collect_line_hits else None
+        # Each <class> is released as soon as it has been read
+        for _, cls in stream.iter_elements(tags=("class",)):
+            filename = cls.attrib["filename"]
+            line_rate = float(cls.attrib["line-rate"])
+            branch_rate = float(cls.attrib["branch-rate"])
+            complexity = float(cls.attrib.get("complexity", 0))
+            file_line_hits = None
+            if line_hits is not None:
+                # The classes of a file add to the same lines
+                file_line_hits = line_hits.setdefault(filename, FileLineHits())
+            lines_covered, lines_valid, branches_covered, branches_valid = self.count_lines(
+                cls, file_line_hits
+            )
+
+            file_coverage = FileCoverage(
+                filename=filename,
+                line_rate=line_rate,
+                branch_rate=branch_rate,
+                complexity=complexity,
+                lines_covered=lines_covered,
+                lines_valid=lines_valid,
+                branches_covered=branches_covered,
+                branches_valid=branches_valid,
+            )
+            files.append(file_coverage)
+
+        for file_line_hits in (line_hits or {}).values():
+            file_line_hits.normalise()
+
+        root = stream.root
         timestamp = root.attrib["timestamp"]
         total_line_rate = float(root.attrib["line-rate"])
         total_branch_rate = float(root.attrib["branch-rate"])
-
-        files = []
-        for package in root.findall(".//package"):
-            for cls in package.findall(".//class"):
-                filename = cls.attrib["filename"]
-                line_rate = float(cls.attrib["line-rate"])
-                branch_rate = float(cls.attrib["branch-rate"])
-                complexity = float(cls.attrib.get("complexity", 0))
-
-                file_coverage = FileCoverage(
-                    filename=filename,
-                    line_rate=line_rate,
-                    branch_rate=branch_rate,
-                    complexity=complexity,
-                )
-                files.append(file_coverage)
         return NormalisedCoverageData(
             total_line_rate=total_line_rate,
             total_branch_rate=total_branch_rate,
             files=files,
             timestamp=timestamp,
+            lines_covered=int(root.attrib.get("lines-covered", 0)),
+            lines_valid=int(root.attrib.get("lines-valid", 0)),
+            branches_covered=int(root.attrib.get("branches-covered", 0)),
+            branches_valid=int(root.attrib.get("branches-valid", 0)),
+            line_hits=line_hits,
         )
 
+    @staticmethod
+    def count_lines(
+        cls: ET.Element, line_hits: FileLineHits = None
+    ) -> Tuple[int, int, int, int]:
+        """Covered and valid lines and branches from the class' own <lines>, each
+        line is also added to `line_hits` when given"""
+        lines_covered = lines_valid = branches_covered = branches_valid = 0
+        # <methods> repeat the class' lines, only its direct <lines> are counted
+        for line in cls.iterfind("lines/line"):
+            hits = int(line.attrib.get("hits", 0))
+            lines_valid += 1
+            if hits > 0:
+                lines_covered += 1
+            conditions_covered = conditions_valid = 0
+            if line.attrib.get("branch") == "true":
+                match = CONDITION_COVERAGE.search(line.attrib.get("condition-coverage", ""))
+                if match:
+                    conditions_covered = int(match.group(1))
+                    conditions_valid = int(match.group(2))
+                    branches_covered += conditions_covered
+                    branches_valid += conditions_valid
+            if line_hits is not None:
+                line_hits.append(int(line.attrib["number"]), hits, conditions_covered, conditions_valid)
+        return lines_covered, lines_valid, branches_covered, branches_valid
+
     def normalise(self, parsed_data: Any) -> NormalisedCoverageData:
         """Normalises the parsed 'coverage' data"""
         pass
\ No newline at end of file
@@ -3,71 +3,122 @@
     based on: https://raw.githubusercontent.com/jacoco/jacoco/master/org.jacoco.report/src/org/jacoco/report/xml/report.dtd
 """
 
-import xml.etree.ElementTree as ET
-from typing import Any
-from src.models.data_reports import NormalisedCoverageData, FileCoverage
+from typing import Any, Dict, List, Optional, Tuple
+from src.models.data_reports import NormalisedCoverageData, FileCoverage, FileLineHits
 
 from src.parsers.schema_parser import SchemaParser
 
+# Elements that can hold <counter> children, other than the <report> root
+CONTAINER_TAGS = ("group", "package", "class", "method", "sourcefile")
+
 
 class JacocoSchemaParser(SchemaParser):
     """Parse Jacoco schemas based on reports.dtd definition"""
 
     def parse_and_normalise(self, coverage_file: str) -> NormalisedCoverageData:
         """Parse the Jacoco XML coverage_file and generate a normalised coverage"""
-        tree = ET.parse(coverage_file)
-        root = tree.getroot()
-        timestamp = root.attrib.get("name")  # There is no timestamp in Jacoco, using name as a fallback
+        stream = self.open_stream(coverage_file)
 
-        # Initialize totals
+        # Initialize totals, only used when the report has no counters of its own
         total_missed_lines = 0
         total_covered_lines = 0
         total_missed_branches = 0
         total_covered_branches = 0
 
+        # Counters belong to the innermost open element, <report> when none are open
+        parents: List[str] = []
+        class_counters: Dict[str, Tuple[int, int]] = {}
+        report_counters: Dict[str, Tuple[int, int]] = {}
+
+        # Keyed by "<package>/<source file>" like the files' paths, <line> is only read when they are collected
+        line_hits: Optional[Dict[str, FileLineHits]] = {} if self.collect_line_hits else None
+        line_tags = ("line",) if self.collect_line_hits else ()
+        package = ""
+        file_line_hits = None
+
         files = []
-        for package in root.findall(".//package"):
-            for cls in package.findall(".//class"):
-                filename = cls.attrib["sourcefilename"]
-
-                # Collect file-level counter information
-                missed_lines = 0
-                covered_lines = 0
-                missed_branches = 0
-                covered_branches = 0
-                complexity = 0
-
-                for counter in cls.findall(".//counter"):
-                    if counter.attrib["type"] == "LINE":
-                        missed_lines = int(counter.attrib["missed"])
-                        covered_lines = int(counter.attrib["covered"])
-                    if counter.attrib["type"] == "BRANCH":
-                        missed_branches = int(counter.attrib["missed"])
-                        covered_branches = int(counter.attrib["covered"])
-                    if counter.attrib["type"] == "COMPLEXITY":
-                        complexity = int(counter.attrib["missed"]) + int(counter.attrib["covered"])
-
-                # Update total counters for the package
-                total_missed_lines += missed_lines
-                total_covered_lines += covered_lines
-                total_missed_branches += missed_branches
-                total_covered_branches += covered_branches
-
-                # Calculate file-level line and branch rates
-                total_lines = missed_lines + covered_lines
-                total_branches = missed_branches + covered_branches
-
-                line_rate = covered_lines / total_lines if total_lines > 0 else 0.0
-                branch_rate = covered_branches / total_branches if total_branches > 0 else 0.0
-
-                # Create the file coverage object
-                file_coverage = FileCoverage(
-                    filename=filename,
-                    line_rate=line_rate,
-                    branch_rate=branch_rate,
-                    complexity=complexity,
-                )
-                files.append(file_coverage)
+        for event, element in stream.iter_elements(
+            tags=CONTAINER_TAGS + ("counter",) + line_tags, start_tags=CONTAINER_TAGS
+        ):
+            if event == "start":
+                parents.append(element.tag)
+                if element.tag == "class":
+                    class_counters = {}
+                elif element.tag == "package":
+                    package = element.get("name", "")
+                elif element.tag == "sourcefile" and line_hits is not None:
+                    file_line_hits = FileLineHits()
+                    line_hits[f"{package}/{element.get('name')}".lstrip("/")] = file_line_hits
+                continue
+
+            if element.tag == "line":
+                # <line nr mi ci mb cb>: the hits are the covered instructions
+                if file_line_hits is not None and parents and parents[-1] == "sourcefile":
+                    covered_branches = int(element.get("cb", 0))
+                    file_line_hits.append(
+                        int(element.get("nr")),
+                        int(element.get("ci", 0)),
+                        branches_covered=covered_branches,
+                        branches_valid=covered_branches + int(element.get("mb", 0)),
+                    )
+                continue
+
+            if element.tag == "counter":
+                parent = parents[-1] if parents else "report"
+                counter = (int(element.attrib["missed"]), int(element.attrib["covered"]))
+                if parent == "class":
+                    class_counters[element.attrib["type"]] = counter
+                elif parent == "report":
+                    report_counters[element.attrib["type"]] = counter
+                continue
+
+            parents.pop()
+            if element.tag == "sourcefile" and file_line_hits is not None:
+                file_line_hits.normalise()
+                file_line_hits = None
+            if element.tag != "class":
+                continue
+
+            # Collect file-level counter information from the class' direct counters
+            filename = element.attrib["sourcefilename"]
+            # Package names are directories: "org/example"
+            path = f"{package}/{filename}".lstrip("/")
+            missed_lines, covered_lines = class_counters.get("LINE", (0, 0))
+            missed_branches, covered_branches = class_counters.get("BRANCH", (0, 0))
+            complexity = sum(class_counters.get("COMPLEXITY", (0, 0)))
+
+            total_missed_lines += missed_lines
+            total_covered_lines += covered_lines
+            total_missed_branches += missed_branches
+            total_covered_branches += covered_branches
+
+            # Calculate file-level line and branch rates
+            total_lines = missed_lines + covered_lines
+            total_branches = missed_branches + covered_branches
+
+            line_rate = covered_lines / total_lines if total_lines > 0 else 0.0
+            branch_rate = covered_branches / total_branches if total_branches > 0 else 0.0
+
+            # Create the file coverage object
+            file_coverage = FileCoverage(
+                filename=filename,
+                line_rate=line_rate,
+                branch_rate=branch_rate,
+                complexity=complexity,
+                lines_covered=covered_lines,
+                lines_valid=total_lines,
+                branches_covered=covered_branches,
+                branches_valid=total_branches,
+                path=path,
+            )
+            files.append(file_coverage)
+
+        timestamp = stream.root.attrib.get("name")  # There is no timestamp in Jacoco, using name as a fallback
+
+        # JaCoCo writes the aggregated counters at the end of the <report>
+        if report_counters:
+            total_missed_lines, total_covered_lines = report_counters.get("LINE", (0, 0))
+            total_missed_branches, total_covered_branches = report_counters.get("BRANCH", (0, 0))
 
         # Calculate total coverage rates
         total_lines = total_missed_lines + total_covered_lines
@@ -81,6 +132,11 @@ class JacocoSchemaParser(SchemaParser):
             total_branch_rate=total_branch_rate,
             files=files,
             timestamp=timestamp,
+            lines_covered=total_covered_lines,
+            lines_valid=total_lines,
+            branches_covered=total_covered_branches,
+            branches_valid=total_branches,
+            line_hits=line_hits,
         )
 
     def normalise(self, parsed_data: Any) -> NormalisedCoverageData:
@@ -21,11 +21,13 @@ class ParserFactory:
         coverage_type = coverage_identifier.identifiy_report()
         logger.debug(f'Coverage file was identified as [{coverage_type.name}]')
 
+        # The parser carries on from where identification stopped reading
+        xml_stream = coverage_identifier.stream
         if coverage_type == CoverageFileType.COBERATURE:
-            return CoberatureSchemaParser()
+            return CoberatureSchemaParser(xml_stream=xml_stream)
         elif coverage_type == CoverageFileType.CLOVER:
-            return CloverSchemaParser()
+            return CloverSchemaParser(xml_stream=xml_stream)
         elif coverage_type == CoverageFileType.JACOCO:
-            return JacocoSchemaParser()
+            return JacocoSchemaParser(xml_stream=xml_stream)
         else:
             raise UnsupportedCoverageType()
@@ -1,14 +1,45 @@
 """Base Schema Parser"""
 
 from abc import ABC, abstractmethod
+import os
 from typing import Any
 
+from src.helpers.diff_coverage import diff_file
+from src.helpers.xml_stream import XmlStream
 from src.models.data_reports import CoverageType, NormalisedCoverageData
 
+TRUE_VALUES = ("true", "yes", "1")
+
+
+def line_hits_enabled() -> bool:
+    """Whether per-line hits are kept: asked for by the `line_hits` input, or needed by `diff_file`"""
+    return os.getenv("INPUT_LINE_HITS", "").strip().lower() in TRUE_VALUES or diff_file() is not None
+
+
+def source_path(path: str) -> str:
+    """The path relative to the repository checkout (GITHUB_WORKSPACE) when it is under it"""
+    workspace = os.getenv("GITHUB_WORKSPACE", "").replace("\\", "/").rstrip("/")
+    normalised = path.replace("\\", "/")
+    if workspace and normalised.startswith(workspace + "/"):
+        return normalised[len(workspace) + 1 :]
+    return path
+
 
 class SchemaParser(ABC):
     """Abstract Schema Parser based on Coverage report schema"""
 
+    def __init__(self, xml_stream: XmlStream = None):
+        # Stream left by identification, so the file is not read a second time
+        self.xml_stream = xml_stream
+        # Fills NormalisedCoverageData.line_hits, off by default as it grows with the code base
+        self.collect_line_hits = line_hits_enabled()
+
+    def open_stream(self, coverage_file: str) -> XmlStream:
+        """Returns the handed over stream for coverage_file, or a new one"""
+        stream = XmlStream.open(coverage_file, handed_over=self.xml_stream)
+        self.xml_stream = None
+        return stream
+
     @abstractmethod
     def parse_and_normalise(self, coverage_file: str) -> NormalisedCoverageData:
         """Parse the data and return the normalised view"""
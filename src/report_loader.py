@@ -0,0 +1,252 @@
+"""Parses the coverage report and reads the test report side by side"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import logging
+import os
+import sqlite3
+from typing import List, Optional, Tuple
+
+from src.exceptions.configurations import ConfigurationValuesNotFoundError
+from src.helpers.coverage_baseline import BaselineComparison, baseline_coverage_file, compare_to_baseline
+from src.helpers.coverage_merge import merge_coverage_reports
+from src.helpers.diff_coverage import DiffCoverage, compute_diff_coverage, diff_file, parse_unified_diff
+from src.helpers.github_action import GitHubActionInfo
+from src.helpers.history_store import HistoryStore, history_db
+from src.helpers.parameterised import group_parameterised_enabled
+from src.helpers.parse_cache import cached_parse
+from src.helpers.report_snapshot import COVERAGE_KIND, TEST_KIND, is_snapshot, load_snapshot, write_snapshot
+from src.helpers.report_paths import resolve_report_paths
+from src.models.data_reports import NormalisedCoverageData
+from src.models.test_suite import TestReport, slowest_count
+from src.parsers.parser_factory import ParserFactory
+from src.parsers.schema_parser import line_hits_enabled
+from src.test_readers.reader_factory import ReaderFactory
+
+logger = logging.getLogger("webhook-reporter-logger")
+
+
+def load_coverage_report(coverage_file: str, line_hits: bool = False) -> NormalisedCoverageData:
+    """Identifies and parses the coverage file.
+
+    Line hits are collected when the `line_hits` input asks for them, or with
+    `line_hits` for reports that are merged with others.
+    """
+    line_hits = line_hits or line_hits_enabled()
+
+    def parse() -> NormalisedCoverageData:
+        parser = ParserFactory.get_parser(coverage_file)
+        parser.collect_line_hits = line_hits
+        return parser.parse_and_normalise(coverage_file=coverage_file)
+
+    # Reports with and without line hits are cached apart, and paths are made
+    # relative to the checkout, so a report read from another one is too
+    kind = "coverage-lines" if line_hits else "coverage"
+    kind += f":{os.getenv('GITHUB_WORKSPACE', '')}"
+    coverage_report = cached_parse(kind, [coverage_file], parse)
+    logger.debug("Coverage report parsed")
+    return coverage_report
+
+
+def load_test_report(test_file: Optional[str]) -> Optional[TestReport]:
+    """Identifies and reads the test results, None when there are none.
+
+    `test_file` can name several files (a directory, a glob or a list, see
+    `resolve_report_paths`), which are read in parallel into one report.
+    """
+    if not test_file:
+        return None
+    test_files = resolve_report_paths(test_file)
+    if not test_files:
+        logger.error(f"No test results file matches '{test_file}'")
+        raise ConfigurationValuesNotFoundError
+    if len(test_files) == 1 and is_snapshot(test_files[0]):
+        logger.debug("Test Suites report loaded from a snapshot")
+        return load_snapshot(test_files[0], kind=TEST_KIND)
+
+    def read() -> TestReport:
+        reader = ReaderFactory.get_batch_reader(test_files=test_files)
+        return reader.read_many(test_files)
+
+    def bodies_readable(report: TestReport) -> bool:
+        # Failure bodies are read from the files the report was parsed from,
+        # a cached report is only used while they are still the given files
+        return all(source.path in test_files for source in report.tests.sources)
+
+    # Grouped and ungrouped reads of the same files are different reports, and
+    # the slowest tests and suites are ranked as they are read
+    kind = "tests-grouped" if group_parameterised_enabled() else "tests"
+    kind += f":slowest-{slowest_count()}"
+    test_report = cached_parse(kind, test_files, read, valid=bodies_readable)
+    logger.debug(f"Test Suites report parsed from {len(test_files)} file(s)")
+    return test_report
+
+
+def load_reports(
+    coverage_file: str, test_file: Optional[str]
+) -> Tuple[NormalisedCoverageData, Optional[TestReport]]:
+    """Loads both reports at the same time.
+
+    `coverage_file` can name several files (a glob or a list, see
+    `resolve_report_paths`), for example one per shard of a CI run, which are
+    merged into one report.
+
+    Shards are parsed with their line hits, so that lines covered by
+    different shards add up when they are merged.
+
+    Parsing is CPU bound, so each coverage file is parsed in a worker process
+    while this process reads the test results. A failure on either side is
+    logged with its file and raised once both are done, the coverage one first.
+    """
+    coverage_files = resolve_report_paths(coverage_file)
+    if not coverage_files:
+        logger.error(f"No coverage file matches '{coverage_file}'")
+        raise ConfigurationValuesNotFoundError
+    # Snapshots are mapped here, there is nothing to parse and they cannot be pickled
+    snapshot_files = [file for file in coverage_files if is_snapshot(file)]
+    snapshots = [load_snapshot(file, kind=COVERAGE_KIND) for file in snapshot_files]
+    coverage_files = [file for file in coverage_files if file not in snapshot_files]
+    if not coverage_files:
+        return _merge(snapshots), load_test_report(test_file)
+    if len(coverage_files) == 1 and not test_file and not snapshots:
+        return _load_coverage_or_log(coverage_files[0]), None
+
+    merging = len(coverage_files) + len(snapshots) > 1
+    workers = min(len(coverage_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        coverage_futures = [
+            executor.submit(load_coverage_report, file, merging) for file in coverage_files
+        ]
+
+        test_error = None
+        try:
+            test_report = load_test_report(test_file)
+        except Exception as e:
+            logger.error(f"Could not read the test results file '{test_file}': {e}")
+            test_error = e
+
+        coverage_reports = _gather_coverage(coverage_files, coverage_futures)
+
+    if test_error is not None:
+        raise test_error
+    return _merge(snapshots + coverage_reports), test_report
+
+
+def load_diff_coverage(coverage_report: NormalisedCoverageData) -> Optional[DiffCoverage]:
+    """Coverage of the lines added by the `diff_file` input, None when it is not set"""
+    diff_path = diff_file()
+    if diff_path is None:
+        return None
+    if not os.path.isfile(diff_path):
+        logger.error(f"The diff file '{diff_path}' does not exist")
+        raise ConfigurationValuesNotFoundError
+    if coverage_report.line_hits is None:
+        # e.g. a snapshot written without line hits
+        logger.warning("The coverage report has no line hits, the diff coverage is left out")
+        return None
+    diff_coverage = compute_diff_coverage(parse_unified_diff(diff_path), coverage_report.line_hits)
+    logger.debug(f"Diff coverage computed over {diff_coverage.files} file(s)")
+    return diff_coverage
+
+
+def load_baseline_comparison(coverage_report: NormalisedCoverageData) -> Optional[BaselineComparison]:
+    """Compares the report with the `baseline_coverage` input's, None when it is not set.
+
+    The baseline can be a coverage report or a snapshot. A baseline that is
+    missing, like on the first run before one is cached, is logged and skipped.
+    """
+    baseline_path = baseline_coverage_file()
+    if baseline_path is None:
+        return None
+    if not os.path.isfile(baseline_path):
+        logger.warning(f"The baseline coverage file '{baseline_path}' does not exist, the comparison is left out")
+        return None
+    try:
+        if is_snapshot(baseline_path):
+            baseline = load_snapshot(baseline_path, kind=COVERAGE_KIND)
+        else:
+            baseline = load_coverage_report(baseline_path)
+    except Exception as e:
+        logger.error(f"Could not read the baseline coverage file '{baseline_path}': {e}")
+        raise
+    comparison = compare_to_baseline(coverage_report, baseline)
+    logger.debug(f"Coverage compared with the baseline '{baseline_path}'")
+    return comparison
+
+
+def save_snapshots(
+    coverage_report: NormalisedCoverageData, test_report: Optional[TestReport]
+):
+    """Writes snapshots of the reports to the `snapshot_dir` input, when it is set"""
+    snapshot_dir = os.getenv("INPUT_SNAPSHOT_DIR")
+    if not snapshot_dir:
+        return
+    os.makedirs(snapshot_dir, exist_ok=True)
+    write_snapshot(coverage_report, os.path.join(snapshot_dir, "coverage.snapshot"))
+    if test_report:
+        write_snapshot(test_report, os.path.join(snapshot_dir, "tests.snapshot"))
+    logger.debug(f"Report snapshots written to '{snapshot_dir}'")
+
+
+def save_history(
+    coverage_report: NormalisedCoverageData, test_report: Optional[TestReport]
+) -> Optional[int]:
+    """Records the run in the `history_db` input's SQLite file, when it is set.
+
+    Returns the run's id. The history is a nice to have, a file that cannot
+    be written (or was written by a later version) is logged and the report
+    is sent all the same. The change since the base branch's last run is
+    only logged, the messages do not show it.
+    """
+    path = history_db()
+    if not path:
+        return None
+    action = GitHubActionInfo()
+    try:
+        with HistoryStore(path) as store:
+            run_id = store.record_run(coverage_report, test_report, commit_sha=action.sha, branch=action.branch)
+            base = store.last_run(branch=action.base_branch, before=run_id) if action.base_branch else None
+    except sqlite3.Error as e:
+        logger.error(f"Could not record the run in the history file '{path}': {e}")
+        return None
+    if base is not None:
+        change = coverage_report.total_line_rate - base.line_rate
+        logger.info(f"Line coverage changed by {change:+d}% since the last '{base.branch}' run")
+    logger.debug(f"Run {run_id} recorded in '{path}'")
+    return run_id
+
+
+def _merge(coverage_reports: List[NormalisedCoverageData]) -> NormalisedCoverageData:
+    """merge_coverage_reports, keeping line hits only when the `line_hits` input asks for them"""
+    if len(coverage_reports) == 1:
+        return coverage_reports[0]
+    logger.debug(f"Merging {len(coverage_reports)} coverage reports")
+    merged = merge_coverage_reports(coverage_reports)
+    if not line_hits_enabled():
+        # They were only collected to merge the shards
+        merged.line_hits = None
+    return merged
+
+
+def _gather_coverage(
+    coverage_files: List[str], futures: List[Future]
+) -> List[NormalisedCoverageData]:
+    """Waits for every coverage file, raising the first failure in file order"""
+    reports = []
+    for coverage_file, future in zip(coverage_files, futures):
+        try:
+            reports.append(future.result())
+        except Exception as e:
+            logger.error(f"Could not parse the coverage file '{coverage_file}': {e}")
+            for pending in futures:
+                pending.cancel()
+            raise
+    return reports
+
+
+def _load_coverage_or_log(coverage_file: str) -> NormalisedCoverageData:
+    """load_coverage_report, logging which file failed"""
+    try:
+        return load_coverage_report(coverage_file)
+    except Exception as e:
+        logger.error(f"Could not parse the coverage file '{coverage_file}': {e}")
+        raise
@@ -1,16 +1,73 @@
 """Abstract reader"""
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import ceil
+import os
+from typing import List, Tuple, Type
 
-from src.models.test_suite import TestReport
+from src.helpers.xml_stream import XmlStream
+from src.models.test_suite import SlowestSuites, TestReport, TestSuite
+
+# Batches queued per worker, so a few slow files do not hold up the rest
+BATCHES_PER_WORKER = 4
 
 
 class BaseTestSuiteReader(ABC):
     """Base reader for all TestSuite files"""
 
+    def __init__(self, xml_stream: XmlStream = None):
+        # Stream left by identification, so the file is not read a second time
+        self.xml_stream = xml_stream
+
     @abstractmethod
     def read(self, file_path: str) -> TestReport:
         """
             Reads file that contains TestSuite details and returns
             associated generic report
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def open_stream(self, file_path: str) -> XmlStream:
+        """Returns the handed over stream for file_path, or a new one"""
+        stream = XmlStream.open(file_path, handed_over=self.xml_stream)
+        self.xml_stream = None
+        return stream
+
+    def read_many(self, file_paths: List[str], max_workers: int = None) -> TestReport:
+        """Reads files of this reader's type and combines their suites into one report.
+
+        Files are read in batches by a bounded pool of worker processes, each
+        file with a fresh reader, and the suites keep the order of `file_paths`.
+        Only the slowest suites each file ranked are ranked again.
+        """
+        if len(file_paths) == 1:
+            return self.read(file_paths[0])
+
+        workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+        batch_size = ceil(len(file_paths) / (workers * BATCHES_PER_WORKER))
+        batches = [
+            file_paths[start : start + batch_size]
+            for start in range(0, len(file_paths), batch_size)
+        ]
+
+        suites: List[TestSuite] = []
+        rankings: List[List[TestSuite]] = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch_suites, batch_slowest in executor.map(_read_batch, repeat(type(self)), batches):
+                suites.extend(batch_suites)
+                rankings.append(batch_slowest)
+        return TestReport(suites=suites, slowest_suites=SlowestSuites.merge(rankings))
+
+
+def _read_batch(
+    reader_type: Type[BaseTestSuiteReader], file_paths: List[str]
+) -> Tuple[List[TestSuite], List[TestSuite]]:
+    """Reads a batch of files in a worker process, returns their suites and the slowest of them"""
+    suites: List[TestSuite] = []
+    rankings: List[List[TestSuite]] = []
+    for file_path in file_paths:
+        report = reader_type().read(file_path)
+        suites.extend(report.suites)
+        rankings.append(report.slowest_suites)
+    return suites, SlowestSuites.merge(rankings)
@@ -1,40 +1,107 @@
 """Reads JSON Jest tests"""
 
-import re
-from typing import Any, Dict, List, Tuple
-from src.models.test_suite import TestCase, TestReport, TestResult, TestSuite
+from typing import Any, Dict, List, Optional, Tuple
+from src.helpers.failure_bodies import ANSI_ESCAPE, JSON_BODY, BodySource
+from src.helpers.json_stream import JsonStream
+from src.helpers.parameterised import ParameterisedGrouper, group_parameterised_enabled
+from src.models.test_suite import SlowestSuites, TestCase, TestCaseTable, TestReport, TestResult, TestSuite
 from src.test_readers.base_reader import BaseTestSuiteReader
-import json
 
 from src.utils import get_test_case_status, truncate_text
 
+# Test suite fields that are read, the rest (e.g. its failure message) are skipped
+SUITE_FIELDS = ("name", "startTime", "endTime")
+
 
 class JestJSONReader(BaseTestSuiteReader):
     """Reading JSON Test data"""
 
     def read(self, file_path: str) -> TestReport:
-        """Reads the JSON file and transforms it to TestReport file"""
-        f = open(file_path, encoding="utf-8")
-        test_results = json.load(f)
+        """Reads the JSON file and transforms it to TestReport file.
 
+        The file is streamed: each entry of `testResults[].assertionResults[]` is
+        decoded on its own, turned into a TestCase and dropped, anything else in
+        the file is skipped without being decoded.
+        """
         testsuites: List[TestSuite] = []
-        for test_suite in test_results["testResults"]:
-            test_case_list: List[TestCase] = []
-            for test_case in test_suite["assertionResults"]:
-                test_case_list.append(self.create_test_case(test_case=test_case))
-
-            duration = float(test_suite.get("endTime")) - float(
-                test_suite.get("startTime")
-            )
-            testsuite = TestSuite(
-                name=test_suite.get("name", ""),
-                tests=test_case_list,
-                time=round(duration / 1000, 2),
-            )
-            testsuites.append(testsuite)
-
-        f.close()
-        return TestReport(suites=testsuites)
+        table = TestCaseTable()
+        slowest_suites = SlowestSuites()
+        group_parameterised = group_parameterised_enabled()
+        with JsonStream(file_path) as stream:
+            for key in stream.iter_object():
+                if key != "testResults":
+                    stream.skip_value()
+                    continue
+                for _ in stream.iter_array():
+                    test_suite = self._read_test_suite(
+                        stream=stream, table=table, group_parameterised=group_parameterised
+                    )
+                    slowest_suites.add(test_suite, len(testsuites))
+                    testsuites.append(test_suite)
+
+        return TestReport(suites=testsuites, slowest_suites=slowest_suites.suites())
+
+    def _read_test_suite(
+        self, stream: JsonStream, table: TestCaseTable, group_parameterised: bool
+    ) -> TestSuite:
+        """Reads the test suite object at the stream into a TestSuite, its cases into `table`"""
+        test_case_list = ParameterisedGrouper(enabled=group_parameterised)
+        # (index in test_case_list, span) of cases with a failure body
+        bodies: List[Tuple[int, Tuple[int, int]]] = []
+        test_suite: Dict[str, Any] = {}
+        for key in stream.iter_object():
+            if key == "assertionResults":
+                for _ in stream.iter_array():
+                    test_case, span = self._read_test_case(stream=stream)
+                    test_case = self.create_test_case(test_case=test_case)
+                    if span is None or not test_case.full_message:
+                        test_case_list.add(test_case)
+                        continue
+                    # Only where the body is gets kept, it is read back if it is shown
+                    test_case.full_message = None
+                    index = test_case_list.add(test_case)
+                    if index is not None:
+                        bodies.append((index, span))
+            elif key in SUITE_FIELDS:
+                test_suite[key] = stream.read_value()
+            else:
+                stream.skip_value()
+
+        tests = table.add(test_case_list.tests)
+        if bodies:
+            source = BodySource(path=stream.json_file, format=JSON_BODY)
+            for index, (offset, length) in bodies:
+                table.set_body(tests.start + index, source, offset, length)
+
+        duration = float(test_suite.get("endTime")) - float(
+            test_suite.get("startTime")
+        )
+        return TestSuite(
+            name=test_suite.get("name", ""),
+            tests=tests,
+            time=round(duration / 1000, 2),
+        )
+
+    def _read_test_case(self, stream: JsonStream) -> Tuple[Dict[str, Any], Optional[Tuple[int, int]]]:
+        """Decodes the test case object at the stream, with the span of its first failure message.
+
+        Only the first failure message is kept, it is the only one shown.
+        """
+        test_case: Dict[str, Any] = {}
+        span = None
+        for key in stream.iter_object():
+            if key != "failureMessages" or stream.peek() != b"[":
+                test_case[key] = stream.read_value()
+                continue
+            test_case[key] = []
+            for index in stream.iter_array():
+                if index > 0:
+                    stream.skip_value()
+                    continue
+                start = stream.offset
+                test_case[key].append(stream.read_value())
+                span = (start, stream.offset - start)
+        return test_case, span
 
     def create_test_case(self, test_case: Dict[str, Any]) -> TestCase:
         """transforms given JSON Element for testcase into TestCase"""
@@ -61,10 +128,8 @@ class JestJSONReader(BaseTestSuiteReader):
 
     def remove_ansi_formats(self, error_message: str) -> str:
         """Removes the ANSI escape sequences"""
-        ansi_escape = re.compile(r"\x1b\[([0-9]+;)*[0-9]*m")
-
         # substitute the escape sequences with nothing
-        return ansi_escape.sub("", error_message)
+        return ANSI_ESCAPE.sub("", error_message)
 
     def _format_json_details(self, test_case: Dict[str, Any]) -> Tuple[str, str]:
         """Formats the given message into full_message and simple message"""
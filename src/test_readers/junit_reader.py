@@ -4,55 +4,147 @@ Reader for all JUNIT type XMLS
 utilization: pytest, surefire
 """
 
-from typing import List
-from src.models.test_suite import TestCase, TestReport, TestResult, TestSuite
+import logging
+from typing import List, Optional, Tuple
+from src.helpers.failure_bodies import locate_xml_bodies, xml_body_source
+from src.helpers.parameterised import ParameterisedGrouper, group_parameterised_enabled
+from src.models.test_suite import (
+    SlowestSuites,
+    TestCase,
+    TestCaseRange,
+    TestCaseTable,
+    TestReport,
+    TestResult,
+    TestSuite,
+)
 from src.test_readers.base_reader import BaseTestSuiteReader
 import xml.etree.ElementTree as ET
 
 from src.utils import get_test_case_status
 
+logger = logging.getLogger("webhook-reporter-logger")
+
+
+class _OpenSuite:
+    """A <testsuite> that is still being read"""
+
+    def __init__(self, position: int, group_parameterised: bool, nested: bool = False):
+        self.position = position
+        # An enclosing suite's time covers this one
+        self.nested = nested
+        self.timed = False
+        self.tests = ParameterisedGrouper(enabled=group_parameterised)
+        # (index in tests, ordinal of the <testcase>) of cases with a failure body
+        self.bodies: List[Tuple[int, int]] = []
+        self.has_child_suites = False
+
+    def add_test(self, testcase: TestCase, ordinal: int):
+        # Only where the body is gets kept, it is read back if it is shown
+        has_body = testcase.full_message is not None
+        testcase.full_message = None
+        index = self.tests.add(testcase)
+        if has_body and index is not None:
+            self.bodies.append((index, ordinal))
+
+    def flush(self, table: TestCaseTable, bodies: List[Tuple[int, int]]) -> TestCaseRange:
+        """Adds the cases to the table, and the rows of their bodies to `bodies`"""
+        tests = table.add(self.tests.tests)
+        bodies.extend((tests.start + index, ordinal) for index, ordinal in self.bodies)
+        return tests
+
 
 class JUnitReader(BaseTestSuiteReader):
     def read(self, file_path: str) -> TestReport:
-        """Read JUnit type file with associated TestSuites"""
+        """Read JUnit type file with associated TestSuites.
 
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        <testcase> elements are read as they close and released, each one
+        belongs only to its innermost <testsuite> so nested suites are not
+        counted twice. A suite's time is only added to the total when no
+        enclosing suite's time includes it already. A suite's cases are added
+        to the report's table when the suite closes, failure bodies are
+        located in the file at the end.
+        """
+        stream = self.open_stream(file_path)
+        table = TestCaseTable()
+        # (row, ordinal of the <testcase>) of cases with a failure body
+        bodies: List[Tuple[int, int]] = []
+        ordinal = -1
+        group_parameterised = group_parameterised_enabled()
 
-        # Parsing the JUnit XML
-        suites: List[TestSuite] = []
-        if root.findall(".//testsuite"):
-            for testsuite in root.findall(".//testsuite"):
-                test_cases: List[TestCase] = self._test_suite_collection(
-                    testsuite=testsuite
+        # Suites keep their opening order, a slot is reserved when one opens
+        suites: List[Optional[TestSuite]] = []
+        open_suites: List[_OpenSuite] = []
+        # Test cases outside of any <testsuite>
+        root_tests = _OpenSuite(position=-1, group_parameterised=group_parameterised)
+        slowest_suites = SlowestSuites()
+
+        for event, element in stream.iter_elements(
+            tags=("testsuite", "testcase"), start_tags=("testsuite",)
+        ):
+            if event == "start":
+                parent = open_suites[-1] if open_suites else None
+                if parent:
+                    parent.has_child_suites = True
+                open_suite = _OpenSuite(
+                    position=len(suites),
+                    group_parameterised=group_parameterised,
+                    nested=bool(parent and (parent.timed or parent.nested)),
                 )
+                open_suite.timed = "time" in element.attrib
+                open_suites.append(open_suite)
+                suites.append(None)
+                continue
+
+            if element.tag == "testcase":
+                ordinal += 1
+                testcase = self.create_test_case(element)
+                (open_suites[-1] if open_suites else root_tests).add_test(testcase, ordinal)
+                continue
 
-                suite = TestSuite(
-                    name=testsuite.attrib["name"],
-                    tests=test_cases,
-                    time=float(testsuite.attrib.get("time", 0)),
+            open_suite = open_suites.pop()
+            # Suites that only group other suites have nothing of their own to report
+            if open_suite.tests.tests or not open_suite.has_child_suites:
+                suite = suites[open_suite.position] = TestSuite(
+                    name=element.attrib["name"],
+                    tests=open_suite.flush(table, bodies),
+                    time=float(element.attrib.get("time", 0)),
+                    nested=open_suite.nested,
                 )
-                suites.append(suite)
-        else:
-            testsuite = root
-            test_cases: List[TestCase] = self._test_suite_collection(
-                testsuite=testsuite
-            )
+                slowest_suites.add(suite, open_suite.position)
+
+        if root_tests.tests.tests:
+            root = stream.root
+            if "time" in root.attrib:
+                # The root's time covers its own cases and every suite
+                for suite in suites:
+                    if suite is not None:
+                        suite.nested = True
             suite = TestSuite(
-                name=testsuite.attrib["name"],
-                tests=test_cases,
-                time=float(testsuite.attrib.get("time", 0)),
+                name=root.attrib.get("name", ""),
+                tests=root_tests.flush(table, bodies),
+                time=float(root.attrib.get("time", 0)),
             )
-            suites.append(suite)
+            # Comes before every other suite
+            suites.insert(0, suite)
+            slowest_suites.add(suite, root_tests.position)
 
-        return TestReport(suites=suites)
+        if bodies:
+            self._locate_bodies(file_path, table, bodies)
+        return TestReport(
+            suites=[suite for suite in suites if suite is not None], slowest_suites=slowest_suites.suites()
+        )
 
-    def _test_suite_collection(self, testsuite: ET.Element) -> List[TestCase]:
-        test_cases: List[TestCase] = []
-        for test_case in testsuite.findall(".//testcase"):
-            testcase = self.create_test_case(test_case)
-            test_cases.append(testcase)
-        return test_cases
+    @staticmethod
+    def _locate_bodies(file_path: str, table: TestCaseTable, bodies: List[Tuple[int, int]]):
+        """Points the rows at their failure body in the file"""
+        source = xml_body_source(file_path)
+        spans = locate_xml_bodies(file_path, (ordinal for _, ordinal in bodies))
+        for row, ordinal in bodies:
+            span = spans.get(ordinal)
+            if span is None:
+                logger.debug(f"Failure body of test case {ordinal} not found in '{file_path}'")
+                continue
+            table.set_body(row, source, *span)
 
     def create_test_case(self, test_case: ET.Element) -> TestCase:
         """transforms given JUnit Element for testcase into TestCase"""
@@ -1,8 +1,12 @@
 """Returns reader based on given framework"""
 
+import os
+from typing import List
+
 from src.exceptions.configurations import UnsupportedTestReportType
 from src.helpers.test_suite_xml_identifier import TestSuiteXmlIdentifier
 from src.models.file_types import TestSuiteFileType
+from src.test_readers.base_reader import BaseTestSuiteReader
 from src.test_readers.jest_reader import JestJSONReader
 from src.test_readers.junit_reader import JUnitReader
 
@@ -23,6 +27,19 @@ class ReaderFactory:
         test_suite_type = test_suite_identifier.identify_suite()
 
         if test_suite_type == TestSuiteFileType.JUNIT:
-            return JUnitReader()
+            # The reader carries on from where identification stopped reading
+            return JUnitReader(xml_stream=test_suite_identifier.stream)
         else:
             raise UnsupportedTestReportType()
+
+    @staticmethod
+    def get_batch_reader(test_files: List[str]) -> BaseTestSuiteReader:
+        """Returns one reader for a batch of test files, only the first is identified.
+
+        A batch comes from a single tool (e.g. Surefire's TEST-*.xml), every
+        file has to share the first one's extension.
+        """
+        extension = os.path.splitext(test_files[0])[1]
+        if any(not file.endswith(extension) for file in test_files):
+            raise UnsupportedTestReportType()
+        return ReaderFactory.get_reader(test_file=test_files[0])
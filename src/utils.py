@@ -8,6 +8,8 @@ from src.formatters.base_formatter import BaseFormatter
 from src.formatters.discord_formatter import DiscordFormatter
 from src.formatters.slack_formatter import SlackFormatter
 from src.formatters.teams_formatter import TeamsFormatter
+from src.helpers.coverage_baseline import BaselineComparison
+from src.helpers.diff_coverage import DiffCoverage
 from src.models.data_reports import NormalisedCoverageData
 from src.models.test_suite import TestReport, TestResult
 from src.providers.base_provider import Baseprovider
@@ -38,21 +40,34 @@ def closest_approx_name(allowed_names: List[str], given_name: str) -> str:
     return f"Did you mean '{close_matches[0]}'?" if close_matches else ""
 
 def set_formatter(
-    provider_name: str, coverage_report: NormalisedCoverageData, test_report: TestReport
+    provider_name: str,
+    coverage_report: NormalisedCoverageData,
+    test_report: TestReport,
+    diff_coverage: DiffCoverage = None,
+    baseline_comparison: BaselineComparison = None,
 ) -> BaseFormatter:
     """Generates a Formatter based on the type of provider given"""
     provider_name = process_text_input(text=provider_name)
     if provider_name == "discord":
         formatter = DiscordFormatter(
-            coverage_report=coverage_report, test_report=test_report
+            coverage_report=coverage_report,
+            test_report=test_report,
+            diff_coverage=diff_coverage,
+            baseline_comparison=baseline_comparison,
         )
     elif provider_name == "slack":
         formatter = SlackFormatter(
-            coverage_report=coverage_report, test_report=test_report
+            coverage_report=coverage_report,
+            test_report=test_report,
+            diff_coverage=diff_coverage,
+            baseline_comparison=baseline_comparison,
         )
     elif provider_name == "teams":
         formatter = TeamsFormatter(
-            coverage_report=coverage_report, test_report=test_report
+            coverage_report=coverage_report,
+            test_report=test_report,
+            diff_coverage=diff_coverage,
+            baseline_comparison=baseline_comparison,
         )
     else:
         log_incorrect_provider_name(provider_name=provider_name)
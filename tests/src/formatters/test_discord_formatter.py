@@ -6,7 +6,14 @@ from datetime import datetime
 from discord import Embed, Color
 from src.models.data_reports import FileCoverage, NormalisedCoverageData
 from src.models.test_suite import TestCase, TestReport, TestResult, TestSuite
-from src.formatters.discord_formatter import DiscordFormatter
+from src.formatters.discord_formatter import (
+    MAX_DISCORD_EMBED_SIZE,
+    MAX_DISCORD_FIELD_SIZE,
+    DiscordFormatter,
+    EmbedBudget,
+)
+from src.helpers.coverage_baseline import BaselineComparison, FileCoverageDelta
+from src.helpers.diff_coverage import DiffCoverage, UncoveredHunk
 
 
 # Fixtures for test data
@@ -169,6 +176,58 @@ def test_fields(mock_coverage_data):
     assert fields[2].name == "Total"
 
 
+def test_fields_with_diff_coverage(mock_coverage_data):
+    formatter = DiscordFormatter(mock_coverage_data, diff_coverage=DiffCoverage())
+    fields = formatter._fields()
+    assert len(fields) == 4
+    assert fields[3].name == "Diff coverage"
+    assert fields[3].value == "No executable lines changed"
+
+
+def test_fields_fit_the_embed_limits(monkeypatch, mock_test_report):
+    """Long listings share the embed's characters and are cut with a "… N more" line."""
+    monkeypatch.setenv("INPUT_LOWEST_COVERAGE_FILES", "500")
+    long_path = "/".join(["very_long_directory_name"] * 6)
+    coverage_report = NormalisedCoverageData(
+        total_line_rate=0.5,
+        total_branch_rate=0.5,
+        files=[
+            FileCoverage(f"{module}_{i}.py", 0.5, 0.5, 1.0, 5, 10, path=f"src/module_{module}/{long_path}/{i}.py")
+            for module in range(20)
+            for i in range(25)
+        ],
+        timestamp="1725112165369",
+    )
+    diff_coverage = DiffCoverage(
+        lines_valid=100,
+        worst_hunks=[UncoveredHunk(f"{long_path}/{i}.py", 1, 10, [(1, 10)], 10) for i in range(50)],
+    )
+    baseline = BaselineComparison(
+        line_rate_delta=-5,
+        branch_rate_delta=0,
+        regressions=[FileCoverageDelta(f"{long_path}/{i}.py", 0.5, 0.9, 0.5, 0.5) for i in range(100)],
+    )
+    formatter = DiscordFormatter(coverage_report, mock_test_report, diff_coverage, baseline)
+    budget = EmbedBudget(characters=MAX_DISCORD_EMBED_SIZE - 2000)
+
+    fields = formatter._fields(budget)
+
+    assert sum(len(field.name) + len(field.value) for field in fields) <= MAX_DISCORD_EMBED_SIZE - 2000
+    assert all(len(field.value) <= MAX_DISCORD_FIELD_SIZE for field in fields)
+    assert fields[4].name == "Uncovered changes"
+    assert fields[4].value.endswith(" more```")
+    # The short fields are kept whatever the listings take
+    assert fields[-6].name == "Total tests"
+
+
+def test_fields_stop_at_the_field_limit(mock_coverage_data, mock_test_report):
+    formatter = DiscordFormatter(mock_coverage_data, mock_test_report)
+
+    fields = formatter._fields(EmbedBudget(fields=5))
+
+    assert [field.name for field in fields] == ["Line coverage", "Complexity avg", "Total", "Total tests", "Total passed"]
+
+
 # Tests for _test_fields
 def test_test_fields(mock_test_report):
     formatter = DiscordFormatter(Mock(spec=NormalisedCoverageData), mock_test_report)
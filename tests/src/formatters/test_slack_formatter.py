@@ -3,12 +3,15 @@
 
 # Fixtures for test data
 from datetime import datetime
+from pathlib import Path
 from unittest.mock import patch
 import pytest
 
 from src.formatters.slack_formatter import SlackFormatter
+from src.helpers.diff_coverage import DiffCoverage, UncoveredHunk
 from src.models.data_reports import FileCoverage, NormalisedCoverageData
 from src.models.test_suite import TestCase, TestReport, TestResult, TestSuite
+from src.parsers.jacoco_schema_parser import JacocoSchemaParser
 
 
 @pytest.fixture
@@ -99,12 +102,85 @@ def test_coverage_section(monkeypatch, mock_coverage_data: NormalisedCoverageDat
 
     assert coverage_section[1]['elements'][0]['text'] == 'Coverage Status: :large_green_circle: Good'
 
+def test_diff_coverage_section(mock_coverage_data: NormalisedCoverageData):
+    hunk = UncoveredHunk(path="src/app/api.py", start=10, lines_valid=4, uncovered=[(11, 12)], lines_uncovered=2)
+    diff_coverage = DiffCoverage(lines_covered=2, lines_valid=4, files=1, worst_hunks=[hunk])
+    formatter = SlackFormatter(mock_coverage_data, diff_coverage=diff_coverage)
+    coverage_section = formatter.format_coverage()
+    assert coverage_section[-1]['text']['text'] == (
+        '*Diff Coverage:* 50% (2/4 lines)\n```\nsrc/app/api.py:11-12 (2/4 lines not run)```'
+    )
+
+def test_least_covered_modules_section():
+    coverage_data = NormalisedCoverageData(
+        total_line_rate=0.5,
+        total_branch_rate=0.0,
+        files=[
+            FileCoverage("app/api/views.py", 0.9, 0.0, 1.0, lines_covered=9, lines_valid=10),
+            FileCoverage("app/db/models.py", 0.25, 0.0, 1.0, lines_covered=1, lines_valid=4),
+        ],
+        timestamp=datetime.now(),
+    )
+    formatter = SlackFormatter(coverage_data)
+    coverage_section = formatter.format_coverage()
+    assert coverage_section[-2]['text']['text'] == (
+        '*Least Covered Modules:*\n```\napp/db  25% (1/4 lines)\napp/api 90% (9/10 lines)```'
+    )
+
+def test_lowest_coverage_files_section(monkeypatch):
+    monkeypatch.setenv('INPUT_LOWEST_COVERAGE_FILES', '2')
+    monkeypatch.setenv('INPUT_MIN_STATEMENTS', '5')
+    coverage_data = NormalisedCoverageData(
+        total_line_rate=0.5,
+        total_branch_rate=0.0,
+        files=[
+            FileCoverage("views.py", 0.9, 0.0, 1.0, lines_covered=9, lines_valid=10),
+            FileCoverage("tiny.py", 0.0, 0.0, 1.0, lines_covered=0, lines_valid=2),
+            FileCoverage("models.py", 0.5, 0.0, 1.0, lines_covered=3, lines_valid=6),
+            FileCoverage("admin.py", 0.95, 0.0, 1.0, lines_covered=19, lines_valid=20),
+        ],
+        timestamp=datetime.now(),
+    )
+    formatter = SlackFormatter(coverage_data)
+    assert [file.filename for file in formatter.lowest_coverage_files()] == ["models.py", "views.py"]
+    assert formatter.format_coverage()[-1]['text']['text'] == (
+        '*Lowest Coverage Files:*\n```\nmodels.py 50% (3/6 lines)\nviews.py  90% (9/10 lines)```'
+    )
+
+def test_lowest_coverage_files_add_up_the_classes_of_a_file(monkeypatch):
+    """A file's classes are listed as one file, files of the same name by their paths"""
+    monkeypatch.setenv('INPUT_MIN_STATEMENTS', '1')
+    jacoco_file = Path(__file__).parent.parent.parent / "data" / "xml" / "coverage" / "jacoco_inner_classes.xml"
+    formatter = SlackFormatter(JacocoSchemaParser().parse_and_normalise(str(jacoco_file)))
+
+    assert [(file.path, file.lines_covered, file.lines_valid) for file in formatter.lowest_coverage_files()] == [
+        ("org/b/Foo.java", 5, 10),
+        ("org/a/Foo.java", 20, 30),
+        ("org/b/Bar.java", 9, 10),
+    ]
+    assert formatter.format_coverage()[-1]['text']['text'] == (
+        '*Lowest Coverage Files:*\n```\norg/b/Foo.java 50% (5/10 lines)\n'
+        'org/a/Foo.java 66% (20/30 lines)\norg/b/Bar.java 90% (9/10 lines)```'
+    )
+
 def test_report_embed(mock_coverage_data: NormalisedCoverageData, mock_test_report_with_failures: TestReport):
     formatter = SlackFormatter(mock_coverage_data, mock_test_report_with_failures)
     test_report_section = formatter.format_test_report()
     assert test_report_section[0]['text']['text'] == ':clipboard: Test Details'
     assert test_report_section[1]['text']['text'] == ':x: *Failed* (1)\n```\nfailing:\nException occurred:\n```'
 
+def test_slowest_suites_section(mock_coverage_data: NormalisedCoverageData):
+    suites = [
+        TestSuite(name=name, tests=[TestCase(name="test", status=TestResult.PASSED, time="1")], time=time)
+        for name, time in [("api", 1.5), ("models", 12.25)]
+    ]
+    formatter = SlackFormatter(mock_coverage_data, TestReport(suites=suites))
+
+    test_report_section = formatter.format_test_report()
+
+    assert test_report_section[0]['text']['text'] == ':clipboard: Test Details'
+    assert test_report_section[1]['text']['text'] == '*Slowest Suites:*\n```\nmodels 12.25s\napi    1.50s```'
+
 def test_threshold_slightly_below(monkeypatch, mock_coverage_data: NormalisedCoverageData):
     monkeypatch.setenv('INPUT_COVERAGE_THRESHOLD', '0.8')
     mock_coverage_data.total_line_rate = 0.75
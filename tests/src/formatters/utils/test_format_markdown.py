@@ -3,7 +3,13 @@
 
 import pytest
 
-from src.formatters.utils.format_markdown import generate_test_status_summary
+from src.formatters.utils.format_markdown import (
+    generate_baseline_summary,
+    generate_test_status_summary,
+    generate_test_summary_by_status,
+    truncate_code_block,
+)
+from src.helpers.coverage_baseline import BaselineComparison, FileCoverageDelta
 from src.models.test_suite import TestCase, TestReport, TestResult, TestSuite
 
 
@@ -46,6 +52,34 @@ def test_generate_test_status_summary_empty_list():
     expected = ""
     assert result == expected
 
+def test_generate_test_status_summary_reads_only_the_shown_cases():
+    tests = (MockTestCase(name=f"Test {i}", message="") for i in range(1000))
+    result = generate_test_status_summary("test cases", tests, count=1000)
+    assert result.startswith("__**Test cases**__ (1000)\n")
+    assert next(tests).name == "Test 4"
+
+def test_generate_test_summary_by_status_collapses_identical_failures():
+    tests = [
+        TestCase(name=f"test_{i}", status=TestResult.FAILED, time="1", message=f"Timeout after {i}s")
+        for i in range(100)
+    ]
+    report = TestReport(suites=[TestSuite(name="suite", tests=tests, time=1.0)])
+
+    result = generate_test_summary_by_status(report)
+
+    assert result == "❌__**Failed tests**__ (100)\n```\n100 tests failed with:\nTimeout after 0s\n```"
+
+def test_generate_test_summary_by_status_shows_full_message_of_clusters():
+    tests = [
+        TestCase(name=f"test_{i}", status=TestResult.FAILED, time="1", full_message=f"Traceback: line {i}")
+        for i in range(2)
+    ]
+    report = TestReport(suites=[TestSuite(name="suite", tests=tests, time=1.0)])
+
+    result = generate_test_summary_by_status(report)
+
+    assert result == "❌__**Failed tests**__ (2)\n```\n2 tests failed with:\nTraceback: line 0\n```"
+
 def test_generate_test_status_summary_single_case():
     tests = [MockTestCase(name="Test 1", message="This is the message for test 1")]
     result = generate_test_status_summary("single test", tests, "python")
@@ -90,4 +124,51 @@ def test_generate_test_status_summary_different_markdown_styles():
         "Test 1:\nThis is the message for test 1\n"
         "```"
     )
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+
+def test_generate_baseline_summary():
+    comparison = BaselineComparison(
+        line_rate_delta=-2,
+        branch_rate_delta=0,
+        regressions=[FileCoverageDelta("app/api.py", 0.65, 0.8, 0.5, 0.5)],
+        new_files=["app/new.py"],
+        new_file_count=3,
+    )
+
+    assert generate_baseline_summary(comparison) == (
+        "```\nRegressions:\napp/api.py 80% → 65% (-15%)\nNew files (3):\napp/new.py```"
+    )
+    assert generate_baseline_summary(BaselineComparison(line_rate_delta=0, branch_rate_delta=0)) == ""
+
+
+def test_generate_baseline_summary_lists_branch_rate_drops():
+    comparison = BaselineComparison(
+        line_rate_delta=0,
+        branch_rate_delta=-5,
+        regressions=[
+            FileCoverageDelta("app/api.py", 0.65, 0.8, 0.25, 0.5),
+            FileCoverageDelta("app/db.py", 0.9, 0.9, 0.4, 0.6),
+        ],
+    )
+
+    assert generate_baseline_summary(comparison) == (
+        "```\nRegressions:\napp/api.py 80% → 65% (-15%), branches 50% → 25% (-25%)"
+        "\napp/db.py branches 60% → 40% (-20%)```"
+    )
+
+
+def test_generate_baseline_summary_negative_count_lists_no_files():
+    comparison = BaselineComparison(
+        line_rate_delta=0, branch_rate_delta=0, new_files=["a.py", "b.py"], new_file_count=2
+    )
+
+    assert generate_baseline_summary(comparison, count=-3) == "```\nNew files (2):```"
+
+
+def test_truncate_code_block_ends_with_how_many_lines_were_cut():
+    block = "```python\n" + "\n".join(f"line {i}" for i in range(10)) + "```"
+
+    assert truncate_code_block(block, len(block)) == block
+    assert truncate_code_block(block, 42) == "```python\nline 0\nline 1\nline 2\n… 7 more```"
+    assert truncate_code_block(block, 10) == ""
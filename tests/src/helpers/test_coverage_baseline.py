@@ -0,0 +1,69 @@
+from src.helpers.coverage_baseline import compare_to_baseline
+from src.models.data_reports import FileCoverage, NormalisedCoverageData
+
+
+def report(*files):
+    """A report of (filename, lines covered[, branch rate]) files with 10 lines each"""
+    coverages = [
+        FileCoverage(filename, covered / 10, *(branch_rate or [covered / 20]), 1.0, lines_covered=covered, lines_valid=10)
+        for filename, covered, *branch_rate in files
+    ]
+    lines_covered = sum(file.lines_covered for file in coverages)
+    return NormalisedCoverageData(
+        total_line_rate=lines_covered / (10 * len(coverages)),
+        total_branch_rate=0.0,
+        files=coverages,
+        timestamp="1725112165369",
+        lines_covered=lines_covered,
+        lines_valid=10 * len(coverages),
+    )
+
+
+def test_compare_to_baseline():
+    """Files are joined on filename, the largest drops come first."""
+    baseline = report(("a.py", 8), ("b.py", 9), ("c.py", 5), ("gone.py", 1))
+    current = report(("a.py", 7), ("b.py", 3), ("c.py", 6), ("new.py", 0))
+
+    comparison = compare_to_baseline(current, baseline)
+
+    assert comparison.line_rate_delta == 40 - 57
+    assert [(delta.filename, round(delta.line_delta, 2)) for delta in comparison.regressions] == [
+        ("b.py", -0.6),
+        ("a.py", -0.1),
+    ]
+    assert round(comparison.regressions[0].branch_delta, 2) == -0.3
+    assert (comparison.new_files, comparison.deleted_files) == (["new.py"], ["gone.py"])
+
+
+def test_compare_to_baseline_lists_branch_rate_drops():
+    """A file whose branch rate dropped regressed too, ordered by the larger drop."""
+    baseline = report(("a.py", 8, 0.9), ("b.py", 9, 0.5), ("c.py", 5, 0.5))
+    current = report(("a.py", 8, 0.2), ("b.py", 6, 0.5), ("c.py", 6, 0.6))
+
+    comparison = compare_to_baseline(current, baseline)
+
+    assert [(delta.filename, round(delta.largest_drop, 2)) for delta in comparison.regressions] == [
+        ("a.py", -0.7),
+        ("b.py", -0.3),
+    ]
+
+
+def test_compare_to_baseline_adds_up_classes_of_a_file():
+    """Rows of the same file, one per class, are compared as one file."""
+    baseline = report(("a.py", 10))
+    current = report(("a.py", 10), ("a.py", 0))
+
+    comparison = compare_to_baseline(current, baseline, count=1)
+
+    assert [(delta.filename, delta.line_rate) for delta in comparison.regressions] == [("a.py", 0.5)]
+    assert comparison.new_file_count == 0
+
+
+def test_compare_to_baseline_keeps_counts_of_files_not_listed():
+    baseline = report(*((f"old_{i}.py", 5) for i in range(8)))
+    current = report(*((f"new_{i}.py", 5) for i in range(8)))
+
+    comparison = compare_to_baseline(current, baseline, count=3)
+
+    assert (len(comparison.new_files), comparison.new_file_count) == (3, 8)
+    assert (len(comparison.deleted_files), comparison.deleted_file_count) == (3, 8)
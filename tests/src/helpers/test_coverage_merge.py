@@ -0,0 +1,133 @@
+from pathlib import Path
+
+from src.helpers.coverage_merge import merge_coverage_reports
+from src.models.data_reports import FileCoverage, FileLineHits, NormalisedCoverageData
+from src.parsers.coberature_schema_parser import CoberatureSchemaParser
+
+
+def file_coverage(filename, lines_covered, lines_valid, complexity=1.0):
+    return FileCoverage(
+        filename=filename,
+        line_rate=lines_covered / lines_valid,
+        branch_rate=0.0,
+        complexity=complexity,
+        lines_covered=lines_covered,
+        lines_valid=lines_valid,
+    )
+
+
+def line_hits(*hits):
+    file_line_hits = FileLineHits()
+    for line, line_hit in enumerate(hits, start=1):
+        file_line_hits.append(line, line_hit)
+    return file_line_hits
+
+
+def report(*files, line_hits=None):
+    lines_covered = sum(file.lines_covered for file in files)
+    lines_valid = sum(file.lines_valid for file in files)
+    return NormalisedCoverageData(
+        line_hits=line_hits,
+        total_line_rate=lines_covered / lines_valid,
+        total_branch_rate=0.0,
+        files=list(files),
+        timestamp="1725112165369",
+        lines_covered=lines_covered,
+        lines_valid=lines_valid,
+    )
+
+
+def test_merge_single_report_is_unchanged():
+    """A single report is returned as it is."""
+    single = report(file_coverage("a.py", 1, 2))
+
+    assert merge_coverage_reports([single]) is single
+
+
+def test_merge_uses_counts_not_rates():
+    """Totals come from the merged counts, not an average of the rates."""
+    merged = merge_coverage_reports(
+        [
+            report(file_coverage("a.py", 1, 10), file_coverage("b.py", 1, 1)),
+            report(file_coverage("a.py", 8, 10), file_coverage("c.py", 0, 89)),
+        ]
+    )
+
+    assert [file.filename for file in merged.files] == ["a.py", "b.py", "c.py"]
+    assert (merged.files[0].lines_covered, merged.files[0].lines_valid) == (8, 10)
+    assert merged.files[0].line_rate == 0.8
+    assert (merged.lines_covered, merged.lines_valid) == (9, 100)
+    assert merged.total_line_rate == 9
+    assert merged.total == 3
+
+
+def test_merge_adds_classes_of_the_same_file():
+    """Entries of one report for the same file cover different lines."""
+    merged = merge_coverage_reports(
+        [
+            report(file_coverage("A.java", 2, 4, complexity=2), file_coverage("A.java", 1, 4, complexity=3)),
+            report(file_coverage("A.java", 4, 8, complexity=4)),
+        ]
+    )
+
+    (file,) = merged.files
+    assert (file.lines_covered, file.lines_valid) == (4, 8)
+    assert file.complexity == 5
+
+
+def test_merge_adds_line_hits(monkeypatch):
+    """With line hits the shards' hits of each line are added up."""
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+    shards = Path(__file__).parent.parent.parent / "data" / "xml" / "coverage" / "shards"
+    reports = [CoberatureSchemaParser().parse_and_normalise(f"{shards}/coverage_shard_{n}.xml") for n in (1, 2)]
+
+    merged = merge_coverage_reports(reports).line_hits
+
+    api = merged["app/api.py"]
+    assert [api.row(i) for i in range(len(api))] == [(1, 2, 0, 0), (2, 2, 1, 2), (3, 1, 0, 0), (4, 0, 0, 0)]
+
+
+def test_merge_combines_the_lines_of_complementary_shards():
+    """Lines covered by different shards add up, the file is fully covered."""
+    merged = merge_coverage_reports(
+        [
+            report(file_coverage("a.py", 2, 4), line_hits={"a.py": line_hits(1, 1, 0, 0)}),
+            report(file_coverage("a.py", 2, 4), line_hits={"a.py": line_hits(0, 0, 3, 1)}),
+        ]
+    )
+
+    (file,) = merged.files
+    assert (file.lines_covered, file.lines_valid) == (4, 4)
+    assert file.line_rate == 1.0
+    assert (merged.lines_covered, merged.lines_valid) == (4, 4)
+    assert merged.total_line_rate == 100
+
+
+def test_merge_merges_each_files_line_hits_once(monkeypatch):
+    """The merged line hits are the ones the files' counts were taken from."""
+    merges = []
+    merge = FileLineHits.merge
+    monkeypatch.setattr(FileLineHits, "merge", lambda self, other: merges.append(1) or merge(self, other))
+
+    merged = merge_coverage_reports(
+        [
+            report(file_coverage("a.py", 2, 4), line_hits={"a.py": line_hits(1, 1, 0, 0)}),
+            report(file_coverage("a.py", 2, 4), line_hits={"a.py": line_hits(0, 0, 3, 1)}),
+        ]
+    )
+
+    assert len(merges) == 1
+    assert merged.line_hits["a.py"].lines_covered == merged.files[0].lines_covered
+
+
+def test_merge_without_line_hits_keeps_the_most_covered_shard():
+    """A file a shard has no line hits for falls back to the largest counts."""
+    merged = merge_coverage_reports(
+        [
+            report(file_coverage("a.py", 2, 4), line_hits={"a.py": line_hits(1, 1, 0, 0)}),
+            report(file_coverage("a.py", 3, 4)),
+        ]
+    )
+
+    (file,) = merged.files
+    assert (file.lines_covered, file.lines_valid) == (3, 4)
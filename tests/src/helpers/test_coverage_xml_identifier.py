@@ -40,12 +40,21 @@ def test_identify_malformed_xml():
     """Test to check if malformed XML raises an exception."""
 
     coverage_identifier = CoverageXmlIdentifier(
-        xml_file=f"{xml_file_path}/malformed.xml"
+        xml_file=f"{xml_file_path}/malformed_root.xml"
     )
     with pytest.raises(MalformedFile):
         coverage_identifier.identifiy_report()
 
 
+def test_identify_reads_only_the_root():
+    """Identification stops at the root, errors later in the file are left to the parser."""
+    coverage_identifier = CoverageXmlIdentifier(
+        xml_file=f"{xml_file_path}/malformed.xml"
+    )
+    result = coverage_identifier.identifiy_report()
+    assert result == CoverageFileType.COBERATURE
+
+
 def test_identify_xml_with_missing_attributes():
     """Test XML missing expected attributes for coverage type detection."""
     coverage_identifier = CoverageXmlIdentifier(
@@ -0,0 +1,92 @@
+from src.helpers.diff_coverage import SourcePaths, compute_diff_coverage, parse_unified_diff
+from src.models.data_reports import FileLineHits
+
+DIFF = """\
+diff --git a/src/app/api.py b/src/app/api.py
+index 1111111..2222222 100644
+--- a/src/app/api.py
++++ b/src/app/api.py
+@@ -1,3 +1,6 @@
+ import os
++import sys
++++counter
++
+ def handler():
+-    pass
++    return 1
+@@ -20,2 +23,2 @@ def other():
+-    old()
++    new()
+ 
+diff --git a/README.md b/README.md
+--- a/README.md
++++ b/README.md
+@@ -1 +1 @@
+-Old
++New
+diff --git a/src/app/gone.py b/src/app/gone.py
+deleted file mode 100644
+--- a/src/app/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-a = 1
+-b = 2
+"""
+
+
+def line_hits(*rows):
+    hits = FileLineHits()
+    for line, count in rows:
+        hits.append(line, count)
+    return hits
+
+
+def write_diff(tmp_path, text=DIFF):
+    diff_path = tmp_path / "changes.diff"
+    diff_path.write_text(text)
+    return str(diff_path)
+
+
+def test_parse_unified_diff_finds_added_lines(tmp_path):
+    """Added lines are grouped in runs per hunk, removed files are left out."""
+    changes = parse_unified_diff(write_diff(tmp_path))
+
+    assert set(changes) == {"src/app/api.py", "README.md"}
+    assert [hunk.added for hunk in changes["src/app/api.py"]] == [[(2, 4), (6, 6)], [(23, 23)]]
+    assert changes["src/app/api.py"][1].start == 23
+
+
+def test_diff_coverage_of_added_lines(tmp_path):
+    """Only executable added lines count, files missing from the report are skipped."""
+    changes = parse_unified_diff(write_diff(tmp_path))
+    report_hits = {
+        "app/api.py": line_hits((1, 1), (2, 1), (3, 0), (5, 1), (6, 0), (23, 0), (24, 3)),
+        "app/other.py": line_hits((1, 0)),
+    }
+
+    coverage = compute_diff_coverage(changes, report_hits)
+
+    assert (coverage.files, coverage.lines_covered, coverage.lines_valid) == (1, 1, 4)
+    assert coverage.line_rate == 25
+    assert [(hunk.name, hunk.lines_uncovered) for hunk in coverage.worst_hunks] == [
+        ("src/app/api.py:3, 6", 2),
+        ("src/app/api.py:23", 1),
+    ]
+
+
+def test_diff_coverage_without_executable_lines(tmp_path):
+    changes = parse_unified_diff(write_diff(tmp_path))
+
+    coverage = compute_diff_coverage(changes, {"app/api.py": line_hits((100, 0))})
+
+    assert coverage.line_rate is None
+    assert coverage.worst_hunks == []
+
+
+def test_source_paths_match_by_longest_suffix():
+    """Report and diff paths match when one ends with the other's components."""
+    paths = SourcePaths(["org/example/Main.java", "example/Main.java", "/home/runner/work/repo/app/api.py"])
+
+    assert paths.match("src/main/java/org/example/Main.java") == "org/example/Main.java"
+    assert paths.match("app/api.py") == "/home/runner/work/repo/app/api.py"
+    assert paths.match("src/other/Main.java") is None
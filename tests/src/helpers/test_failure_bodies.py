@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from src.helpers.failure_bodies import (
+    BodyFiles,
+    BodySource,
+    JSON_BODY,
+    locate_xml_bodies,
+    read_body,
+    xml_body_source,
+)
+from src.models.test_suite import TestResult
+from src.test_readers.junit_reader import JUnitReader
+
+data_path = Path(__file__).parent.parent.parent / "data"
+bodies_file = f"{data_path}/xml/tests/junit_failure_bodies.xml"
+
+
+def test_junit_failure_bodies_are_read_from_the_file():
+    """Only where each body is gets stored, the text is read when accessed."""
+    report = JUnitReader().read(bodies_file)
+
+    failures = report.get_tests_by_status(TestResult.FAILED)
+    assert [test.full_message for test in failures] == [
+        "assert 1 > 2\n  where x = <Mock> & “quoted”",
+        "Traceback: <testcase> in </failure> text",
+        None,
+    ]
+    assert list(report.tests.columns["full_message"]) == [0xFFFFFFFF] * 4
+    assert report.tests.sources == [xml_body_source(bodies_file)]
+    assert failures[0].message == "expected a > b"
+
+
+def test_locator_skips_comments_and_counts_in_document_order():
+    spans = locate_xml_bodies(bodies_file, [2, 0, 1])
+
+    with open(bodies_file, "rb") as file:
+        data = file.read()
+    offset, length = spans[0]
+    assert data[offset : offset + length].startswith(b'<failure message="expected a &gt; b"')
+    offset, length = spans[2]
+    assert data[offset : offset + length].endswith(b"]]></failure>")
+    # test_passes has no children
+    assert 1 not in spans
+
+
+def test_json_body_is_decoded_without_ansi_escapes(tmp_path):
+    report = tmp_path / "results.json"
+    body_text = '"\\u001b[31mError:\\u001b[39m boom\\nat line 1"'
+    report.write_text('{"failureMessages": [' + body_text + "]}")
+
+    body = read_body(BodySource(path=str(report), format=JSON_BODY), 21, len(body_text))
+
+    assert body == "Error: boom\nat line 1"
+
+
+def test_missing_source_reads_as_none(tmp_path):
+    assert read_body(BodySource(path=str(tmp_path / "gone.xml"), format="xml"), 0, 10) is None
+
+
+def test_prefix_reads_only_the_start_of_the_body(tmp_path):
+    """A prefix is decoded from the start of the body, cut inside CDATA or an entity."""
+    report = tmp_path / "junit.xml"
+    cdata_body = "<failure message=\"m\"><![CDATA[" + "x" * 100 + "]]></failure>"
+    escaped_body = "<failure>" + "a &lt; b " * 20 + "</failure>"
+    report.write_text(cdata_body + escaped_body)
+    source = BodySource(path=str(report), format="xml")
+    bodies = BodyFiles()
+
+    assert bodies.read(source, 0, len(cdata_body), limit=10) == "x" * 10
+    assert bodies.read(source, len(cdata_body), len(escaped_body), limit=7) == "a < b a"
+    assert bodies.read(source, 0, len(cdata_body)) == "x" * 100
+    bodies.close()
+
+
+def test_json_prefix_drops_a_cut_escape(tmp_path):
+    report = tmp_path / "results.json"
+    body_text = '"' + "\\u00e9" * 40 + '"'
+    report.write_text(body_text)
+
+    source = BodySource(path=str(report), format=JSON_BODY)
+
+    # The first 12 bytes end inside the second escape
+    assert BodyFiles().read(source, 0, len(body_text), limit=3) == "\u00e9"
+    assert BodyFiles().read(source, 0, len(body_text)) == "\u00e9" * 40
+
+
+def test_files_are_mapped_once(tmp_path):
+    """Bodies still read from a file that was removed after its first read."""
+    report = tmp_path / "junit.xml"
+    report.write_text("<failure>first</failure><failure>second</failure>")
+    source = BodySource(path=str(report), format="xml")
+    bodies = BodyFiles()
+
+    assert bodies.read(source, 0, 24) == "first"
+    report.unlink()
+    assert bodies.read(source, 24, 25) == "second"
+    bodies.close()
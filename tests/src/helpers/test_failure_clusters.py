@@ -0,0 +1,58 @@
+from src.helpers.failure_clusters import cluster_failures, failure_signature, normalise_message
+from src.models.test_suite import TestCase, TestReport, TestResult, TestSuite
+
+
+def failing(name: str, message: str) -> TestCase:
+    return TestCase(name=name, status=TestResult.FAILED, time="0.1", message=message)
+
+
+def test_normalise_message_drops_run_specific_details():
+    message = "\x1b[31mConnectionError\x1b[39m: port 5432 refused at 0x7f3a2c (/tmp/run-81/db.py:12) id 9f86d081884c"
+
+    assert normalise_message(message) == "ConnectionError: port <n> refused at <addr> (<path>:<n>) id <id>"
+
+
+def test_signatures_match_across_runs():
+    assert failure_signature("Timeout after 30.5s in C:\\ci\\a.py") == failure_signature(
+        "Timeout after 12s in C:\\ci\\b.py"
+    )
+    assert failure_signature("Timeout") != failure_signature("KeyError")
+
+
+def test_failures_are_grouped_largest_first():
+    tests = [failing("test_key", "KeyError: 'a'")] + [
+        failing(f"test_db_{i}", f"ConnectionError: port {5000 + i} refused") for i in range(7)
+    ]
+
+    clusters = cluster_failures(tests)
+
+    assert [cluster.count for cluster in clusters] == [7, 1]
+    assert clusters[0].name == "7 tests failed with"
+    assert clusters[0].message == "ConnectionError: port 5000 refused"
+    assert clusters[0].test_names == [f"test_db_{i}" for i in range(5)]
+    assert clusters[1].name == "test_key"
+
+
+def test_failures_without_message_show_their_full_message():
+    """A cluster made from full messages reads as the start of the first one."""
+    tests = [
+        TestCase(name=f"test_{i}", status=TestResult.FAILED, time="0.1", full_message=f"AssertionError: {i} != 0")
+        for i in range(1, 3)
+    ]
+
+    (cluster,) = cluster_failures(tests)
+
+    assert cluster.name == "2 tests failed with"
+    assert cluster.message == "AssertionError: 1 != 0"
+
+
+def test_report_clusters_once_per_status():
+    report = TestReport(
+        suites=[TestSuite(name="suite", tests=[failing(f"test_{i}", f"Timeout after {i}s") for i in range(3)], time=1.0)]
+    )
+
+    clusters = report.get_failure_clusters(TestResult.FAILED)
+
+    assert report.get_failure_clusters(TestResult.FAILED) is clusters
+    assert [cluster.count for cluster in clusters] == [3]
+    assert report.get_failure_clusters(TestResult.ERROR) == []
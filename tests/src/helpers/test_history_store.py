@@ -0,0 +1,87 @@
+from pathlib import Path
+import sqlite3
+
+import pytest
+
+from src.helpers.history_store import SCHEMA_VERSION, HistoryStore
+from src.models.data_reports import FileCoverage, NormalisedCoverageData
+from src.test_readers.junit_reader import JUnitReader
+
+test_file = Path(__file__).parent.parent.parent / "data" / "xml" / "tests" / "junit_with_fails.xml"
+
+
+def coverage(*rates):
+    """A report with a file per rate, file i has 10 lines"""
+    files = [
+        FileCoverage(f"app/f{i}.py", rate, 0.0, 1.0, lines_covered=int(rate * 10), lines_valid=10)
+        for i, rate in enumerate(rates)
+    ]
+    covered = sum(file.lines_covered for file in files)
+    return NormalisedCoverageData(
+        total_line_rate=covered / (10 * len(files)),
+        total_branch_rate=0.0,
+        files=files,
+        timestamp="1725112165369",
+        lines_covered=covered,
+        lines_valid=10 * len(files),
+    )
+
+
+def test_record_and_compare_runs(tmp_path):
+    """Runs are found by branch and commit, and compared file by file."""
+    path = str(tmp_path / "history.db")
+    with HistoryStore(path) as store:
+        main_run = store.record_run(coverage(0.5, 1.0, 0.8), commit_sha="aaa", branch="main")
+        branch_run = store.record_run(coverage(0.5, 0.6, 0.2), commit_sha="bbb", branch="feature")
+
+    # The history outlives the connection
+    with HistoryStore(path) as store:
+        assert store.last_run("main").id == main_run
+        assert store.last_run("main", before=main_run) is None
+        assert store.run_for_commit("bbb").line_rate == 43
+        assert [(delta.path, round(delta.delta, 2)) for delta in store.file_regressions(branch_run, main_run)] == [
+            ("app/f2.py", -0.6),
+            ("app/f1.py", -0.4),
+        ]
+        assert store.file_history("app/f1.py") == [(branch_run, 0.6), (main_run, 1.0)]
+
+
+def test_record_run_with_tests(tmp_path):
+    test_report = JUnitReader().read(str(test_file))
+
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        run_id = store.record_run(coverage(0.5), test_report, branch="main")
+        run = store.run(run_id)
+        statuses = store.connection.execute(
+            "SELECT status, COUNT(*) FROM test_results WHERE run_id = ? GROUP BY status", (run_id,)
+        ).fetchall()
+
+    assert (run.tests, run.failed) == (test_report.total_tests, test_report.total_failed)
+    assert dict(statuses)["FAILED"] == test_report.total_failed
+
+
+def test_schema_version_is_set_once(tmp_path):
+    path = str(tmp_path / "history.db")
+    HistoryStore(path).close()
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+    connection.close()
+
+    with HistoryStore(path) as store:
+        assert store.last_run("main") is None
+
+
+def test_later_schema_is_refused(tmp_path):
+    """A file written by a later version is left as it is."""
+    path = str(tmp_path / "history.db")
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    connection.close()
+
+    with pytest.raises(sqlite3.DatabaseError, match="newer"):
+        HistoryStore(path)
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION + 1,)
+    assert connection.execute("SELECT name FROM sqlite_master").fetchall() == []
+    connection.close()
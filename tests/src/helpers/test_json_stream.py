@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.exceptions.file_errors import MalformedFile
+from src.helpers.json_stream import JsonStream
+
+json_file_path = Path(__file__).parent.parent.parent / "data" / "json" / "tests"
+
+
+def test_read_value_matches_json_load():
+    """Values spread over many chunks decode the same as json.load"""
+    file = f"{json_file_path}/test_jest_with_failure.json"
+    with open(file, encoding="utf-8") as f:
+        expected = json.load(f)
+
+    with JsonStream(file, chunk_size=7) as stream:
+        assert stream.read_value() == expected
+
+
+def test_iter_object_and_array():
+    """Keys and items are walked in order, skipped values are not decoded"""
+    file = f"{json_file_path}/test_jest_with_failure.json"
+
+    titles = []
+    keys = []
+    with JsonStream(file, chunk_size=5) as stream:
+        for key in stream.iter_object():
+            keys.append(key)
+            if key != "testResults":
+                stream.skip_value()
+                continue
+            for _ in stream.iter_array():
+                for suite_key in stream.iter_object():
+                    if suite_key != "assertionResults":
+                        stream.skip_value()
+                        continue
+                    for _ in stream.iter_array():
+                        titles.append(stream.read_value()["title"])
+
+    assert keys[0] == "numFailedTestSuites"
+    assert "testResults" in keys
+    assert len(titles) == 7
+    assert titles[1] == "exception raising for object as title"
+
+
+def test_strings_with_brackets_and_escapes(tmp_path):
+    """Brackets and quotes inside strings do not end containers early"""
+    document = {"a": ["]}", "\"{[", {"b": "\\\"]"}], "c": -1.5e3, "d": [True, None]}
+    file = tmp_path / "strings.json"
+    file.write_text(json.dumps(document))
+
+    with JsonStream(str(file), chunk_size=3) as stream:
+        values = {}
+        for key in stream.iter_object():
+            values[key] = stream.read_value()
+
+    assert values == document
+
+
+def test_truncated_file_raises(tmp_path):
+    """A file that ends inside a value is malformed"""
+    file = tmp_path / "truncated.json"
+    file.write_text('{"testResults": [{"name": "su')
+
+    with JsonStream(str(file)) as stream:
+        with pytest.raises(MalformedFile):
+            for _ in stream.iter_object():
+                stream.skip_value()
+
+
+def test_read_value_larger_than_decode_window(tmp_path):
+    """Values larger than the decode window and non-ascii text are read whole"""
+    document = [{"message": "é" * 10000, "n": 12345}, 67890]
+    file = tmp_path / "large.json"
+    file.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+
+    with JsonStream(str(file), chunk_size=100) as stream:
+        items = []
+        for _ in stream.iter_array():
+            items.append(stream.read_value())
+
+    assert items == document
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import pytest
+
+from src.helpers.parameterised import ParameterisedGrouper, split_parameterised
+from src.helpers.report_snapshot import load_snapshot, write_snapshot
+from src.models.test_suite import TestCase, TestResult
+from src.test_readers.junit_reader import JUnitReader
+
+parameterised_file = Path(__file__).parent.parent.parent / "data" / "xml" / "tests" / "parameterised.xml"
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("test_add[1-2]", ("test_add", "1-2")),
+        ("testDivide(int, int)[3]", ("testDivide(int, int)", "3")),
+        ("test_plain", None),
+        ("[1] only parameters", None),
+    ],
+)
+def test_split_parameterised(name, expected):
+    assert split_parameterised(name) == expected
+
+
+def test_grouper_merges_variants_with_the_same_status():
+    grouper = ParameterisedGrouper(enabled=True)
+    indices = [
+        grouper.add(TestCase(name=f"test_x[case-{i}]", status=TestResult.PASSED, time="0.5"))
+        for i in range(10)
+    ]
+
+    assert indices == [0] + [None] * 9
+    [group] = grouper.tests
+    assert group.variants == 10
+    assert group.time == 5.0
+    assert group.name == "test_x[case-0, case-1, case-2, …] (10 variants)"
+
+
+def test_reader_groups_variants_when_enabled(monkeypatch):
+    monkeypatch.setenv("INPUT_GROUP_PARAMETERISED", "true")
+
+    report = JUnitReader().read(str(parameterised_file))
+
+    assert [test.name for test in report.suites[0].tests] == [
+        "test_add[1-2, 2-3] (2 variants)",
+        "test_add[case-3, case-4, case-5] (3 variants)",
+        "testDivide(int, int)[1]",
+        "test_plain",
+    ]
+    assert (report.total_tests, report.total_passed, report.total_failed) == (7, 4, 3)
+    assert report.count_tests_by_status(TestResult.FAILED) == 3
+    failed = report.get_tests_by_status(TestResult.FAILED)[0]
+    assert (failed.message, failed.full_message) == ("assert 5 == 6", "first failing variant")
+    assert [cluster.count for cluster in report.get_failure_clusters(TestResult.FAILED)] == [3]
+
+
+def test_grouped_report_snapshot_keeps_variant_counts(monkeypatch, tmp_path):
+    monkeypatch.setenv("INPUT_GROUP_PARAMETERISED", "true")
+    report = JUnitReader().read(str(parameterised_file))
+    snapshot = str(tmp_path / "tests.snapshot")
+
+    write_snapshot(report, snapshot)
+    loaded = load_snapshot(snapshot)
+
+    assert [suite.passed for suite in loaded.suites] == [4]
+    assert loaded.count_tests_by_status(TestResult.FAILED) == 3
+
+
+def test_reader_keeps_variants_by_default():
+    report = JUnitReader().read(str(parameterised_file))
+
+    assert len(report.suites[0].tests) == report.total_tests == 7
@@ -0,0 +1,113 @@
+import os
+import pickle
+
+from src.helpers.parse_cache import ParseCache, cached_parse
+
+
+def write(path, content):
+    path.write_text(content)
+    return str(path)
+
+
+def test_fetch_parses_once(tmp_path):
+    """The second fetch of the same content is served from the cache."""
+    cache = ParseCache(directory=str(tmp_path / "cache"))
+    report_file = write(tmp_path / "coverage.xml", "<coverage/>")
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return {"files": 2}
+
+    assert cache.fetch("coverage", [report_file], parse) == {"files": 2}
+    assert cache.fetch("coverage", [report_file], parse) == {"files": 2}
+    assert len(calls) == 1
+
+
+def test_fetch_parses_again_when_the_entry_is_not_valid(tmp_path):
+    """An entry the caller rejects is replaced by a new parse."""
+    cache = ParseCache(directory=str(tmp_path / "cache"))
+    report_file = write(tmp_path / "coverage.xml", "<coverage/>")
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return {"path": report_file, "parse": len(calls)}
+
+    cache.fetch("coverage", [report_file], parse)
+    report = cache.fetch("coverage", [report_file], parse, valid=lambda report: report["parse"] > 1)
+
+    assert report == {"path": report_file, "parse": 2}
+    assert cache.fetch("coverage", [report_file], parse, valid=lambda report: report["parse"] > 1) == report
+    assert len(calls) == 2
+
+
+def test_key_follows_content_and_kind(tmp_path):
+    """Keys change with the content of the files and the kind of report, not their names."""
+    cache = ParseCache(directory=str(tmp_path / "cache"))
+    first = write(tmp_path / "a.xml", "<coverage/>")
+    same = write(tmp_path / "b.xml", "<coverage/>")
+    other = write(tmp_path / "c.xml", "<coverage></coverage>")
+
+    assert cache.key("coverage", [first]) == cache.key("coverage", [same])
+    assert cache.key("coverage", [first]) != cache.key("coverage", [other])
+    assert cache.key("coverage", [first]) != cache.key("tests", [first])
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Entries read least recently are evicted once the cache is over its size."""
+    cache = ParseCache(directory=str(tmp_path / "cache"), max_bytes=2500)
+    cache.put("first", b"1" * 1000)
+    cache.put("second", b"2" * 1000)
+    # Reading 'first' makes 'second' the least recently used
+    os.utime(cache._path("second"), ns=(1, 1))
+    assert cache.get("first") is not None
+
+    cache.put("third", b"3" * 1000)
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    """A corrupt entry is a miss and is removed."""
+    cache = ParseCache(directory=str(tmp_path / "cache"))
+    with open(cache._path("broken"), "wb") as file:
+        file.write(b"not a pickle")
+
+    assert cache.get("broken") is None
+    assert not os.path.exists(cache._path("broken"))
+
+
+class Payload:
+    """Pickles to a call of a function that is not a report class"""
+
+    def __reduce__(self):
+        return (os.remove, (self.path,))
+
+
+def test_entry_building_other_objects_is_dropped(tmp_path):
+    """An entry is only unpickled into report classes, anything else is not called."""
+    cache = ParseCache(directory=str(tmp_path / "cache"))
+    target = write(tmp_path / "keep.txt", "kept")
+    payload = Payload()
+    payload.path = target
+    with open(cache._path("planted"), "wb") as file:
+        pickle.dump(payload, file)
+
+    assert cache.get("planted") is None
+    assert os.path.exists(target)
+    assert not os.path.exists(cache._path("planted"))
+
+
+def test_cached_parse_is_off_without_directory(monkeypatch, tmp_path):
+    """Without a cache directory reports are always parsed."""
+    monkeypatch.delenv("INPUT_CACHE_DIR", raising=False)
+    report_file = write(tmp_path / "coverage.xml", "<coverage/>")
+    calls = []
+
+    for _ in range(2):
+        cached_parse("coverage", [report_file], lambda: calls.append(1))
+
+    assert len(calls) == 2
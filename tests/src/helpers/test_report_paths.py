@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from src.helpers.report_paths import resolve_report_paths
+
+shards_path = Path(__file__).parent.parent.parent / "data" / "xml" / "coverage" / "shards"
+
+
+def test_resolve_glob():
+    """Globs expand to the matching files in sorted order."""
+    paths = resolve_report_paths(f"{shards_path}/coverage_shard_*.xml")
+
+    assert [Path(path).name for path in paths] == ["coverage_shard_1.xml", "coverage_shard_2.xml"]
+
+
+def test_resolve_list():
+    """Paths can be separated by commas or new lines, duplicates are dropped."""
+    paths = resolve_report_paths("a.xml, b.xml\nc.xml,\na.xml")
+
+    assert paths == ["a.xml", "b.xml", "c.xml"]
+
+
+def test_resolve_empty():
+    assert resolve_report_paths("") == []
+    assert resolve_report_paths(f"{shards_path}/missing_*.xml") == []
+
+
+def test_resolve_directory():
+    """A directory expands to the report files directly inside it."""
+    surefire_path = shards_path.parent.parent / "tests" / "surefire"
+
+    paths = resolve_report_paths(str(surefire_path))
+
+    assert [Path(path).name for path in paths] == [
+        "TEST-org.example.AlphaTest.xml",
+        "TEST-org.example.BetaTest.xml",
+        "TEST-org.example.GammaTest.xml",
+    ]
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+
+from src.exceptions.file_errors import MalformedFile
+from src.helpers.report_snapshot import is_snapshot, load_snapshot, write_snapshot
+from src.models.test_suite import TestResult
+from src.parsers.coberature_schema_parser import CoberatureSchemaParser
+from src.test_readers.junit_reader import JUnitReader
+
+data_path = Path(__file__).parent.parent.parent / "data" / "xml"
+
+
+def test_coverage_snapshot_round_trip(tmp_path):
+    """A coverage snapshot loads back to the same report."""
+    coverage_file = f"{data_path}/coverage/shards/coverage_shard_2.xml"
+    report = CoberatureSchemaParser().parse_and_normalise(coverage_file)
+    snapshot = str(tmp_path / "coverage.snapshot")
+
+    write_snapshot(report, snapshot)
+    loaded = load_snapshot(snapshot)
+
+    assert is_snapshot(snapshot)
+    assert not is_snapshot(coverage_file)
+    assert loaded == report
+    assert loaded.total == 3
+    assert loaded.total_line_rate == report.total_line_rate
+    assert loaded.files[-1].filename == "app/cli.py"
+    assert loaded.least_covered_modules(5) == report.least_covered_modules(5)
+
+
+def test_test_report_snapshot_round_trip(tmp_path):
+    """A test report snapshot keeps suites, cases and totals."""
+    report = JUnitReader().read(f"{data_path}/tests/junit_with_fails.xml")
+    snapshot = str(tmp_path / "tests.snapshot")
+
+    write_snapshot(report, snapshot)
+    loaded = load_snapshot(snapshot)
+
+    assert loaded.total_tests == report.total_tests
+    assert loaded.total_failed == report.total_failed
+    assert loaded.failure_summary == report.failure_summary
+    assert loaded.get_slowest_tests() == report.get_slowest_tests()
+    assert [suite.name for suite in loaded.slowest_suites] == [suite.name for suite in report.slowest_suites]
+    assert list(loaded.get_tests_by_status(TestResult.FAILED)) == list(report.get_tests_by_status(TestResult.FAILED))
+    assert loaded.get_summary()["total_time"] == report.get_summary()["total_time"]
+    for loaded_suite, suite in zip(loaded.suites, report.suites):
+        assert (loaded_suite.name, loaded_suite.failed, loaded_suite.passed) == (
+            suite.name,
+            suite.failed,
+            suite.passed,
+        )
+        assert list(loaded_suite.tests) == list(suite.tests)
+
+
+def test_test_report_snapshot_keeps_status_index(tmp_path):
+    """The rows of each status are stored, renumbered in the snapshot's suite order."""
+    report = JUnitReader().read(f"{data_path}/tests/nested_suites.xml")
+    snapshot = str(tmp_path / "tests.snapshot")
+
+    write_snapshot(report, snapshot)
+    loaded = load_snapshot(snapshot)
+
+    for status in TestResult:
+        assert [test.name for test in loaded.get_tests_by_status(status)] == [
+            test.name for test in report.get_tests_by_status(status)
+        ]
+        assert loaded.count_tests_by_status(status) == report.count_tests_by_status(status)
+    assert loaded.total_time == report.total_time
+    assert dict(loaded.failure_summary) == {"module.inner": ["test_inner_fail: inner failed"]}
+
+
+def test_rejects_other_versions(tmp_path):
+    """Snapshots of another format version are not read."""
+    snapshot = tmp_path / "coverage.snapshot"
+    snapshot.write_bytes(b"WHRSNAP\x00\x63\x00\x01\x00\x00\x00\x00\x00")
+
+    with pytest.raises(MalformedFile):
+        load_snapshot(str(snapshot))
+
+
+def test_coverage_snapshot_keeps_line_hits(tmp_path, monkeypatch):
+    """Line hits are written with the report and load back the same."""
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+    report = CoberatureSchemaParser().parse_and_normalise(f"{data_path}/coverage/shards/coverage_shard_1.xml")
+    snapshot = str(tmp_path / "coverage.snapshot")
+
+    write_snapshot(report, snapshot)
+    loaded = load_snapshot(snapshot)
+
+    assert loaded.line_hits == report.line_hits
+    assert list(loaded.line_hits["app/api.py"].uncovered_ranges()) == [(4, 4)]
@@ -43,7 +43,7 @@ def test_identify_malformed_xml():
     """Test to check if malformed XML raises an exception."""
 
     suite_identifier = TestSuiteXmlIdentifier(
-        xml_file=f"{xml_file_path}/malformed.xml"
+        xml_file=f"{xml_file_path}/malformed_root.xml"
     )
     with pytest.raises(MalformedFile):
         suite_identifier.identify_suite()
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from src.exceptions.file_errors import MalformedFile
+from src.helpers.xml_engines import LxmlEngine, StdlibEngine, get_xml_engine
+from src.helpers.xml_stream import XmlStream
+from src.parsers.parser_factory import ParserFactory
+from src.test_readers.reader_factory import ReaderFactory
+
+data_path = Path(__file__).parent.parent.parent / "data" / "xml"
+
+coverage_files = [
+    "sample_coberature_coverage.xml",
+    "sample_clover_coverage.xml",
+    "clover_with_packages.xml",
+    "sample_jacoco_coverage.xml",
+    "jacoco_report_counters.xml",
+]
+test_files = [
+    "single_suite.xml",
+    "multiple_suites.xml",
+    "junit_with_fails.xml",
+    "nested_suites.xml",
+]
+
+
+@pytest.fixture
+def lxml_available():
+    pytest.importorskip("lxml")
+
+
+def parse_coverage(monkeypatch, engine, file):
+    monkeypatch.setenv("INPUT_XML_ENGINE", engine)
+    coverage_file = f"{data_path}/coverage/{file}"
+    parser = ParserFactory.get_parser(file_name=coverage_file)
+    return parser.parse_and_normalise(coverage_file)
+
+
+def read_tests(monkeypatch, engine, file):
+    monkeypatch.setenv("INPUT_XML_ENGINE", engine)
+    test_file = f"{data_path}/tests/{file}"
+    reader = ReaderFactory.get_reader(test_file=test_file)
+    return reader.read(test_file)
+
+
+def report_rows(report):
+    return [
+        (suite.name, suite.time, list(suite.tests))
+        for suite in report.suites
+    ]
+
+
+@pytest.mark.parametrize("file", coverage_files)
+def test_lxml_coverage_matches_stdlib(monkeypatch, lxml_available, file):
+    """Both engines normalise coverage reports the same way."""
+    expected = parse_coverage(monkeypatch, "stdlib", file)
+
+    assert parse_coverage(monkeypatch, "lxml", file) == expected
+
+
+@pytest.mark.parametrize("file", test_files)
+def test_lxml_test_report_matches_stdlib(monkeypatch, lxml_available, file):
+    """Both engines read JUnit reports the same way."""
+    expected = read_tests(monkeypatch, "stdlib", file)
+
+    assert report_rows(read_tests(monkeypatch, "lxml", file)) == report_rows(
+        expected
+    )
+
+
+def test_lxml_raises_malformed_body(lxml_available):
+    """Syntax errors from lxml are reported as MalformedFile."""
+    stream = XmlStream(f"{data_path}/tests/malformed_junit.xml", engine=LxmlEngine())
+    stream.read_root()
+
+    with pytest.raises(MalformedFile):
+        list(stream.iter_elements(tags=("testcase",)))
+
+
+def test_lxml_releases_streamed_elements(lxml_available):
+    """Streamed elements are dropped from the tree once they have been read."""
+    stream = XmlStream(
+        f"{data_path}/coverage/sample_clover_coverage.xml",
+        chunk_size=64,
+        engine=LxmlEngine(),
+    )
+
+    for _, file in stream.iter_elements(tags=("file",)):
+        assert file.find("metrics") is not None
+
+    assert next(stream.root.iter("file"), None) is None
+    assert stream.root.attrib["generated"] == "1725112165369"
+
+
+def test_get_xml_engine_from_input(monkeypatch):
+    """The engine can be forced to stdlib, unknown values fall back to auto."""
+    monkeypatch.setenv("INPUT_XML_ENGINE", "stdlib")
+    assert isinstance(get_xml_engine(), StdlibEngine)
+
+    monkeypatch.setenv("INPUT_XML_ENGINE", "unknown")
+    assert get_xml_engine().name in ("lxml", "stdlib")
+
+
+def test_get_xml_engine_without_lxml(monkeypatch):
+    """Without lxml installed the stdlib engine is used."""
+    monkeypatch.setattr("src.helpers.xml_engines.lxml_etree", None)
+
+    assert isinstance(get_xml_engine("lxml"), StdlibEngine)
+    assert isinstance(get_xml_engine("auto"), StdlibEngine)
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from src.helpers.xml_engines import StdlibEngine
+from src.helpers.xml_stream import XmlStream
+
+xml_file_path = Path(__file__).parent.parent.parent / "data" / "xml" / "coverage"
+
+
+def test_iter_elements_yields_requested_tags_in_order():
+    """Only the requested elements are handed out, in document order."""
+    stream = XmlStream(f"{xml_file_path}/sample_coberature_coverage.xml")
+
+    filenames = [
+        cls.attrib["filename"] for _, cls in stream.iter_elements(tags=("class",))
+    ]
+
+    assert filenames == ["file1.py", "file2.py"]
+
+
+def test_iter_elements_releases_elements():
+    """Streamed elements are detached so the tree does not grow."""
+    stream = XmlStream(
+        f"{xml_file_path}/sample_clover_coverage.xml",
+        chunk_size=64,
+        engine=StdlibEngine(),
+    )
+
+    for _, file in stream.iter_elements(tags=("file",)):
+        # Children of the requested element are still readable
+        assert file.find("metrics") is not None
+
+    assert len(stream.root) == 0
+    assert stream.root.attrib["generated"] == "1725112165369"
+
+
+def test_iter_elements_start_events():
+    """Start events carry the attributes of the opening tag."""
+    stream = XmlStream(f"{xml_file_path}/sample_jacoco_coverage.xml")
+
+    events = [
+        (event, element.attrib["name"])
+        for event, element in stream.iter_elements(
+            tags=("package",), start_tags=("package",)
+        )
+    ]
+
+    assert events == [("start", "org/example"), ("end", "org/example")]
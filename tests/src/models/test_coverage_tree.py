@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from src.models.coverage_tree import CoverageTree
+from src.models.data_reports import FileCoverage, FileCoverageTable
+from src.parsers.jacoco_schema_parser import JacocoSchemaParser
+
+xml_file_path = Path(__file__).parent.parent.parent / "data" / "xml" / "coverage"
+
+
+def file_coverage(filename, lines_covered, lines_valid, path=None):
+    return FileCoverage(
+        path=path,
+        filename=filename,
+        line_rate=lines_covered / lines_valid,
+        branch_rate=0.0,
+        complexity=1.0,
+        lines_covered=lines_covered,
+        lines_valid=lines_valid,
+    )
+
+
+def tree():
+    return CoverageTree.from_files(
+        FileCoverageTable(
+            [
+                file_coverage("src/app/api/views.py", 8, 10),
+                file_coverage("src/app/api/urls.py", 2, 10),
+                file_coverage("src/app/models.py", 9, 10),
+                file_coverage("src/lib/utils.py", 1, 10),
+                file_coverage("src\\lib\\io\\files.py", 5, 5),
+            ]
+        )
+    )
+
+
+def test_directories_hold_the_counts_of_every_file_under_them():
+    coverage_tree = tree()
+
+    assert coverage_tree.coverage(coverage_tree.find("src")).lines_covered == 25
+    api = coverage_tree.coverage(coverage_tree.find("src/app/api"))
+    assert (api.files, api.lines_covered, api.lines_valid) == (2, 10, 20)
+    assert coverage_tree.coverage(coverage_tree.find("src/lib")).files == 2
+    assert coverage_tree.find("src/missing") is None
+
+
+def test_top_level_modules_start_below_the_shared_path():
+    """All files are under src/, the modules are its directories."""
+    coverage_tree = tree()
+
+    assert [coverage_tree.path(node) for node in coverage_tree.top_level()] == ["src/app", "src/lib"]
+    assert [module.path for module in coverage_tree.least_covered(1)] == ["src/lib"]
+
+
+def test_files_at_the_shared_path_stop_the_descent():
+    coverage_tree = CoverageTree.from_files(
+        FileCoverageTable([file_coverage("app/main.py", 1, 2), file_coverage("app/core/db.py", 1, 2)])
+    )
+
+    assert [coverage_tree.path(node) for node in coverage_tree.top_level()] == ["app/core"]
+
+
+def test_files_named_without_their_directory_are_placed_by_path():
+    """JaCoCo and Clover name files without their package, their path has it."""
+    coverage_tree = CoverageTree.from_files(
+        FileCoverageTable(
+            [
+                file_coverage("Main.java", 1, 2, path="org/example/app/Main.java"),
+                file_coverage("Main.java", 2, 2, path="org/example/cli/Main.java"),
+                file_coverage("Util.java", 0, 2, path="org/example/util/Util.java"),
+            ]
+        )
+    )
+
+    assert [module.path for module in coverage_tree.least_covered(2)] == ["org/example/util", "org/example/app"]
+
+
+def test_jacoco_report_rolls_up_by_package():
+    coverage_data = JacocoSchemaParser().parse_and_normalise(f"{xml_file_path}/sample_jacoco_coverage.xml")
+
+    coverage_tree = coverage_data.directory_tree()
+
+    assert coverage_tree.coverage(coverage_tree.find("org/example")).files == 2
@@ -0,0 +1,72 @@
+import pickle
+from array import array
+
+from src.models.data_reports import FileCoverage, FileCoverageTable, FileLineHits, NormalisedCoverageData
+
+
+def files():
+    return [
+        FileCoverage(filename="a.py", line_rate=0.5, branch_rate=0.25, complexity=2.0, lines_covered=1, lines_valid=2),
+        FileCoverage(filename="b.py", line_rate=1.0, branch_rate=0.0, complexity=4.0, lines_covered=3, lines_valid=3),
+        FileCoverage(filename="a.py", line_rate=0.1, branch_rate=0.5, complexity=3.0),
+    ]
+
+
+def test_coverage_files_are_stored_as_columns():
+    """A list of files is converted to a table, which still hands out FileCoverage."""
+    coverage = NormalisedCoverageData(total_line_rate=0.5, total_branch_rate=0.5, files=files(), timestamp="1")
+
+    assert isinstance(coverage.files, FileCoverageTable)
+    assert isinstance(coverage.files.columns["line_rate"], array)
+    assert list(coverage.files) == files()
+    assert coverage.files[-1] == files()[-1]
+    assert coverage.complexity_avg == 3.0
+    assert coverage.total == 3
+
+
+def test_table_interns_filenames():
+    table = FileCoverageTable(files())
+
+    assert table.filenames == ["a.py", "b.py"]
+    assert list(table.filename_column) == [0, 1, 0]
+
+
+def test_table_aggregates_on_columns():
+    table = FileCoverageTable(files())
+
+    assert table.total("lines_valid") == 5
+    assert table.order_by("line_rate") == [2, 0, 1]
+    assert table.order_by("complexity", reverse=True) == [1, 2, 0]
+
+
+def test_table_pickles():
+    """Tables cross process boundaries and the parse cache."""
+    table = FileCoverageTable(files())
+
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def test_file_line_hits_sorts_and_merges_lines():
+    line_hits = FileLineHits()
+    for line, hits in [(3, 0), (1, 2), (3, 1), (4, 0), (5, 0), (9, 1)]:
+        line_hits.append(line, hits)
+    line_hits.normalise()
+
+    assert list(line_hits.lines) == [1, 3, 4, 5, 9]
+    assert line_hits.hits_at(3) == 1
+    assert line_hits.hits_at(2) is None
+    assert list(line_hits.uncovered_ranges()) == [(4, 5)]
+    assert line_hits.lines_covered == 3
+
+
+def test_file_line_hits_merge_adds_hits():
+    first, second = FileLineHits(), FileLineHits()
+    first.append(1, 0, branches_covered=1, branches_valid=2)
+    first.append(2, 1)
+    second.append(1, 3, branches_covered=2, branches_valid=2)
+    second.append(5, 0)
+
+    merged = first.merge(second)
+
+    assert [merged.row(i) for i in range(len(merged))] == [(1, 3, 2, 2), (2, 1, 0, 0), (5, 0, 0, 0)]
+    assert pickle.loads(pickle.dumps(merged)) == merged
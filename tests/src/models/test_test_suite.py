@@ -0,0 +1,114 @@
+import pickle
+from array import array
+
+from src.models.test_suite import (
+    SlowestSuites,
+    TestCase,
+    TestCaseRange,
+    TestCaseTable,
+    TestReport,
+    TestResult,
+    TestSuite,
+)
+
+
+def cases():
+    return [
+        TestCase(name="test_a", status=TestResult.PASSED, time="0.5"),
+        TestCase(name="test_b", status=TestResult.FAILED, time="1.5", message="boom", full_message="Traceback"),
+        TestCase(name="test_c", status=TestResult.SKIPPED, time="nan"),
+        TestCase(name="test_d", status=TestResult.FAILED, time="0.1", message="boom"),
+    ]
+
+
+def test_suite_stores_cases_as_columns():
+    """A list of cases is converted to a table, which still reads like TestCase."""
+    suite = TestSuite(name="suite", tests=cases(), time=2.0)
+
+    assert isinstance(suite.tests, TestCaseRange)
+    assert isinstance(suite.tests.table.columns["status"], array)
+    assert list(suite.tests) == cases()
+    assert (suite.passed, suite.failed, suite.skipped, suite.errored) == (1, 2, 1, 0)
+    assert suite.tests[-1].name == "test_d"
+    assert not hasattr(suite.tests[2], "time")
+
+
+def test_table_interns_strings():
+    table = TestCaseTable()
+    table.add(cases())
+
+    assert table.strings == ["test_a", "test_b", "boom", "Traceback", "test_c", "test_d"]
+    assert list(table.columns["message"])[1::2] == [2, 2]
+
+
+def test_report_shares_one_table():
+    """Suites built on their own tables are copied into the report's table."""
+    first = TestSuite(name="first", tests=cases(), time=1.0)
+    second = TestSuite(name="second", tests=cases()[:2], time=1.0)
+    report = TestReport(suites=[first, second])
+
+    assert first.tests.table is report.tests and second.tests.table is report.tests
+    assert list(second.tests) == cases()[:2]
+    assert [test.suite for test in second.tests] == [1, 1]
+    assert [test.name for test in report.get_tests_by_status(TestResult.FAILED)] == ["test_b", "test_d", "test_b"]
+    assert report.failure_summary == {"first": ["test_b: boom", "test_d: boom"], "second": ["test_b: boom"]}
+    assert report.total_tests == 6
+
+
+def test_report_indexes_cases_by_status():
+    report = TestReport(suites=[TestSuite(name="suite", tests=cases(), time=2.0)])
+
+    assert list(report.status_index[TestResult.FAILED]) == [1, 3]
+    assert report.count_tests_by_status(TestResult.SKIPPED) == 1
+    assert report.count_tests_by_status(TestResult.ERROR) == 0
+    assert next(report.iter_tests_by_status(TestResult.FAILED)).name == "test_b"
+    assert report.get_tests_by_status(TestResult.FAILED)[-1].name == "test_d"
+
+
+def test_slowest_tests_are_ranked_as_cases_are_added():
+    table = TestCaseTable(slowest_k=2)
+    table.add(cases())
+
+    assert sorted(table.slowest, reverse=True) == [(1.5, -1), (0.5, 0)]
+    assert table.slowest_rows(2) == [1, 0]
+    # More than the heap holds is ranked from the time column
+    assert table.slowest_rows(5) == [1, 0, 3]
+
+
+def test_slowest_count_comes_from_the_input(monkeypatch):
+    monkeypatch.setenv("INPUT_SLOWEST_TESTS", "1")
+    first = TestSuite(name="first", tests=cases(), time=1.0)
+    second = TestSuite(name="second", tests=cases()[:1], time=3.0)
+    report = TestReport(suites=[first, second])
+
+    assert [test.name for test in report.get_slowest_tests()] == ["test_b"]
+    assert report.slowest_suites == [second]
+    assert [test.name for test in report.get_slowest_tests(n=3)] == ["test_b", "test_a", "test_a"]
+
+    monkeypatch.setenv("INPUT_SLOWEST_TESTS", "many")
+    # Falls back to 5, of which 4 cases have a time
+    assert len(report.get_slowest_tests()) == 4
+
+
+def test_slowest_suites_are_ranked_as_they_are_added():
+    """Only k suites are kept, suites as slow as each other keep the report's order."""
+    suites = [
+        TestSuite(name=name, tests=cases()[:1], time=time)
+        for name, time in [("a", 1.0), ("b", 3.0), ("c", 1.0), ("d", 0.5)]
+    ]
+    ranking = SlowestSuites(k=2)
+    # Suites can close out of order, e.g. a parent after its children
+    for order in (2, 0, 3, 1):
+        ranking.add(suites[order], order)
+
+    assert [suite.name for suite in ranking.suites()] == ["b", "a"]
+    assert [suite.name for suite in SlowestSuites.merge([[suites[2]], [suites[1], suites[0]]], k=2)] == ["b", "c"]
+
+
+def test_report_pickles():
+    report = TestReport(suites=[TestSuite(name="suite", tests=cases(), time=2.0)])
+
+    loaded = pickle.loads(pickle.dumps(report))
+
+    assert list(loaded.suites[0].tests) == cases()
+    assert loaded.total_failed == 2
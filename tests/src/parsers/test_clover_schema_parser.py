@@ -2,6 +2,8 @@
 
 from pathlib import Path
 
+import pytest
+
 from src.parsers.clover_schema_parser import CloverSchemaParser
 
 
@@ -33,3 +35,69 @@ def test_coberature_coverage_data():
     assert file2.filename == 'registration.js'
     assert file2.line_rate == int(0/8)
     assert file2.branch_rate == int(1/6)
+
+
+def test_clover_package_and_class_metrics():
+    """Each file uses its own metrics, not the package or class ones"""
+    parser = CloverSchemaParser()
+    file = "clover_with_packages.xml"
+
+    coverage_data = parser.parse_and_normalise(f"{xml_file_path}/{file}")
+
+    assert coverage_data.total_line_rate == 50
+    assert coverage_data.total_branch_rate == 25
+    assert coverage_data.complexity_avg == 2.0
+
+    parser_file, lexer_file = coverage_data.files
+    assert parser_file.filename == 'Parser.java'
+    assert parser_file.line_rate == 0.5
+    assert parser_file.branch_rate == 0.25
+    assert parser_file.complexity == 3
+
+    assert lexer_file.filename == 'Lexer.java'
+    assert lexer_file.line_rate == 0.5
+    assert lexer_file.complexity == 1
+
+
+def test_clover_line_hits(monkeypatch):
+    """Line hits are keyed by the file's path, conditions count their true and false branches."""
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+
+    line_hits = CloverSchemaParser().parse_and_normalise(f"{xml_file_path}/clover_with_packages.xml").line_hits
+
+    parser_hits = line_hits["src/com/example/Parser.java"]
+    assert len(parser_hits) == 5
+    assert list(parser_hits.uncovered_ranges()) == [(8, 9)]
+
+
+def test_clover_line_hits_keys_are_the_files_paths(monkeypatch):
+    """Each file's path is the key of its line hits, relative to the checkout when it is under it."""
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+    monkeypatch.setenv("GITHUB_WORKSPACE", "D:\\Programming\\webhook-reporter-coverage-creator")
+
+    for file in ("clover_with_packages.xml", "sample_clover_coverage.xml"):
+        coverage_data = CloverSchemaParser().parse_and_normalise(f"{xml_file_path}/{file}")
+
+        assert {file.path for file in coverage_data.files} == set(coverage_data.line_hits)
+    assert [file.path for file in coverage_data.files] == [
+        "jest-coverage-example/src/math.js",
+        "jest-coverage-example/src/registration.js",
+    ]
+
+
+@pytest.mark.parametrize("engine", ["stdlib", "lxml"])
+def test_clover_phpunit_class_metrics_come_first(monkeypatch, engine):
+    """PHPUnit writes the classes' <metrics> before the file's own, only the file's are used"""
+    if engine == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setenv("INPUT_XML_ENGINE", engine)
+
+    coverage_data = CloverSchemaParser().parse_and_normalise(f"{xml_file_path}/clover_phpunit.xml")
+
+    assert coverage_data.total_line_rate == int(5 / 9 * 100)
+    assert coverage_data.total_branch_rate == 0
+
+    cart, money = coverage_data.files
+    assert (cart.filename, cart.lines_covered, cart.lines_valid) == ('/app/src/Cart.php', 3, 5)
+    assert (money.filename, money.line_rate) == ('/app/src/Money.php', 0.5)
+    assert money.branch_rate == 0
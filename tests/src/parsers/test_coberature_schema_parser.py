@@ -35,3 +35,28 @@ def test_coberature_coverage_data():
     assert file2.line_rate == 0.7
     assert file2.branch_rate == 0.6
     assert file2.complexity == 1.5
+
+
+def test_coberature_counts_lines_and_branches():
+    """Covered and valid counts are read from each class' lines"""
+    parser = CoberatureSchemaParser()
+
+    coverage_data = parser.parse_and_normalise(f"{xml_file_path}/shards/coverage_shard_1.xml")
+
+    api = coverage_data.files[0]
+    assert (api.lines_covered, api.lines_valid) == (3, 4)
+    assert (api.branches_covered, api.branches_valid) == (1, 2)
+    assert (coverage_data.lines_covered, coverage_data.lines_valid) == (3, 6)
+
+
+def test_coberature_line_hits(monkeypatch):
+    """Line hits are only kept with the line_hits input."""
+    coverage_file = f"{xml_file_path}/shards/coverage_shard_1.xml"
+    assert CoberatureSchemaParser().parse_and_normalise(coverage_file).line_hits is None
+
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+    line_hits = CoberatureSchemaParser().parse_and_normalise(coverage_file).line_hits
+
+    api = line_hits["app/api.py"]
+    assert [api.row(i) for i in range(len(api))] == [(1, 1, 0, 0), (2, 1, 1, 2), (3, 1, 0, 0), (4, 0, 0, 0)]
+    assert list(line_hits["app/models.py"].uncovered_ranges()) == [(1, 2)]
@@ -34,4 +34,40 @@ def test_jacoco_coverage_data():
     assert file2.filename == 'Calculator.java'
     assert file2.line_rate == 1.0
     assert file2.branch_rate == 0.0
-    assert file2.complexity == 5.0
\ No newline at end of file
+    assert file2.complexity == 5.0
+
+def test_jacoco_direct_class_counters_and_report_totals():
+    """Classes only use their own counters, totals come from the report counters"""
+    parser = JacocoSchemaParser()
+    file = "jacoco_report_counters.xml"
+
+    coverage_data = parser.parse_and_normalise(f"{xml_file_path}/{file}")
+
+    assert coverage_data.total_line_rate == 80
+    assert coverage_data.total_branch_rate == 25
+
+    service = coverage_data.files[0]
+    assert service.filename == 'Service.java'
+    assert service.line_rate == 0.75
+    assert service.branch_rate == 0.0  # the method BRANCH counter is not the class'
+    assert service.complexity == 4
+
+
+def test_jacoco_line_hits(monkeypatch):
+    """Line hits are keyed by package and source file, hits are the covered instructions."""
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+
+    line_hits = JacocoSchemaParser().parse_and_normalise(f"{xml_file_path}/sample_jacoco_coverage.xml").line_hits
+
+    assert set(line_hits) == {"org/example/Main.java", "org/example/Calculator.java"}
+    assert line_hits["org/example/Calculator.java"].lines_covered == 5
+    assert line_hits["org/example/Main.java"].lines_covered == 0
+
+
+def test_jacoco_line_hits_keys_are_the_files_paths(monkeypatch):
+    """Each file's path is the key of its line hits."""
+    monkeypatch.setenv("INPUT_LINE_HITS", "true")
+
+    coverage_data = JacocoSchemaParser().parse_and_normalise(f"{xml_file_path}/sample_jacoco_coverage.xml")
+
+    assert {file.path for file in coverage_data.files} == set(coverage_data.line_hits)
@@ -39,9 +39,30 @@ def test_get_parser_raises_unsupported():
         parser_factory.get_parser(file_name=f"{xml_file_path}/{file}")
 
 def test_raises_malformed_coberature():
-    """For incomplete coberature coverage file raises"""
+    """For a malformed root element raises while identifying"""
     parser_factory = ParserFactory()
-    file = 'malformed.xml'
+    file = 'malformed_root.xml'
 
     with pytest.raises(MalformedFile):
-        parser_factory.get_parser(file_name=f"{xml_file_path}/{file}")
\ No newline at end of file
+        parser_factory.get_parser(file_name=f"{xml_file_path}/{file}")
+
+def test_raises_malformed_coberature_body():
+    """For incomplete coberature coverage file raises once the body is parsed"""
+    parser_factory = ParserFactory()
+    file = f"{xml_file_path}/malformed.xml"
+    parser = parser_factory.get_parser(file_name=file)
+
+    with pytest.raises(MalformedFile):
+        parser.parse_and_normalise(coverage_file=file)
+
+def test_get_parser_hands_over_identified_stream():
+    """The parser carries on from the stream used to identify the file"""
+    parser_factory = ParserFactory()
+    file = f"{xml_file_path}/sample_coberature_coverage.xml"
+    parser = parser_factory.get_parser(file_name=file)
+
+    assert parser.xml_stream.root.tag == "coverage"
+
+    coverage_data = parser.parse_and_normalise(coverage_file=file)
+    assert coverage_data.total == 2
+    assert parser.xml_stream is None
\ No newline at end of file
@@ -58,3 +58,6 @@ def test_report_generation_with_fail():
 
     failures = test_report.get_tests_by_status(test_status=TestResult.FAILED)
     assert len(failures) == 1
+    # The failure body stays in the file and is read when it is accessed
+    assert test_report.tests.columns["body_source"][failures[0].row] == 0
+    assert failures[0].full_message.startswith("Error: expect(received).toThrow()\n\nReceived function did not throw")
@@ -2,6 +2,8 @@
 
 from pathlib import Path
 
+import pytest
+
 from src.models.test_suite import TestResult
 from src.test_readers.junit_reader import JUnitReader
 
@@ -53,3 +55,53 @@ def test_report_generation_with_fail():
 
     failures = test_report.get_tests_by_status(test_status=TestResult.FAILED)
     assert len(failures) == 1
+
+
+def test_report_generation_nested_suites():
+    """Nested suites own only their direct test cases"""
+    reader = JUnitReader()
+    file_name = "nested_suites.xml"
+
+    test_report = reader.read(file_path=f"{xml_file_path}/{file_name}")
+
+    assert [suite.name for suite in test_report.suites] == [
+        "module",
+        "module.inner",
+        "grouping.leaf",
+    ]
+    assert test_report.total_tests == 5
+    assert test_report.total_failed == 1
+    # module.inner's time is part of module's, grouping has no time of its own
+    assert test_report.total_time == pytest.approx(2.6)
+
+    module, inner, _ = test_report.suites
+    assert [test.name for test in module.tests] == ["test_setup", "test_teardown"]
+    assert [test.name for test in inner.tests] == ["test_inner_pass", "test_inner_fail"]
+    assert test_report.failure_summary == {"module.inner": ["test_inner_fail: inner failed"]}
+
+
+def test_slowest_suites_are_ranked_while_reading(monkeypatch):
+    """The reader ranks the suites as they close, outer suites close after their children"""
+    monkeypatch.setenv("INPUT_SLOWEST_TESTS", "2")
+
+    test_report = JUnitReader().read(file_path=f"{xml_file_path}/nested_suites.xml")
+
+    assert [suite.name for suite in test_report.slowest_suites] == ["module", "module.inner"]
+
+
+def test_read_many_combines_suites_in_order():
+    """Files read by the worker pool end up in one report, in the given order"""
+    files = sorted(str(path) for path in (xml_file_path / "surefire").glob("TEST-*.xml"))
+
+    test_report = JUnitReader().read_many(files, max_workers=2)
+
+    assert [suite.name for suite in test_report.suites] == [
+        "org.example.AlphaTest",
+        "org.example.BetaTest",
+        "org.example.GammaTest",
+    ]
+    assert test_report.total_tests == 6
+    assert test_report.total_failed == 3
+    assert test_report.failure_summary["org.example.BetaTest"] == ["shouldFail: expected 1 but was 2"]
+    # Each file's slowest suites are ranked again, as slow suites keep the files' order
+    assert test_report.slowest_suites == test_report.suites[:3]
@@ -45,9 +45,34 @@ def test_get_reader_raises_unsupported():
 
 
 def test_raises_malformed_coberature():
-    """For incomplete junit test file raises"""
+    """For a malformed root element raises while identifying"""
     parser_factory = ReaderFactory()
-    file = "malformed.xml"
+    file = "malformed_root.xml"
 
     with pytest.raises(MalformedFile):
         parser_factory.get_reader(test_file=f"{xml_file_path}/{file}")
+
+
+def test_raises_malformed_junit_body():
+    """For incomplete junit test file raises once the body is read"""
+    parser_factory = ReaderFactory()
+    file = f"{xml_file_path}/malformed_junit.xml"
+    reader = parser_factory.get_reader(test_file=file)
+
+    with pytest.raises(MalformedFile):
+        reader.read(file)
+
+
+def test_get_batch_reader_identifies_first_file():
+    """A batch of JUnit files gets one JUnitReader"""
+    files = [f"{xml_file_path}/single_suite.xml", f"{xml_file_path}/multiple_suites.xml"]
+
+    assert isinstance(ReaderFactory.get_batch_reader(test_files=files), JUnitReader)
+
+
+def test_get_batch_reader_raises_for_mixed_types():
+    """Every file of a batch has to be of the same type"""
+    files = [f"{xml_file_path}/single_suite.xml", f"{json_file_path}/test_jest.json"]
+
+    with pytest.raises(UnsupportedTestReportType):
+        ReaderFactory.get_batch_reader(test_files=files)
@@ -0,0 +1,222 @@
+"""Test that both reports are loaded together"""
+
+import logging
+import pickle
+from pathlib import Path
+
+import pytest
+
+from src.exceptions.configurations import UnsupportedCoverageType, UnsupportedTestReportType
+from src.exceptions.file_errors import MalformedFile
+from src.helpers.history_store import HistoryStore
+from src.models.test_suite import TestResult
+from src.report_loader import (
+    load_baseline_comparison,
+    load_coverage_report,
+    load_diff_coverage,
+    load_reports,
+    load_test_report,
+    save_history,
+    save_snapshots,
+)
+
+data_path = Path(__file__).parent.parent / "data"
+coverage_file = f"{data_path}/xml/coverage/sample_coberature_coverage.xml"
+test_file = f"{data_path}/xml/tests/junit_with_fails.xml"
+
+
+def test_load_reports_matches_loading_one_after_the_other():
+    """Both reports are the same as when loaded sequentially."""
+    coverage_report, test_report = load_reports(coverage_file=coverage_file, test_file=test_file)
+
+    assert coverage_report == load_coverage_report(coverage_file)
+    expected = load_test_report(test_file)
+    assert test_report.total_tests == expected.total_tests
+    assert [suite.name for suite in test_report.suites] == [suite.name for suite in expected.suites]
+
+
+def test_cached_test_report_reads_bodies_from_moved_files(monkeypatch, tmp_path):
+    """A cached report whose files moved is parsed again, its bodies then read from the new place."""
+    monkeypatch.setenv("INPUT_CACHE_DIR", str(tmp_path / "cache"))
+    body_file = f"{data_path}/xml/tests/junit_failure_bodies.xml"
+    moved = tmp_path / "junit.xml"
+    moved.write_bytes(Path(body_file).read_bytes())
+
+    expected = load_test_report(body_file)
+    test_report = load_test_report(str(moved))
+
+    assert [source.path for source in test_report.tests.sources] == [str(moved)]
+    assert list(test_report.get_tests_by_status(TestResult.FAILED)) == list(
+        expected.get_tests_by_status(TestResult.FAILED)
+    )
+
+
+def test_load_reports_without_test_file():
+    """The test report is optional."""
+    coverage_report, test_report = load_reports(coverage_file=coverage_file, test_file=None)
+
+    assert coverage_report.total == 2
+    assert test_report is None
+
+
+def test_load_reports_raises_coverage_error(caplog):
+    """An error from the worker process is raised and logged with its file."""
+    unsupported = f"{data_path}/xml/coverage/unsupported.xml"
+
+    with caplog.at_level(logging.ERROR, logger="webhook-reporter-logger"):
+        with pytest.raises(UnsupportedCoverageType):
+            load_reports(coverage_file=unsupported, test_file=test_file)
+
+    assert unsupported in caplog.text
+
+
+def test_load_reports_raises_test_report_error():
+    """An error reading the test results is raised once coverage is parsed."""
+    with pytest.raises(UnsupportedTestReportType):
+        load_reports(coverage_file=coverage_file, test_file=f"{data_path}/xml/tests/unsupported.xml")
+
+
+def test_errors_survive_pickling():
+    """Errors raised in the worker process can be sent back."""
+    error = pickle.loads(pickle.dumps(MalformedFile(file="coverage.xml")))
+
+    assert isinstance(error, MalformedFile)
+    assert str(error) == str(MalformedFile(file="coverage.xml"))
+    assert isinstance(pickle.loads(pickle.dumps(UnsupportedCoverageType())), UnsupportedCoverageType)
+
+
+def test_load_reports_merges_sharded_coverage():
+    """Every file matched by a glob is parsed and merged into one report."""
+    shards = f"{data_path}/xml/coverage/shards/coverage_shard_*.xml"
+
+    coverage_report, _ = load_reports(coverage_file=shards, test_file=test_file)
+
+    assert [file.filename for file in coverage_report.files] == ["app/api.py", "app/models.py", "app/cli.py"]
+    assert (coverage_report.lines_covered, coverage_report.lines_valid) == (6, 7)
+    assert coverage_report.total_line_rate == 85
+    assert coverage_report.total_branch_rate == 50
+    # Line hits were only collected for the merge
+    assert coverage_report.line_hits is None
+
+
+def test_load_reports_reads_directory_of_test_results():
+    """A directory of JUnit files is read into one test report."""
+    _, test_report = load_reports(
+        coverage_file=coverage_file, test_file=f"{data_path}/xml/tests/surefire"
+    )
+
+    assert len(test_report.suites) == 3
+    assert test_report.total_tests == 6
+
+
+def test_load_reports_through_parse_cache(monkeypatch, tmp_path):
+    """With a cache directory, parsed reports are stored and reused."""
+    monkeypatch.setenv("INPUT_CACHE_DIR", str(tmp_path))
+
+    first = load_reports(coverage_file=coverage_file, test_file=test_file)
+    second = load_reports(coverage_file=coverage_file, test_file=test_file)
+
+    assert len(list(tmp_path.glob("*.pickle"))) == 2
+    assert second[0] == first[0]
+    assert second[1].total_tests == first[1].total_tests
+
+
+def test_cached_test_report_follows_slowest_tests(monkeypatch, tmp_path):
+    """A report cached for another `slowest_tests` count is not reused."""
+    monkeypatch.setenv("INPUT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("INPUT_SLOWEST_TESTS", "1")
+    assert len(load_test_report(test_file).slowest_suites) == 1
+
+    monkeypatch.setenv("INPUT_SLOWEST_TESTS", "2")
+
+    assert len(load_test_report(test_file).slowest_suites) == 2
+    assert len(list(tmp_path.glob("*.pickle"))) == 2
+
+
+def test_load_reports_from_snapshots(monkeypatch, tmp_path):
+    """Snapshots written by one run are accepted as the reports of the next."""
+    monkeypatch.setenv("INPUT_SNAPSHOT_DIR", str(tmp_path))
+    coverage_report, test_report = load_reports(coverage_file=coverage_file, test_file=test_file)
+    save_snapshots(coverage_report=coverage_report, test_report=test_report)
+
+    loaded_coverage, loaded_tests = load_reports(
+        coverage_file=f"{tmp_path}/coverage.snapshot", test_file=f"{tmp_path}/tests.snapshot"
+    )
+
+    assert loaded_coverage == coverage_report
+    assert loaded_tests.failure_summary == test_report.failure_summary
+
+
+def test_snapshot_of_the_other_report_is_refused(monkeypatch, tmp_path):
+    """A test snapshot given as the coverage or baseline, or the other way round, is not supported."""
+    monkeypatch.setenv("INPUT_SNAPSHOT_DIR", str(tmp_path))
+    save_snapshots(*load_reports(coverage_file=coverage_file, test_file=test_file))
+
+    with pytest.raises(UnsupportedCoverageType):
+        load_reports(coverage_file=f"{tmp_path}/tests.snapshot", test_file=None)
+    with pytest.raises(UnsupportedTestReportType):
+        load_test_report(f"{tmp_path}/coverage.snapshot")
+
+    monkeypatch.setenv("INPUT_BASELINE_COVERAGE", f"{tmp_path}/tests.snapshot")
+    with pytest.raises(UnsupportedCoverageType):
+        load_baseline_comparison(load_coverage_report(coverage_file))
+
+
+def test_load_diff_coverage(monkeypatch, tmp_path):
+    """The diff file turns line hits on, its added lines are looked up in them."""
+    diff_path = tmp_path / "changes.diff"
+    diff_path.write_text("+++ b/src/app/api.py\n@@ -3,0 +4,1 @@\n+    return None\n")
+    monkeypatch.setenv("INPUT_DIFF_FILE", str(diff_path))
+    coverage_report = load_coverage_report(f"{data_path}/xml/coverage/shards/coverage_shard_1.xml")
+
+    diff_coverage = load_diff_coverage(coverage_report)
+
+    assert (diff_coverage.lines_covered, diff_coverage.lines_valid) == (0, 1)
+    assert diff_coverage.worst_hunks[0].name == "src/app/api.py:4"
+
+
+def test_load_diff_coverage_without_diff_file():
+    assert load_diff_coverage(load_coverage_report(coverage_file)) is None
+
+
+def test_save_history(monkeypatch, tmp_path):
+    """Each run is added to the history file, which is read back on the next run."""
+    history = str(tmp_path / "history.db")
+    monkeypatch.setenv("INPUT_HISTORY_DB", history)
+    monkeypatch.setenv("GITHUB_REF_NAME", "main")
+    coverage_report, test_report = load_reports(coverage_file=coverage_file, test_file=test_file)
+
+    first = save_history(coverage_report, test_report)
+    second = save_history(coverage_report, None)
+
+    with HistoryStore(history) as store:
+        assert store.last_run("main", before=second).id == first
+
+
+def test_save_history_logs_unwritable_file(monkeypatch, tmp_path, caplog):
+    monkeypatch.setenv("INPUT_HISTORY_DB", str(tmp_path / "missing" / "history.db"))
+
+    with caplog.at_level(logging.ERROR, logger="webhook-reporter-logger"):
+        assert save_history(load_coverage_report(coverage_file), None) is None
+    assert "Could not record the run" in caplog.text
+
+
+def test_load_baseline_comparison(monkeypatch, tmp_path):
+    """The baseline can be a coverage report or a snapshot of one."""
+    shards = f"{data_path}/xml/coverage/shards"
+    coverage_report = load_coverage_report(f"{shards}/coverage_shard_2.xml")
+    monkeypatch.setenv("INPUT_BASELINE_COVERAGE", f"{shards}/coverage_shard_1.xml")
+
+    comparison = load_baseline_comparison(coverage_report)
+
+    assert [delta.filename for delta in comparison.regressions] == ["app/api.py"]
+
+    monkeypatch.setenv("INPUT_SNAPSHOT_DIR", str(tmp_path))
+    save_snapshots(load_coverage_report(f"{shards}/coverage_shard_1.xml"), None)
+    monkeypatch.setenv("INPUT_BASELINE_COVERAGE", str(tmp_path / "coverage.snapshot"))
+    assert load_baseline_comparison(coverage_report) == comparison
+
+
+def test_load_baseline_comparison_without_baseline_yet(monkeypatch, tmp_path):
+    monkeypatch.setenv("INPUT_BASELINE_COVERAGE", str(tmp_path / "coverage.xml"))
+    assert load_baseline_comparison(load_coverage_report(coverage_file)) is None